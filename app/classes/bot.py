@@ -19,8 +19,10 @@ from statcord import StatcordClusterClient
 import config
 from app import commands, i18n, utils
 from app.classes.context import MyContext
+from app.classes.event_queue import EventQueue, partition
 from app.classes.ipc_connection import WebsocketConnection
 from app.classes.limited_list import LimitedList
+from app.classes.regex_engine import RegexEngine
 from app.database.database import Database
 from app.i18n.i18n import t_
 from app.menus import HelpMenu
@@ -79,6 +81,14 @@ class Bot(commands.AutoShardedBot):
         )
         self._before_invoke = self.before_invoke_hook
 
+        self.events = EventQueue(
+            self.loop,
+            workers=config.EVENT_WORKERS,
+            guild_size=config.EVENT_GUILD_QUEUE_SIZE,
+            total_size=config.EVENT_QUEUE_SIZE,
+        )
+        self.regex = RegexEngine(config.REGEX_PROCESSES, config.REGEX_TIMEOUT)
+
         self.statcord_client = StatcordClusterClient(
             self,
             os.getenv("STATCORD_TOKEN"),
@@ -92,14 +102,25 @@ class Bot(commands.AutoShardedBot):
             os.getenv("DB_NAME"),
             os.getenv("DB_USER"),
             os.getenv("DB_PASSWORD"),
+            **config.DATABASE_POOL,
         )
         self.pipe = kwargs.pop("pipe")
         self.websocket = WebsocketConnection(
-            self.cluster_name, self.handle_websocket_command, self.loop
+            self.cluster_name,
+            self.handle_websocket_command,
+            self.loop,
+            timeout=config.IPC_TIMEOUT,
+            shard_ids=kwargs["shard_ids"],
+            shard_count=kwargs["shard_count"],
+            serializers=config.IPC_SERIALIZERS,
+            compress_threshold=config.IPC_COMPRESS_THRESHOLD,
+            on_connect=self.on_ipc_connect,
         )
 
         self.loop.run_until_complete(self.websocket.ensure_connection())
         self.loop.run_until_complete(self.db.init_database())
+        self.db.invalidation_publisher = self.publish_invalidation
+        self.db.forget_pattern = self.regex.forget
 
         self.log.info(
             f'[Cluster#{self.cluster_name}] {kwargs["shard_ids"]}, '
@@ -118,6 +139,14 @@ class Bot(commands.AutoShardedBot):
         else:
             sys.exit(-1)
 
+    def _schedule_event(self, coro, event_name, *args, **kwargs):
+        key = partition(event_name, coro, args)
+        if key is None:
+            return super()._schedule_event(coro, event_name, *args, **kwargs)
+        self.events.put(
+            *key, self._run_event(coro, event_name, *args, **kwargs)
+        )
+
     async def on_message(self, message):
         pass
 
@@ -129,9 +158,9 @@ class Bot(commands.AutoShardedBot):
         if ctx.guild is None:
             return
 
-        await self.db.guilds.create(ctx.guild.id)
-        await self.db.users.create(ctx.author.id, ctx.author.bot)
-        await self.db.members.create(ctx.author.id, ctx.guild.id)
+        await self.db.ensure_member(
+            ctx.author.id, ctx.author.bot, ctx.guild.id
+        )
 
     async def is_owner(self, user: discord.User):
         if user.id in config.OWNER_IDS:
@@ -199,6 +228,8 @@ class Bot(commands.AutoShardedBot):
         await self.session.close()
         self.log.info("shutting down")
         await self.websocket.close()
+        self.events.stop()
+        self.regex.close()
         await super().close()
 
     async def exec(self, code):
@@ -235,6 +266,19 @@ class Bot(commands.AutoShardedBot):
                 self._last_result = ret
                 return f"{value}{ret}"
 
+    async def publish_invalidation(self, namespace: str, key: Any) -> None:
+        try:
+            await self.websocket.send_command(
+                "invalidate", {"namespace": namespace, "key": key}
+            )
+        except Exception as e:
+            # The other processes' TTLs will catch up eventually
+            self.dispatch("log_error", "Error", e, [namespace, key])
+
+    async def on_ipc_connect(self) -> None:
+        # Lets cogs re-send state the IPC server lost if it restarted
+        self.dispatch("ipc_connect")
+
     async def handle_websocket_command(
         self, msg: Dict[str, Any]
     ) -> Optional[Union[list, str, bool, Dict[Any, Any]]]:
@@ -255,22 +299,12 @@ class Bot(commands.AutoShardedBot):
                 "guilds": data["guild_count"],
                 "members": data["member_count"],
             }
-        elif cmd == "get_mutual":
-            ret = []
-            for gid in data:
-                if self.get_guild(gid):
-                    ret.append(gid)
-        elif cmd == "is_mutual":
-            if self.get_guild(data["gid"]):
-                ret = True
-            else:
-                ret = False
         elif cmd == "channel_names":
             ret = {}
             for cid in data["channel_ids"]:
                 obj = self.get_channel(cid)
                 if obj:
-                    ret[cid] = obj.name
+                    ret[str(cid)] = obj.name
         elif cmd == "guild_channels":
             guild = self.get_guild(data["guild_id"])
             ret = {}
@@ -278,7 +312,12 @@ class Bot(commands.AutoShardedBot):
                 for c in guild.text_channels:
                     key = str(c.category or "No Category")
                     ret.setdefault(key, {})
-                    ret[key][c.id] = c.name
+                    ret[key][str(c.id)] = c.name
+        elif cmd == "invalidate":
+            if msg["author"] != self.cluster_name:
+                await self.db.apply_invalidation(
+                    data["namespace"], data["key"]
+                )
         elif cmd == "donate_event":
             self.dispatch("donatebot_event", data["data"], data["auth"])
         elif cmd == "update_prem_roles":
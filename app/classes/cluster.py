@@ -2,6 +2,7 @@ import logging
 import multiprocessing
 import os
 import signal
+from typing import Optional
 
 from discord import AllowedMentions, Intents
 
@@ -21,6 +22,8 @@ class Cluster:
     def __init__(self, launcher, name, shard_ids, max_shards):
         self.launcher = launcher
         self.process = None
+        # Seconds it took to log in the last time it was started
+        self.ready_time: Optional[float] = None
         self.kwargs = dict(
             intents=INTENTS,
             allowed_mentions=NO_MENTIONS,
@@ -0,0 +1,233 @@
+import asyncio
+import time
+from collections import deque
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Deque,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+import discord
+
+# Events whose listeners in QUEUED_COGS go through the queue instead of
+# each getting their own task straight away. Bot.dispatch schedules
+# listeners under the method name, so these include the on_ prefix.
+QUEUED_EVENTS = {
+    "on_message",
+    "on_raw_message_edit",
+    "on_raw_message_delete",
+    "on_raw_reaction_add",
+    "on_raw_reaction_remove",
+    "on_raw_reaction_clear",
+    "on_raw_reaction_clear_emoji",
+    "on_star_update",
+}
+# Only the starboard, AutoStar, QuickActions and leveling listeners are
+# queued. Anything else, commands in particular, can wait on users for
+# a long time, which would hold up a worker and everything queued
+# behind it.
+QUEUED_COGS = {
+    "StarboardEvents",
+    "AutoStarEvents",
+    "QAEvents",
+    "LevelingEvents",
+}
+
+
+class Job(NamedTuple):
+    message_id: Optional[int]
+    coro: Coroutine
+    queued_at: float
+
+
+def partition(
+    event_name: str, listener: Callable, args: Tuple[Any, ...]
+) -> Optional[Tuple[int, Optional[int]]]:
+    """Returns the (guild_id, message_id) that a listener's event belongs
+    to, or None if the listener shouldn't be queued."""
+    if event_name not in QUEUED_EVENTS or not args:
+        return None
+    cog = getattr(listener, "__self__", None)
+    if getattr(cog, "qualified_name", None) not in QUEUED_COGS:
+        return None
+    if event_name == "on_star_update":
+        # giver_id, receiver_id, guild_id, channel_id, points
+        return args[2], None
+
+    obj = args[0]
+    if isinstance(obj, discord.Message):
+        if obj.guild is None:
+            return None
+        return obj.guild.id, obj.id
+    guild_id = getattr(obj, "guild_id", None)
+    if guild_id is None:
+        return None
+    return guild_id, getattr(obj, "message_id", None)
+
+
+class EventQueue:
+    """Runs event listeners on a fixed number of workers.
+
+    Listeners are queued per guild. Workers take turns between the
+    guilds that have work, one listener at a time, so a busy guild can't
+    hold up the others, and listeners for the same message run one
+    after another, in the order the events came in.
+
+    If a guild already has `guild_size` listeners waiting, or there are
+    `total_size` waiting overall, new ones are dropped."""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        workers: int = 50,
+        guild_size: int = 1_000,
+        total_size: int = 50_000,
+    ) -> None:
+        self.loop = loop
+        self.worker_count = workers
+        self.guild_size = guild_size
+        self.total_size = total_size
+
+        self._queues: Dict[int, Deque[Job]] = {}
+        # guilds waiting for a worker, each one at most once
+        self._ready: "asyncio.Queue[int]" = asyncio.Queue()
+        self._scheduled: Set[int] = set()
+        # (guild_id, message_id) of the messages being handled
+        self._busy: Set[Tuple[int, int]] = set()
+        self._workers: List[asyncio.Task] = []
+
+        self.depth = 0
+        self.queued = 0
+        self.processed = 0
+        self.shed = 0
+        self.shed_by_guild: Dict[int, int] = {}
+        self.avg_lag = 0.0
+        self.max_lag = 0.0
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._workers = [
+            self.loop.create_task(self._worker())
+            for _ in range(self.worker_count)
+        ]
+
+    def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+
+    def put(
+        self, guild_id: int, message_id: Optional[int], coro: Coroutine
+    ) -> bool:
+        """Queues a coroutine. Returns False if it was dropped."""
+        self.start()
+
+        queue = self._queues.setdefault(guild_id, deque())
+        if len(queue) >= self.guild_size or self.depth >= self.total_size:
+            coro.close()
+            self.shed += 1
+            self.shed_by_guild[guild_id] = (
+                self.shed_by_guild.get(guild_id, 0) + 1
+            )
+            if not queue:
+                self._queues.pop(guild_id)
+            return False
+
+        queue.append(Job(message_id, coro, time.monotonic()))
+        self.depth += 1
+        self.queued += 1
+        self._schedule(guild_id)
+        return True
+
+    def oldest_lag(self) -> float:
+        """Seconds that the oldest waiting listener has been waiting."""
+        now = time.monotonic()
+        return max(
+            (now - q[0].queued_at for q in self._queues.values() if q),
+            default=0.0,
+        )
+
+    def deepest(self, count: int = 5) -> List[Tuple[int, int]]:
+        """The guilds with the most listeners waiting."""
+        depths = [(gid, len(q)) for gid, q in self._queues.items()]
+        depths.sort(key=lambda d: d[1], reverse=True)
+        return depths[:count]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "depth": self.depth,
+            "guilds": len(self._queues),
+            "queued": self.queued,
+            "processed": self.processed,
+            "shed": self.shed,
+            "avg_lag": self.avg_lag,
+            "max_lag": self.max_lag,
+            "oldest_lag": self.oldest_lag(),
+        }
+
+    def _schedule(self, guild_id: int) -> None:
+        if guild_id in self._scheduled or not self._queues.get(guild_id):
+            return
+        self._scheduled.add(guild_id)
+        self._ready.put_nowait(guild_id)
+
+    def _take(self, guild_id: int) -> Optional[Job]:
+        queue = self._queues.get(guild_id)
+        if not queue:
+            return None
+        for index, job in enumerate(queue):
+            if (
+                job.message_id is None
+                or (guild_id, job.message_id) not in self._busy
+            ):
+                del queue[index]
+                if not queue:
+                    self._queues.pop(guild_id)
+                self.depth -= 1
+                return job
+        # Everything waiting is for a message that's being handled. The
+        # guild is scheduled again once it's done.
+        return None
+
+    def _record_lag(self, lag: float) -> None:
+        self.avg_lag = self.avg_lag * 0.99 + lag * 0.01
+        self.max_lag = max(self.max_lag, lag)
+
+    async def _worker(self) -> None:
+        while True:
+            guild_id = await self._ready.get()
+            self._scheduled.discard(guild_id)
+            job = self._take(guild_id)
+            if job is None:
+                continue
+
+            key = (guild_id, job.message_id)
+            if job.message_id is not None:
+                self._busy.add(key)
+            # Let other workers pick up this guild's other messages, after
+            # the guilds that are already waiting
+            self._schedule(guild_id)
+
+            self._record_lag(time.monotonic() - job.queued_at)
+            try:
+                # A task per listener, like discord.py does, so that
+                # context variables don't leak between listeners
+                await self.loop.create_task(job.coro)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # discord.py's _run_event already reports errors
+                pass
+            finally:
+                self.processed += 1
+                self._busy.discard(key)
+                self._schedule(guild_id)
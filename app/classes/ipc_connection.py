@@ -1,14 +1,41 @@
 import asyncio
 import json
+import logging
 import pathlib
 import ssl
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
 
 import websockets
 
+from app.classes.ipc_serializers import Codec, available
+
 SSL_CONTEXT = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
 SSL_CONTEXT.load_verify_locations(pathlib.Path("localhost.pem"))
 
+# Commands sent to this cluster name are handled by the IPC server itself
+HUB = "IPC"
+
+# Seconds to wait between attempts to reconnect, doubling up to the max
+RECONNECT_DELAY = 1
+MAX_RECONNECT_DELAY = 60
+
+
+class Responses(list):
+    """The responses to a command, in the order they arrived.
+
+    `expected` is the number of clients the IPC server sent the command
+    to. If the timeout was reached before all of them answered,
+    `complete` is False and only the responses that arrived are
+    included."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.expected: Optional[int] = None
+
+    @property
+    def complete(self) -> bool:
+        return self.expected is not None and len(self) >= self.expected
+
 
 class WebsocketConnection:
     def __init__(
@@ -16,21 +43,54 @@ class WebsocketConnection:
         name: str,
         on_command: Callable[[Dict[str, Any]], Any],
         loop: Optional[asyncio.AbstractEventLoop] = None,
+        timeout: float = 5.0,
+        shard_ids: Optional[List[int]] = None,
+        shard_count: Optional[int] = None,
+        serializers: Optional[List[str]] = None,
+        compress_threshold: Optional[int] = None,
+        on_connect: Optional[Callable[[], Awaitable[None]]] = None,
     ):
         self.on_command = on_command
+        # Called each time the connection is (re)established
+        self.on_connect = on_connect
+        self.timeout = timeout
+        self.shard_ids = shard_ids or []
+        self.shard_count = shard_count
+        self.serializers = available(serializers)
+        self.compress_threshold = compress_threshold
+        # Replaced with the serializer the server picks in the handshake
+        self.codec = Codec()
 
-        self.callbacks: Dict[str, List[Dict[str, Any]]] = {}
+        self.callbacks: Dict[str, Responses] = {}
+        self._waiters: Dict[str, asyncio.Future] = {}
         self.current_callback = 0
+        # Commands being handled, so they aren't garbage collected
+        self._handlers: Set[asyncio.Task] = set()
 
         self.websocket: Optional[websockets.WebSocketCommonProtocol] = None
         self.loop = loop or asyncio.get_event_loop()
         self.task = None
 
         self.name_id = name
+        self.log = logging.getLogger(f"Cluster#{name}")
 
     async def send_command(
-        self, name: str, data: Dict[Any, Any], expect_resp: bool = False
-    ) -> Optional[List[Dict[str, Any]]]:
+        self,
+        name: str,
+        data: Dict[Any, Any],
+        expect_resp: bool = False,
+        timeout: Optional[float] = None,
+        cluster: Optional[str] = None,
+        guild_id: Optional[int] = None,
+        shard_id: Optional[int] = None,
+    ) -> Optional[Responses]:
+        """Sends a command to the cluster with the given name, the cluster
+        running the given guild or shard, or, if no target is given, to
+        every connected client including this one.
+
+        If expect_resp is True, waits until every client the command was
+        sent to has responded, or until `timeout` seconds (defaults to
+        self.timeout) have passed, and returns the responses."""
         if not self.websocket:
             raise Exception("Websocket not initialized.")
 
@@ -39,47 +99,74 @@ class WebsocketConnection:
             "name": name,
             "respond": expect_resp,
             "callback": self._next_callback() if expect_resp else None,
+            "target": self._target(cluster, guild_id, shard_id),
             "data": data,
             "author": self.name_id,
         }
 
+        callback = to_send["callback"]
+        responses = Responses()
         if expect_resp:
-            self.callbacks[to_send["callback"]] = []
+            self.callbacks[callback] = responses
+            self._waiters[callback] = self.loop.create_future()
 
         try:
-            await self.websocket.send(json.dumps(to_send).encode("utf-8"))
+            await self.websocket.send(self.codec.encode(to_send))
+            if expect_resp:
+                await asyncio.wait_for(
+                    self._waiters[callback],
+                    timeout if timeout is not None else self.timeout,
+                )
+        except asyncio.TimeoutError:
+            pass
         except websockets.ConnectionClosed as exc:
-            if exc.code == 1000:
-                return None
-            raise
+            if exc.code != 1000:
+                raise
+        finally:
+            self.callbacks.pop(callback, None)
+            self._waiters.pop(callback, None)
 
         if expect_resp:
-            await asyncio.sleep(0.1)
-            return self.callbacks.pop(to_send["callback"])
+            return responses
         return None
 
-    async def send_response(self, callback: int, data: Any) -> None:
+    async def send_response(self, to: str, callback: str, data: Any) -> None:
         if not self.websocket:
             raise Exception("Websocket not initialized.")
 
         to_send = {
             "type": "response",
+            "to": to,
             "callback": callback,
             "data": data,
             "author": self.name_id,
         }
 
         try:
-            await self.websocket.send(json.dumps(to_send).encode("utf-8"))
+            await self.websocket.send(self.codec.encode(to_send))
         except websockets.ConnectionClosed as exc:
             if exc.code == 1000:
                 return
             raise
 
     async def handle_command(self, msg: Dict[str, Any]):
-        resp = await self.on_command(msg)
-        if msg["respond"] and resp:
-            await self.send_response(msg["callback"], resp)
+        # Always respond when a response is expected, even if the command
+        # failed, so that the sender doesn't wait for the timeout.
+        resp = None
+        try:
+            resp = await self.on_command(msg)
+        finally:
+            if msg["respond"]:
+                await self.send_response(msg["author"], msg["callback"], resp)
+
+    def _resolve(self, callback: str) -> None:
+        waiter = self._waiters.get(callback)
+        if (
+            waiter is not None
+            and not waiter.done()
+            and self.callbacks[callback].complete
+        ):
+            waiter.set_result(None)
 
     async def recv_loop(self):
         if not self.websocket:
@@ -91,31 +178,99 @@ class WebsocketConnection:
             except websockets.ConnectionClosed as exc:
                 if exc.code == 1000:
                     return
-                raise
+                # The IPC server restarted or the connection dropped
+                self.loop.create_task(self.reconnect())
+                return
 
-            msg: Dict[str, Any] = json.loads(msg)
+            msg: Dict[str, Any] = self.codec.decode(msg)
 
+            if msg["type"] == "ack":
+                # The server tells us how many clients it sent our command
+                # to, so that we know how many responses to wait for.
+                if msg["callback"] in self.callbacks:
+                    self.callbacks[msg["callback"]].expected = msg[
+                        "recipients"
+                    ]
+                    self._resolve(msg["callback"])
+                continue
             if msg["type"] == "response":
                 if msg["callback"] in self.callbacks:
                     self.callbacks[msg["callback"]].append(msg)
+                    self._resolve(msg["callback"])
                 continue
 
-            await self.loop.create_task(self.handle_command(msg))
+            # Handled in the background, so that a command that sends
+            # its own command can still receive the ack and responses
+            task = self.loop.create_task(self.handle_command(msg))
+            self._handlers.add(task)
+            task.add_done_callback(self._command_done)
 
     async def ensure_connection(self):
         self.websocket = await websockets.connect(
             "wss://localhost:4000", ssl=SSL_CONTEXT
         )
-        await self.websocket.send(self.name_id.encode("utf-8"))
-        await self.websocket.recv()
+        await self.websocket.send(
+            json.dumps(
+                {
+                    "name": self.name_id,
+                    "shard_ids": self.shard_ids,
+                    "shard_count": self.shard_count,
+                    "serializers": self.serializers,
+                    "compress_threshold": self.compress_threshold,
+                }
+            ).encode("utf-8")
+        )
+        resp = json.loads(await self.websocket.recv())
+        self.codec = Codec(
+            resp.get("serializer", "json"), self.compress_threshold
+        )
 
         self.task = self.loop.create_task(self.recv_loop())
         self.task.add_done_callback(self._done_callback)
 
+        if self.on_connect is not None:
+            self.loop.create_task(self.on_connect())
+
+    async def reconnect(self) -> None:
+        delay = RECONNECT_DELAY
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.ensure_connection()
+            except (OSError, websockets.WebSocketException):
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+            else:
+                return
+
     def _next_callback(self) -> str:
         self.current_callback += 1
         return str(self.current_callback)
 
+    @staticmethod
+    def _target(
+        cluster: Optional[str],
+        guild_id: Optional[int],
+        shard_id: Optional[int],
+    ) -> Optional[Dict[str, Any]]:
+        if cluster is not None:
+            return {"cluster": cluster}
+        if guild_id is not None:
+            return {"guild": guild_id}
+        if shard_id is not None:
+            return {"shard": shard_id}
+        return None
+
+    def _command_done(self, task: asyncio.Task) -> None:
+        self._handlers.discard(task)
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            self.log.error(
+                "Error handling IPC command",
+                exc_info=(type(exc), exc, exc.__traceback__),
+            )
+
     @staticmethod
     def _done_callback(task: asyncio.Task):
         try:
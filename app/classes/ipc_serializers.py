@@ -0,0 +1,162 @@
+import json
+import zlib
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+import msgpack
+import ujson
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Every frame starts with one of these, followed by the serialized message
+RAW = b"\x00"
+ZLIB = b"\x01"
+
+
+class Serializer(NamedTuple):
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+
+SERIALIZERS: Dict[str, Serializer] = {}
+
+
+def register(
+    name: str, dumps: Callable[[Any], bytes], loads: Callable[[bytes], Any]
+) -> None:
+    SERIALIZERS[name] = Serializer(name, dumps, loads)
+
+
+register("json", lambda o: json.dumps(o).encode("utf-8"), json.loads)
+register("ujson", lambda o: ujson.dumps(o).encode("utf-8"), ujson.loads)
+register(
+    "msgpack",
+    msgpack.packb,
+    lambda b: msgpack.unpackb(b, strict_map_key=False),
+)
+if orjson is not None:
+    register("orjson", orjson.dumps, orjson.loads)
+
+# Fastest first. Clients offer these in the handshake and the IPC server
+# picks the first one it also has.
+PREFERENCE = ["msgpack", "orjson", "ujson", "json"]
+
+
+def available(preference: Optional[Iterable[str]] = None) -> list:
+    return [n for n in (preference or PREFERENCE) if n in SERIALIZERS]
+
+
+def negotiate(offered: Iterable[str]) -> str:
+    for name in offered:
+        if name in SERIALIZERS:
+            return name
+    return "json"
+
+
+class Codec:
+    """Turns IPC messages into frames and back. Messages larger than
+    `compress_threshold` bytes (if set) are compressed with zlib."""
+
+    def __init__(
+        self,
+        serializer: str = "json",
+        compress_threshold: Optional[int] = None,
+        level: int = 6,
+    ) -> None:
+        self.serializer = SERIALIZERS[serializer]
+        self.compress_threshold = compress_threshold
+        self.level = level
+
+    @property
+    def key(self) -> Tuple[str, Optional[int]]:
+        """Codecs with the same key produce the same frames."""
+        return (self.serializer.name, self.compress_threshold)
+
+    def encode(self, msg: Any) -> bytes:
+        data = self.serializer.dumps(msg)
+        if (
+            self.compress_threshold is not None
+            and len(data) > self.compress_threshold
+        ):
+            return ZLIB + zlib.compress(data, self.level)
+        return RAW + data
+
+    def decode(self, frame: bytes) -> Any:
+        if frame[:1] == ZLIB:
+            return self.serializer.loads(zlib.decompress(frame[1:]))
+        return self.serializer.loads(frame[1:])
+
+
+def _benchmark(rounds: int = 2000) -> None:
+    import time
+
+    payloads = {
+        "command": {
+            "type": "command",
+            "name": "guild_channels",
+            "respond": True,
+            "callback": "1",
+            "target": {"guild": 725336160112738385},
+            "data": {"guild_id": 725336160112738385},
+            "author": "Alpha (0)",
+        },
+        "mutual_guilds": {
+            "type": "response",
+            "to": "Dashboard",
+            "callback": "2",
+            "data": [725336160112738385 + i for i in range(200)],
+            "author": "Alpha (0)",
+        },
+        "guild_channels": {
+            "type": "response",
+            "to": "Dashboard",
+            "callback": "3",
+            "data": {
+                f"Category {c}": {
+                    str(725336160112738385 + c * 50 + i): f"channel-{i}"
+                    for i in range(50)
+                }
+                for c in range(10)
+            },
+            "author": "Alpha (0)",
+        },
+    }
+
+    codecs = []
+    for name in available():
+        codecs.append(Codec(name))
+        codecs.append(Codec(name, compress_threshold=1024))
+
+    print(
+        f"{'payload':<16}{'codec':<16}{'bytes':>8}"
+        f"{'encode us':>12}{'decode us':>12}{'msgs/s':>10}"
+    )
+    for payload_name, payload in payloads.items():
+        for codec in codecs:
+            frame = codec.encode(payload)
+
+            s = time.perf_counter()
+            for _ in range(rounds):
+                codec.encode(payload)
+            encode = (time.perf_counter() - s) / rounds
+
+            s = time.perf_counter()
+            for _ in range(rounds):
+                codec.decode(frame)
+            decode = (time.perf_counter() - s) / rounds
+
+            label = codec.serializer.name
+            if codec.compress_threshold is not None:
+                label += "+zlib"
+            print(
+                f"{payload_name:<16}{label:<16}{len(frame):>8}"
+                f"{encode * 1e6:>12.1f}{decode * 1e6:>12.1f}"
+                f"{int(1 / (encode + decode)):>10}"
+            )
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import sys
+from typing import Dict, Iterable, List, Optional, Set
+
+WORKER_MODULE = "app.classes.regex_worker"
+# Workers stop matches that run over the time limit themselves. This is
+# how much longer to wait on a worker before deciding it's stuck and
+# restarting it.
+HUNG_WORKER_TIMEOUT = 2.0
+
+
+class RegexTimeout:
+    """Returned instead of a result for patterns that took too long."""
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __repr__(self) -> str:
+        return "TIMEOUT"
+
+
+TIMEOUT = RegexTimeout()
+
+
+class RegexWorker:
+    def __init__(self) -> None:
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.restarts = 0
+        # patterns to drop from this worker's cache with the next request
+        self.forget: Set[str] = set()
+
+        self.pattern_hits = 0
+        self.pattern_misses = 0
+        self.compile_time = 0.0
+
+    async def start(self) -> None:
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            WORKER_MODULE,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+        )
+        await self.process.stdout.readline()
+
+    def kill(self) -> None:
+        if self.process is not None and self.process.returncode is None:
+            self.process.kill()
+        self.process = None
+        # A new process starts with an empty cache
+        self.forget.clear()
+
+    async def run(
+        self, string: str, patterns: List[str], max_time: float
+    ) -> List[object]:
+        """Matches each pattern against the string. A pattern that takes
+        longer than max_time to match gives TIMEOUT. If the process stops
+        answering, it's killed, that pattern's result is TIMEOUT, and the
+        remaining patterns are run on a new process."""
+        results: List[object] = []
+        while len(results) < len(patterns):
+            if self.process is None or self.process.returncode is not None:
+                await self.start()
+            remaining = patterns[len(results) :]
+            request = {
+                "string": string,
+                "patterns": remaining,
+                "forget": list(self.forget),
+                "max_time": max_time,
+            }
+            self.forget.clear()
+            try:
+                self.process.stdin.write(json.dumps(request).encode() + b"\n")
+                await self.process.stdin.drain()
+                for _ in remaining:
+                    line = await asyncio.wait_for(
+                        self.process.stdout.readline(),
+                        max_time + HUNG_WORKER_TIMEOUT,
+                    )
+                    result, compile_time = json.loads(line)
+                    if result == "timeout":
+                        result = TIMEOUT
+                    if compile_time is None:
+                        self.pattern_hits += 1
+                    else:
+                        self.pattern_misses += 1
+                        self.compile_time += compile_time
+                    results.append(result)
+            except asyncio.TimeoutError:
+                self.kill()
+                self.restarts += 1
+                results.append(TIMEOUT)
+            except BaseException:
+                # The process may still be writing results for this
+                # request, so it can't be reused
+                self.kill()
+                raise
+        return results
+
+
+class RegexEngine:
+    """Matches user supplied regexes in worker processes, so that they
+    can't block the event loop. A match that takes longer than `max_time`
+    seconds is stopped by the worker, and a worker that stops answering
+    is restarted.
+
+    Each worker keeps its own cache of compiled patterns."""
+
+    def __init__(self, processes: int = 2, max_time: float = 0.01) -> None:
+        self.max_time = max_time
+        self.workers = [RegexWorker() for _ in range(processes)]
+        self._idle: "asyncio.Queue[RegexWorker]" = asyncio.Queue()
+        for worker in self.workers:
+            self._idle.put_nowait(worker)
+
+        self.searches = 0
+        self.timeouts = 0
+
+    async def search_many(
+        self, string: str, patterns: Iterable[str]
+    ) -> Dict[str, object]:
+        """Matches several patterns against one string in a single call.
+
+        Returns pattern: result, where the result is True or False, None
+        if the pattern is invalid, or TIMEOUT."""
+        unique = list(dict.fromkeys(p for p in patterns if p))
+        if not unique:
+            return {}
+
+        worker = await self._idle.get()
+        try:
+            results = await worker.run(string, unique, self.max_time)
+        finally:
+            self._idle.put_nowait(worker)
+
+        self.searches += len(unique)
+        self.timeouts += sum(1 for r in results if r is TIMEOUT)
+        return dict(zip(unique, results))
+
+    async def search(self, string: str, pattern: str) -> object:
+        return (await self.search_many(string, [pattern]))[pattern]
+
+    def forget(self, pattern: str) -> None:
+        """Drops a pattern from the workers' caches, for when a starboard
+        or AutoStar channel stops using it."""
+        for worker in self.workers:
+            if worker.process is not None:
+                worker.forget.add(pattern)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "searches": self.searches,
+            "timeouts": self.timeouts,
+            "restarts": sum(w.restarts for w in self.workers),
+            "pattern_hits": sum(w.pattern_hits for w in self.workers),
+            "pattern_misses": sum(w.pattern_misses for w in self.workers),
+            "compile_time": sum(w.compile_time for w in self.workers),
+        }
+
+    def close(self) -> None:
+        for worker in self.workers:
+            worker.kill()
@@ -0,0 +1,88 @@
+"""Runs user regexes for RegexEngine in a separate process, so that a
+slow pattern can be killed without touching the bot's event loop.
+
+Reads one JSON request per line from stdin:
+    {"string": "...", "patterns": ["...", ...], "forget": ["...", ...],
+     "max_time": 0.01}
+and writes one line to stdout per pattern, as soon as it's matched:
+    [result, compile_time]
+where result is true, false, null if the pattern is invalid, or
+"timeout" if matching took longer than max_time seconds, and
+compile_time is the seconds spent compiling the pattern, or null if it
+was already compiled. Patterns in "forget" are dropped from the cache
+first."""
+import json
+import re
+import signal
+import sys
+import time
+from typing import Optional, Pattern, Tuple
+
+from app.classes.lru_cache import LRUCache
+
+PATTERNS = LRUCache(1024)
+TIMEOUT = "timeout"
+
+
+class MatchTimeout(Exception):
+    pass
+
+
+def _alarm(signum, frame) -> None:
+    raise MatchTimeout
+
+
+def compile_pattern(pattern: str) -> Tuple[Optional[Pattern], Optional[float]]:
+    if pattern in PATTERNS:
+        return PATTERNS.get(pattern), None
+    start = time.perf_counter()
+    try:
+        compiled = re.compile(pattern)
+    except re.error:
+        compiled = None
+    PATTERNS.set(pattern, compiled)
+    return compiled, time.perf_counter() - start
+
+
+def search(compiled: Pattern, string: str, max_time: float) -> object:
+    """Only the search itself counts against max_time, not compiling or
+    the time spent getting the request here."""
+    try:
+        signal.setitimer(signal.ITIMER_REAL, max_time)
+        try:
+            result = bool(compiled.search(string))
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    except MatchTimeout:
+        return TIMEOUT
+    return result
+
+
+def main() -> None:
+    signal.signal(signal.SIGALRM, _alarm)
+
+    # Lets RegexEngine know that startup is done, so it isn't counted
+    # against the first match's deadline
+    sys.stdout.write("ready\n")
+    sys.stdout.flush()
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        for pattern in request.get("forget", []):
+            PATTERNS.delete(pattern)
+
+        string = request["string"]
+        max_time = request["max_time"]
+        for pattern in request["patterns"]:
+            compiled, compile_time = compile_pattern(pattern)
+            result = (
+                None
+                if compiled is None
+                else search(compiled, string, max_time)
+            )
+            sys.stdout.write(json.dumps([result, compile_time]) + "\n")
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
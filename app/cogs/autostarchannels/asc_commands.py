@@ -53,7 +53,7 @@ class AutoStarChannels(
                 color=self.bot.theme_color,
             )
             for asc in aschannels:
-                c = ctx.guild.get_channel(int(asc["id"]))
+                c = ctx.guild.get_channel(asc["id"])
                 emoji_str = utils.pretty_emoji_string(asc["emojis"], ctx.guild)
                 embed.add_field(
                     name=c or f"Deleted Channel {asc['id']}",
@@ -1,19 +1,23 @@
-import re
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import discord
 
 from app import utils
 from app.classes.bot import Bot
+from app.classes.regex_engine import TIMEOUT
 from app.i18n import t_
 
 
 async def try_regex(
-    bot: Bot, message: discord.Message, pattern: str
-) -> Optional[re.Match]:
-    try:
-        result = utils.safe_regex(message.system_content, pattern)
-    except TimeoutError:
+    bot: Bot, message: discord.Message, patterns: List[str]
+) -> Dict[str, Optional[bool]]:
+    """Returns pattern: True or False, or None if the pattern is invalid
+    or took too long to match."""
+    results = await bot.regex.search_many(message.system_content, patterns)
+    for pattern, result in results.items():
+        if result is not TIMEOUT:
+            continue
+        results[pattern] = None
         async with bot.temp_locale(message.guild):
             bot.dispatch(
                 "guild_log",
@@ -23,11 +27,10 @@ async def try_regex(
                     "Try improving the efficiency of your regex, and "
                     "feel free to join the support server for help."
                 ).format(pattern, message),
+                "error",
+                message.guild,
             )
-        return True
-    if result is not None:
-        return True
-    return False
+    return results
 
 
 async def is_valid(
@@ -40,13 +43,16 @@ async def is_valid(
         return False, t_("Messages must be at least {0} characters").format(
             aschannel["min_chars"]
         )
+    results = await try_regex(
+        bot, message, [aschannel["regex"], aschannel["exclude_regex"]]
+    )
     if aschannel["regex"]:
-        if not await try_regex(bot, message, aschannel["regex"]):
+        if results.get(aschannel["regex"]) is False:
             return False, t_("Messages must match `{0}`").format(
                 aschannel["regex"]
             )
     if aschannel["exclude_regex"]:
-        if not await try_regex(bot, message, aschannel["exclude_regex"]):
+        if results.get(aschannel["exclude_regex"]) is True:
             return False, t_("Messages must not match `{0}`").format(
                 aschannel["exclude_regex"]
             )
@@ -6,6 +6,7 @@ from discord.ext import tasks
 
 from app import commands
 from app.cogs.permroles import pr_functions
+from app.database.queries import XPROLES_NOT_REACHED, XPROLES_REACHED
 from app.i18n import t_
 
 if TYPE_CHECKING:
@@ -82,23 +83,18 @@ class XPREvents(commands.Cog):
                     member.id, member.guild.id
                 )
                 to_add = [
-                    int(r["role_id"])
+                    r["role_id"]
                     for r in await self.bot.db.fetch(
-                        """SELECT * FROM xproles
-                        WHERE guild_id=$1
-                        AND required <= $2
-                        ORDER BY required DESC""",
+                        XPROLES_REACHED,
                         gid,
                         sql_member["xp"],
                     )
                 ]
                 sql_guild = await self.bot.db.guilds.get(guild.id)
                 to_remove = [
-                    int(r["role_id"])
+                    r["role_id"]
                     for r in await self.bot.db.fetch(
-                        """SELECT * FROM xproles
-                        WHERE guild_id=$1
-                        AND required > $2""",
+                        XPROLES_NOT_REACHED,
                         gid,
                         sql_member["xp"],
                     )
@@ -111,15 +107,8 @@ class XPREvents(commands.Cog):
             else:
                 to_add = []
                 to_remove = [
-                    int(r["role_id"])
-                    for r in (
-                        await self.bot.db.execute(
-                            """SELECT * FROM xproles
-                        WHERE guild_id=$1""",
-                            gid,
-                        )
-                        or []
-                    )
+                    r["role_id"]
+                    for r in await self.bot.db.xproles.get_many(gid)
                 ]
             t = asyncio.create_task(set_xp_roles(to_add, to_remove, member))
             tasks.append(t)
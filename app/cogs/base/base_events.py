@@ -257,7 +257,7 @@ class BaseEvents(commands.Cog):
         sql_guild = await self.bot.db.guilds.get(guild.id)
         if sql_guild["log_channel"] is None:
             return
-        log_channel = guild.get_channel(int(sql_guild["log_channel"]))
+        log_channel = guild.get_channel(sql_guild["log_channel"])
         if not log_channel:
             return
 
@@ -276,7 +276,7 @@ class BaseEvents(commands.Cog):
         sql_guild = await self.bot.db.guilds.get(guild.id)
         if sql_guild["level_channel"] is None:
             return
-        level_channel = guild.get_channel(int(sql_guild["level_channel"]))
+        level_channel = guild.get_channel(sql_guild["level_channel"])
         if not level_channel:
             return
         embed = discord.Embed(
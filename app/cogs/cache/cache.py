@@ -1,13 +1,18 @@
-from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import discord
 from aiocache import Cache as MemCache
 from aiocache import SimpleMemoryCache
 
-from app import utils
+import config
 from app.classes.bot import Bot
+from app.classes.lru_cache import LRUCache
 from app.constants import MISSING
 
+from .embed_cache import EmbedCache
+from .member_resolver import MemberResolver
+
 
 def cached(  # for future use
     namespace: str,
@@ -41,19 +46,54 @@ def cached(  # for future use
 
 class Cache:
     def __init__(self, bot) -> None:
-        self.messages: SimpleMemoryCache = MemCache(
-            namespace="messages", ttl=10
+        # Kept up to date by CacheEvents, so entries can live for a while
+        self.messages = LRUCache(
+            config.MESSAGE_CACHE_SIZE, ttl=config.MESSAGE_CACHE_TTL
         )
         self.bot = bot
         self.users: SimpleMemoryCache = MemCache(namespace="users", ttl=10)
 
+        self.members = MemberResolver()
+        self.embeds = EmbedCache(config.EMBED_CACHE_SIZE)
+
+        # Requests that are currently in flight, so that concurrent calls
+        # for the same thing wait on one request instead of each making
+        # their own.
+        self._inflight: Dict[Tuple[Any, ...], asyncio.Future] = {}
+
+    def _track(self, keys: List[Tuple[Any, ...]], fut: asyncio.Future):
+        for key in keys:
+            self._inflight[key] = fut
+
+        def _done(_):
+            for key in keys:
+                if self._inflight.get(key) is fut:
+                    self._inflight.pop(key)
+
+        fut.add_done_callback(_done)
+
+    def _single_flight(
+        self, key: Tuple[Any, ...], coro_func: Callable[[], Awaitable[Any]]
+    ) -> Awaitable[Any]:
+        fut = self._inflight.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(coro_func())
+            self._track([key], fut)
+        # shielded so that one caller being cancelled doesn't cancel the
+        # request for everyone else
+        return asyncio.shield(fut)
+
     async def fetch_user(self, user_id: int) -> discord.User:
         cached = await self.users.get(user_id)
         if cached:
             return cached
-        user = await self.bot.fetch_user(user_id)
-        await self.users.set(user_id, user)
-        return user
+
+        async def _fetch() -> discord.User:
+            user = await self.bot.fetch_user(user_id)
+            await self.users.set(user_id, user)
+            return user
+
+        return await self._single_flight(("user", user_id), _fetch)
 
     async def get_members(
         self, uids: List[int], guild: discord.Guild
@@ -69,19 +109,19 @@ class Cache:
             else:
                 not_found.append(uid)
 
-        # only query 50 members at a time
-        for group in utils.chunk_list(not_found, 50):
-            query = await guild.query_members(limit=None, user_ids=group)
-            for r in query:
-                result[r.id] = r
+        if not_found:
+            result.update(await self.members.resolve(guild, not_found))
 
         return result
 
     async def fetch_message(
         self, guild_id: int, channel_id: int, message_id: int
     ) -> Optional[discord.Message]:
-        cached = await self.messages.get(message_id)
-        if not cached:
+        cached = self.messages.get(message_id)
+        if cached:
+            return cached if cached is not MISSING else None
+
+        async def _fetch() -> Optional[discord.Message]:
             guild = self.bot.get_guild(guild_id)
             if not guild:
                 return None
@@ -92,9 +132,16 @@ class Cache:
                 message = await channel.fetch_message(message_id)
             except discord.errors.NotFound:
                 message = None
-            await self.messages.set(message_id, message or MISSING)
+            self.messages.set(message_id, message or MISSING)
             return message
-        return cached if cached is not MISSING else None
+
+        return await self._single_flight(("message", message_id), _fetch)
+
+    def get_message(self, message_id: int) -> Optional[discord.Message]:
+        """Returns a cached message without fetching it or counting
+        towards the cache stats."""
+        message = self.messages.peek(message_id)
+        return message if message is not MISSING else None
 
 
 def setup(bot: Bot) -> None:
@@ -1,3 +1,5 @@
+from typing import Union
+
 import discord
 
 from app import commands
@@ -14,7 +16,7 @@ class CacheEvents(commands.Cog):
     ) -> None:
         if not payload.guild_id:
             return
-        await self.bot.cache.messages.delete(payload.message_id)
+        self.bot.cache.messages.delete(payload.message_id)
 
     @commands.Cog.listener()
     async def on_raw_bulk_message_delete(
@@ -23,7 +25,74 @@ class CacheEvents(commands.Cog):
         if not payload.guild_id:
             return
         for mid in payload.message_ids:
-            await self.bot.cache.messages.delete(mid)
+            self.bot.cache.messages.delete(mid)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member) -> None:
+        self.bot.cache.members.forget(member.guild.id, member.id)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(
+        self, payload: discord.RawMessageUpdateEvent
+    ) -> None:
+        message = self.bot.cache.get_message(payload.message_id)
+        if message is None:
+            return
+        try:
+            message._update(payload.data)
+        except Exception:
+            # Partial or unexpected data; refetch it next time instead.
+            self.bot.cache.messages.delete(payload.message_id)
+
+    def _emoji(
+        self, emoji: discord.PartialEmoji
+    ) -> Union[str, discord.Emoji, discord.PartialEmoji]:
+        # The same conversion discord.py does before storing reactions
+        if emoji.is_unicode_emoji():
+            return emoji.name
+        return self.bot.get_emoji(emoji.id) or emoji
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(
+        self, payload: discord.RawReactionActionEvent
+    ) -> None:
+        message = self.bot.cache.get_message(payload.message_id)
+        if message is None:
+            return
+        message._add_reaction(
+            {"me": False}, self._emoji(payload.emoji), payload.user_id
+        )
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(
+        self, payload: discord.RawReactionActionEvent
+    ) -> None:
+        message = self.bot.cache.get_message(payload.message_id)
+        if message is None:
+            return
+        try:
+            message._remove_reaction(
+                {}, self._emoji(payload.emoji), payload.user_id
+            )
+        except ValueError:
+            # We never saw it being added
+            self.bot.cache.messages.delete(payload.message_id)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_clear(
+        self, payload: discord.RawReactionClearEvent
+    ) -> None:
+        message = self.bot.cache.get_message(payload.message_id)
+        if message is not None:
+            message.reactions = []
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_clear_emoji(
+        self, payload: discord.RawReactionClearEmojiEvent
+    ) -> None:
+        message = self.bot.cache.get_message(payload.message_id)
+        if message is not None:
+            message._clear_emoji(self._emoji(payload.emoji))
 
 
 def setup(bot: Bot) -> None:
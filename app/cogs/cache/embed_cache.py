@@ -0,0 +1,115 @@
+import hashlib
+from typing import Hashable, Optional, Tuple
+
+import discord
+
+from app.classes.lru_cache import LRUCache
+
+
+class EmbedCache:
+    """Remembers the embeds rendered for starboard messages, and which
+    one each starboard message was last edited to show.
+
+    Embeds are keyed by the original message's id and edited_at, along
+    with everything else that changes how it's rendered but doesn't
+    bump edited_at (the author, link previews and whether the channel
+    is NSFW) and the starboard's settings.
+
+    It also keeps a digest of everything each starboard message was last
+    edited to show, so that edits that wouldn't change anything can be
+    skipped."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.embeds = LRUCache(maxsize)
+        # starboard message id: key of the embed it shows
+        self.sent = LRUCache(maxsize)
+        # starboard message id: digest of its content and embed key
+        self.digests = LRUCache(maxsize)
+
+        self.renders = 0
+        self.content_only = 0
+        self.skipped = 0
+
+    @staticmethod
+    def key(
+        message: discord.Message, color: Optional[str], nicknames: bool
+    ) -> Tuple[Hashable, ...]:
+        author = message.author
+        if nicknames:
+            author_name = author.display_name
+        else:
+            author_name = f"{author.name}#{author.discriminator}"
+        return (
+            message.id,
+            message.edited_at,
+            author_name,
+            str(author.avatar_url),
+            tuple(repr(e.to_dict()) for e in message.embeds),
+            message.channel.is_nsfw(),
+            color,
+            nicknames,
+        )
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[discord.Embed]:
+        return self.embeds.get(key)
+
+    def set(self, key: Tuple[Hashable, ...], embed: discord.Embed) -> None:
+        self.renders += 1
+        self.embeds.set(key, embed)
+
+    def is_current(
+        self, starboard_message_id: int, key: Tuple[Hashable, ...]
+    ) -> bool:
+        """Whether the starboard message already shows this embed, in
+        which case only its content needs to be edited."""
+        if self.sent.get(starboard_message_id) == key:
+            self.content_only += 1
+            return True
+        return False
+
+    def mark_sent(
+        self, starboard_message_id: int, key: Tuple[Hashable, ...]
+    ) -> None:
+        self.sent.set(starboard_message_id, key)
+
+    @staticmethod
+    def digest(
+        content: str, key: Optional[Tuple[Hashable, ...]] = None
+    ) -> str:
+        """A digest of what a starboard message should show. `key` is
+        the key of its embed, or None if the embed isn't being edited.
+        The digest is the same in every process, so it can be stored."""
+        return hashlib.blake2b(
+            repr((content, key)).encode(), digest_size=16
+        ).hexdigest()
+
+    def is_unchanged(
+        self,
+        starboard_message_id: int,
+        digest: str,
+        stored: Optional[str] = None,
+    ) -> bool:
+        """Whether the last edit to the starboard message had the same
+        digest, so that this one can be skipped. `stored` is the digest
+        saved in the database, for messages that aren't in the cache."""
+        last = self.digests.get(starboard_message_id, stored)
+        if last == digest:
+            self.skipped += 1
+            return True
+        return False
+
+    def remember(
+        self, starboard_message_id: int, digest: Optional[str]
+    ) -> None:
+        """Remembers the digest of the last edit, or forgets it if
+        `digest` is None."""
+        if digest is None:
+            self.digests.delete(starboard_message_id)
+        else:
+            self.digests.set(starboard_message_id, digest)
+
+    def forget(self, starboard_message_id: int) -> None:
+        """Forgets what a starboard message shows, for when it's edited
+        some other way, so the next edit sends everything again."""
+        self.sent.delete(starboard_message_id)
+        self.digests.delete(starboard_message_id)
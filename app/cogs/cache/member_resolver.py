@@ -0,0 +1,119 @@
+import asyncio
+from typing import Dict, Iterable, List, Optional
+
+import discord
+
+from app import utils
+from app.classes.lru_cache import LRUCache
+
+# Discord returns at most 100 members per request guild members payload
+BATCH_SIZE = 100
+
+
+class MemberResolver:
+    """Collects member lookups for each guild over a few milliseconds and
+    resolves them with as few query_members calls as possible.
+
+    Ids that turn out not to be members are remembered for a while, so
+    that looking them up again doesn't cost another query."""
+
+    def __init__(
+        self,
+        window: float = 0.005,
+        negative_size: int = 10_000,
+        negative_ttl: float = 60 * 5,
+    ) -> None:
+        self.window = window
+        self.not_members = LRUCache(negative_size, ttl=negative_ttl)
+
+        # guild_id: {user_id: future}
+        self._pending: Dict[int, Dict[int, asyncio.Future]] = {}
+        self._inflight: Dict[int, Dict[int, asyncio.Future]] = {}
+        self._flushes: Dict[int, asyncio.TimerHandle] = {}
+
+        self.requested = 0
+        self.queries = 0
+
+    def forget(self, guild_id: int, user_id: int) -> None:
+        """Call this when a user joins a guild."""
+        self.not_members.delete((guild_id, user_id))
+
+    async def resolve(
+        self, guild: discord.Guild, uids: Iterable[int]
+    ) -> Dict[int, discord.Member]:
+        loop = asyncio.get_event_loop()
+        pending = self._pending.get(guild.id, {})
+        inflight = self._inflight.get(guild.id, {})
+
+        futures: Dict[int, asyncio.Future] = {}
+        for uid in uids:
+            if uid in futures or self.not_members.get((guild.id, uid)):
+                continue
+            self.requested += 1
+            fut = pending.get(uid) or inflight.get(uid)
+            if fut is None:
+                fut = loop.create_future()
+                pending[uid] = fut
+            futures[uid] = fut
+
+        if pending:
+            self._pending[guild.id] = pending
+            if len(pending) >= BATCH_SIZE:
+                self._flush(guild)
+            elif guild.id not in self._flushes:
+                self._flushes[guild.id] = loop.call_later(
+                    self.window, self._flush, guild
+                )
+
+        result: Dict[int, discord.Member] = {}
+        for uid, fut in futures.items():
+            # shielded so that one waiter being cancelled doesn't cancel
+            # the lookup for everyone else
+            member: Optional[discord.Member] = await asyncio.shield(fut)
+            if member is not None:
+                result[uid] = member
+        return result
+
+    def _flush(self, guild: discord.Guild) -> None:
+        handle = self._flushes.pop(guild.id, None)
+        if handle is not None:
+            handle.cancel()
+
+        pending = self._pending.pop(guild.id, {})
+        inflight = self._inflight.setdefault(guild.id, {})
+        inflight.update(pending)
+        for batch in utils.chunk_list(list(pending), BATCH_SIZE):
+            asyncio.ensure_future(
+                self._query(guild, batch, {u: pending[u] for u in batch})
+            )
+
+    async def _query(
+        self,
+        guild: discord.Guild,
+        uids: List[int],
+        futures: Dict[int, asyncio.Future],
+    ) -> None:
+        self.queries += 1
+        try:
+            members = await guild.query_members(limit=None, user_ids=uids)
+        except Exception as e:
+            for fut in futures.values():
+                if not fut.done():
+                    fut.set_exception(e)
+                # Nobody might be waiting any more
+                fut.exception()
+        else:
+            found = {m.id: m for m in members}
+            for uid, fut in futures.items():
+                member = found.get(uid)
+                if member is None:
+                    self.not_members.set((guild.id, uid), True)
+                if not fut.done():
+                    fut.set_result(member)
+        finally:
+            inflight = self._inflight.get(guild.id, {})
+            for uid, fut in futures.items():
+                if inflight.get(uid) is fut:
+                    inflight.pop(uid)
+            if not inflight:
+                self._inflight.pop(guild.id, None)
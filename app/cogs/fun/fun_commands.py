@@ -8,6 +8,12 @@ from app import commands, converters, flags, menus
 from app.classes.bot import Bot
 from app.classes.context import MyContext
 from app.cogs.starboard import starboard_funcs
+from app.database.queries import (
+    EXPLORE_STARBOARDS,
+    MEMBER_STAR_TOTALS,
+    MOST_STARRED,
+    RANDOM_CANDIDATES,
+)
 from app.i18n import t_
 
 from . import fun_funcs
@@ -99,8 +105,7 @@ class Fun(commands.Cog, description=t_("Fun commands for Starboard.", True)):
             stars_given = stars_recv = xp = level = 0
 
         total_stars, total_recv = await self.bot.db.fetchrow(
-            """SELECT SUM(stars_given), SUM(stars_received) FROM members
-            WHERE user_id=$1""",
+            MEMBER_STAR_TOTALS,
             user.id,
         )
 
@@ -153,9 +158,7 @@ class Fun(commands.Cog, description=t_("Fun commands for Starboard.", True)):
         all_starboards = [
             s["id"]
             for s in await self.bot.db.fetch(
-                """SELECT * FROM starboards
-                WHERE guild_id=$1
-                AND explore=True""",
+                EXPLORE_STARBOARDS,
                 ctx.guild.id,
             )
         ]
@@ -168,18 +171,7 @@ class Fun(commands.Cog, description=t_("Fun commands for Starboard.", True)):
             raise commands.BadArgument(t_("--place must be greater than 0"))
 
         messages = await self.bot.db.fetch(
-            """SELECT * FROM starboard_messages
-            WHERE starboard_id=any($1::numeric[])
-            AND ($2::numeric is NULL or starboard_id=$2::numeric)
-            AND EXISTS(
-                SELECT * FROM messages
-                WHERE id=orig_id
-                AND ($3::numeric is NULL or author_id=$3::numeric)
-                AND ($4::numeric is NULL or channel_id=$4::numeric)
-                AND trashed=False
-            )
-            AND ($5::smallint is NULL or points <= $5::smallint)
-            ORDER BY points DESC""",
+            MOST_STARRED,
             all_starboards,
             starboard_id,
             author_id,
@@ -193,8 +185,8 @@ class Fun(commands.Cog, description=t_("Fun commands for Starboard.", True)):
                 orig = await self.bot.db.messages.get(m["orig_id"])
                 obj = await self.bot.cache.fetch_message(
                     ctx.guild.id,
-                    int(orig["channel_id"]),
-                    int(orig["id"]),
+                    orig["channel_id"],
+                    orig["id"],
                 )
                 if not obj:
                     continue
@@ -255,26 +247,13 @@ class Fun(commands.Cog, description=t_("Fun commands for Starboard.", True)):
         all_starboards = [
             s["id"]
             for s in await self.bot.db.fetch(
-                """SELECT * FROM starboards
-                WHERE guild_id=$1
-                AND explore=True""",
+                EXPLORE_STARBOARDS,
                 ctx.guild.id,
             )
         ]
 
         good_messages = await self.bot.db.fetch(
-            """SELECT * FROM starboard_messages
-            WHERE starboard_id=any($1::numeric[])
-            AND ($2::numeric is NULL or starboard_id=$2::numeric)
-            AND ($3::smallint is NULL or points >= $3::smallint)
-            AND ($4::smallint is NULL or points <= $4::smallint)
-            AND EXISTS (
-                SELECT * FROM messages
-                WHERE id=orig_id
-                AND trashed=False
-                AND ($5::numeric is NULL or author_id=$5::numeric)
-                AND ($6::numeric is NULL or channel_id=$6::numeric)
-            )""",
+            RANDOM_CANDIDATES,
             all_starboards,
             starboard_id,
             options["minstars"],
@@ -345,9 +324,9 @@ class Fun(commands.Cog, description=t_("Fun commands for Starboard.", True)):
                 await ctx.send(t_("You cannot save a trashed message."))
                 return
             orig_message = await self.bot.cache.fetch_message(
-                int(orig_sql_message["guild_id"]),
-                int(orig_sql_message["channel_id"]),
-                int(orig_sql_message["id"]),
+                orig_sql_message["guild_id"],
+                orig_sql_message["channel_id"],
+                orig_sql_message["id"],
             )
             if not orig_message:
                 await ctx.send(
@@ -1,23 +1,20 @@
 import discord
 
 from app.classes.bot import Bot
+from app.database.queries import LEADERBOARD
 
 
 async def get_guild_leaderboard(bot: Bot, guild: discord.Guild) -> dict:
     leaderboard = {}
     top_users = await bot.db.fetch(
-        """SELECT * FROM members
-        WHERE guild_id=$1
-        AND xp > 0
-        ORDER BY xp DESC
-        LIMIT 200""",
+        LEADERBOARD,
         guild.id,
     )
-    uids = [int(u["user_id"]) for u in top_users]
+    uids = [u["user_id"] for u in top_users]
     user_lookup = await bot.cache.get_members(uids, guild)
     current_rank = 0
     for u in top_users:
-        obj = user_lookup.get(int(u["user_id"]))
+        obj = user_lookup.get(u["user_id"])
         if not obj:
             continue
         if obj.bot:
@@ -3,6 +3,13 @@ from typing import Optional
 from app import commands, cooldowns
 from app.classes.bot import Bot
 from app.cogs.permroles import pr_functions
+from app.database.queries import (
+    ADD_STARS_GIVEN,
+    ADD_STARS_RECEIVED,
+    ADD_XP,
+    LOCK_MEMBER,
+    SET_LEVEL,
+)
 
 from . import leveling_funcs
 
@@ -56,26 +63,26 @@ class LevelingEvents(commands.Cog):
         else:
             gain_xp = True
 
-        await self.bot.db.members.create(giver_id, guild_id)
-        sql_giver = await self.bot.db.members.get(giver_id, guild_id)
-        await self.bot.db.members.create(receiver_id, guild_id)
+        giver = _result[giver_id]
+        async with self.bot.db.session():
+            await self.bot.db.ensure_member(giver_id, giver.bot, guild_id)
+            await self.bot.db.ensure_member(
+                receiver_id, receiver.bot, guild_id
+            )
 
-        await self.bot.db.execute(
-            """UPDATE members SET stars_given = stars_given + $1
-            WHERE user_id=$2 AND guild_id=$3""",
-            points,
-            sql_giver["user_id"],
-            sql_giver["guild_id"],
-        )
+            await self.bot.db.execute(
+                ADD_STARS_GIVEN,
+                points,
+                giver_id,
+                guild_id,
+            )
 
-        await self.bot.db.execute(
-            """UPDATE members
-            SET stars_received = stars_received + $1
-            WHERE user_id=$2 AND guild_id=$3""",
-            points,
-            receiver_id,
-            guild_id,
-        )
+            await self.bot.db.execute(
+                ADD_STARS_RECEIVED,
+                points,
+                receiver_id,
+                guild_id,
+            )
 
         if not gain_xp:
             return
@@ -93,27 +100,23 @@ class LevelingEvents(commands.Cog):
             if retry_after:
                 return
 
-        async with self.bot.db.pool.acquire() as con:
-            await con.execute(
-                """UPDATE members
-                SET xp = xp + $1
-                WHERE user_id=$2 AND guild_id=$3""",
+        async with self.bot.db.transaction():
+            await self.bot.db.execute(
+                ADD_XP,
                 points,
                 receiver_id,
                 guild_id,
             )
-            sql_receiver = await con.fetchrow(
-                """SELECT * FROM members WHERE user_id=$1
-                AND guild_id=$2 FOR UPDATE""",
+            sql_receiver = await self.bot.db.fetchrow(
+                LOCK_MEMBER,
                 receiver_id,
                 guild_id,
             )
             new_level = leveling_funcs.current_level(sql_receiver["xp"])
             if new_level > sql_receiver["level"]:
                 leveled_up = new_level
-                await con.execute(
-                    """UPDATE members SET level=$1
-                    WHERE user_id=$2 AND guild_id=$3""",
+                await self.bot.db.execute(
+                    SET_LEVEL,
                     new_level,
                     receiver_id,
                     guild_id,
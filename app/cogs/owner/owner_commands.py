@@ -13,6 +13,8 @@ from jishaku.features.baseclass import Feature
 from app import checks, commands, menus, utils
 from app.classes.bot import Bot
 from app.classes.context import MyContext
+from app.database import index_advisor
+from app.database.queries import REGISTRY
 
 
 class Rollback(Exception):
@@ -88,7 +90,11 @@ class Owner(*OPTIONAL_FEATURES, *STANDARD_FEATURES):
                     "eval", {"content": body}, expect_resp=True
                 )
 
-        msgs = "\n".join([f"{m['author']}: {m['data']}" for m in _msgs])
+        msgs = "\n".join(
+            [f"{m['author']}: {m['data']}" for m in _msgs if m["data"]]
+        )
+        if not _msgs.complete:
+            msgs += "\nSome clusters didn't respond in time."
         pag = commands.Paginator(max_size=1985, prefix="```py")
         for line in msgs.split("\n"):
             pag.add_line(line)
@@ -180,10 +186,15 @@ class Owner(*OPTIONAL_FEATURES, *STANDARD_FEATURES):
                 return t[1][2]
 
         times.sort(key=sorter, reverse=True)
-        for sql, exec_time in times:
+        for key, exec_time in times:
+            named = REGISTRY.get(key)
+            header = (
+                f"**{key}**```sql\n{named.sql}```"
+                if named
+                else f"```sql\n{key}```"
+            )
             pag.add_line(
-                f"```sql\n{sql}```"
-                f"{utils.ms(exec_time[0])} MS AVG | "
+                header + f"{utils.ms(exec_time[0])} MS AVG | "
                 f"{round(exec_time[1], 2)} SECONDS TOTAL | "
                 f"{exec_time[2]} EXECUTIONS\n"
             )
@@ -193,6 +204,122 @@ class Owner(*OPTIONAL_FEATURES, *STANDARD_FEATURES):
             delete_after=True,
         ).start(ctx)
 
+    @commands.command(name="indexadvisor")
+    @checks.is_owner()
+    async def get_index_advice(
+        self, ctx: "MyContext", min_rows: int = index_advisor.MIN_ROWS
+    ) -> None:
+        """Flags queries that sequentially scan large tables"""
+        async with ctx.typing():
+            scans = await index_advisor.find_seq_scans(self.bot.db, min_rows)
+        if not scans:
+            await ctx.send("No sequential scans on large tables found.")
+            return
+
+        pag = commands.Paginator(prefix="", suffix="", max_size=1000)
+        for scan in scans:
+            pag.add_line(
+                f"**{scan.key}**```sql\n{scan.sql}```"
+                f"Seq Scan on `{scan.table}` (~{scan.rows} rows) | "
+                f"{round(scan.total_time, 2)} SECONDS TOTAL | "
+                f"{scan.executions} EXECUTIONS\n"
+            )
+
+        await menus.Paginator(
+            text_pages=pag.pages,
+            delete_after=True,
+        ).start(ctx)
+
+    @commands.command(name="cachestats")
+    @checks.is_owner()
+    async def get_cache_stats(self, ctx: "MyContext") -> None:
+        """Shows stats on this cluster's caches"""
+        stats = self.bot.cache.messages.stats()
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = round(stats["hits"] / lookups * 100, 1) if lookups else 0
+        lines = [
+            f"Messages: {stats['size']}/{stats['maxsize']}",
+            f"Hits: {stats['hits']} ({hit_rate}%)",
+            f"Misses: {stats['misses']}",
+            f"Evictions: {stats['evictions']}",
+            f"Expirations: {stats['expirations']}",
+        ]
+
+        members = self.bot.cache.members
+        not_members = members.not_members.stats()
+        lines += [
+            "",
+            f"Members requested: {members.requested}",
+            f"Member queries: {members.queries}",
+            f"Known non-members: {not_members['size']}",
+            f"Non-member hits: {not_members['hits']}",
+        ]
+
+        embeds = self.bot.cache.embeds
+        lines += [
+            "",
+            f"Embeds cached: {len(embeds.embeds)}",
+            f"Embed renders: {embeds.renders}",
+            f"Content only edits: {embeds.content_only}",
+            f"Unchanged edits skipped: {embeds.skipped}",
+        ]
+
+        regex = self.bot.regex.stats()
+        compiles = regex["pattern_misses"]
+        avg_compile = regex["compile_time"] / compiles if compiles else 0
+        lines += [
+            "",
+            f"Regex searches: {regex['searches']}",
+            f"Regex timeouts: {regex['timeouts']}",
+            f"Regex worker restarts: {regex['restarts']}",
+            f"Compiled pattern hits: {regex['pattern_hits']}",
+            f"Compiled pattern misses: {compiles}",
+            f"Compile time: {utils.ms(regex['compile_time'])} MS",
+            "Compile time saved: "
+            f"~{utils.ms(avg_compile * regex['pattern_hits'])} MS",
+        ]
+
+        starboard_events = self.bot.get_cog("StarboardEvents")
+        if starboard_events:
+            coalescer = starboard_events.coalescer
+            lines += [
+                "",
+                f"Starboard updates submitted: {coalescer.submitted}",
+                f"Starboard updates run: {coalescer.ran}",
+                f"Starboard updates collapsed: {coalescer.collapsed}",
+            ]
+
+        await ctx.send("```\n" + "\n".join(lines) + "\n```")
+
+    @commands.command(name="eventstats")
+    @checks.is_owner()
+    async def get_event_stats(self, ctx: "MyContext") -> None:
+        """Shows stats on this cluster's event queue"""
+        events = self.bot.events
+        stats = events.stats()
+        lines = [
+            f"Workers: {stats['workers']}",
+            f"Waiting: {stats['depth']} in {stats['guilds']} guilds",
+            f"Queued: {stats['queued']}",
+            f"Processed: {stats['processed']}",
+            f"Shed: {stats['shed']}",
+            f"Average lag: {utils.ms(stats['avg_lag'])} MS",
+            f"Max lag: {utils.ms(stats['max_lag'])} MS",
+            f"Oldest waiting: {utils.ms(stats['oldest_lag'])} MS",
+        ]
+        deepest = events.deepest()
+        if deepest:
+            lines += ["", "Deepest queues:"]
+            lines += [f"{gid}: {depth}" for gid, depth in deepest]
+        if events.shed_by_guild:
+            shed = sorted(
+                events.shed_by_guild.items(), key=lambda s: s[1], reverse=True
+            )
+            lines += ["", "Most shed:"]
+            lines += [f"{gid}: {count}" for gid, count in shed[:5]]
+
+        await ctx.send("```\n" + "\n".join(lines) + "\n```")
+
     @commands.command(name="reconnect")
     @checks.is_owner()
     async def reconnect_bot(self, ctx: "MyContext") -> None:
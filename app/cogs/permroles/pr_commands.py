@@ -182,7 +182,7 @@ class PermRoles(
         group: converters.PermGroup,
         *channels: discord.TextChannel,
     ):
-        current_channels = set(int(cid) for cid in group["channels"])
+        current_channels = set(group["channels"])
         for c in channels:
             current_channels.add(c.id)
         current_channels = list(current_channels)
@@ -212,7 +212,7 @@ class PermRoles(
         group: converters.PermGroup,
         *channels: discord.TextChannel,
     ):
-        current_channels = set(int(cid) for cid in group["channels"])
+        current_channels = set(group["channels"])
         for c in channels:
             current_channels.remove(c.id)
         current_channels = list(current_channels)
@@ -280,7 +280,7 @@ class PermRoles(
         group: converters.PermGroup,
         *starboards: converters.Starboard,
     ):
-        current_starboards = set(int(sid) for sid in group["starboards"])
+        current_starboards = set(group["starboards"])
         for s in starboards:
             current_starboards.add(s.obj.id)
         current_starboards = list(current_starboards)
@@ -310,7 +310,7 @@ class PermRoles(
         group: converters.PermGroup,
         *starboards: converters.Starboard,
     ):
-        current_starboards = set(int(sid) for sid in group["starboards"])
+        current_starboards = set(group["starboards"])
         for s in starboards:
             current_starboards.remove(s.obj.id)
         current_starboards = list(current_starboards)
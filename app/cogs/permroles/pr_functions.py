@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import discord
 
@@ -44,47 +44,20 @@ async def get_perms(
     channel_id: Optional[int],
     starboard_id: Optional[int],
 ) -> Dict[str, bool]:
-    groups = await bot.db.fetch(
-        """SELECT * FROM permgroups
-        WHERE guild_id=$1
-        AND (
-            channels='{}'
-            OR $2::numeric IS NULL
-            OR $2::numeric=any(channels)
-        )
-        AND (
-            starboards='{}'
-            OR $3::numeric IS NULL
-            OR $3::numeric=any(starboards)
-        )
-        """,
-        guild_id,
-        channel_id,
-        starboard_id,
-    )
+    guild_config = await bot.db.guild_config.get(guild_id)
+    return guild_config.perm_index.resolve(roles, channel_id, starboard_id)
 
-    permroles = []
-    for g in groups:
-        permroles += await bot.db.fetch(
-            """SELECT * FROM permroles
-            WHERE permgroup_id=$1
-            AND role_id=any($2::numeric[])""",
-            g["id"],
-            roles,
-        )
 
-    perms = {
-        "allow_commands": True,
-        "on_starboard": True,
-        "give_stars": True,
-        "gain_xp": True,
-        "pos_roles": True,
-        "xp_roles": True,
+async def get_perms_many(
+    bot: Bot,
+    members: Iterable[discord.Member],
+    guild_id: int,
+    channel_id: Optional[int],
+    starboard_id: Optional[int],
+) -> Dict[int, Dict[str, bool]]:
+    guild_config = await bot.db.guild_config.get(guild_id)
+    index = guild_config.perm_index
+    return {
+        m.id: index.resolve([r.id for r in m.roles], channel_id, starboard_id)
+        for m in members
     }
-    for pr in permroles:
-        for key in perms.keys():
-            if pr[key] is None:
-                continue
-            perms[key] = pr[key]
-
-    return perms
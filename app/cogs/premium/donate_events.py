@@ -5,6 +5,7 @@ import discord
 
 import config
 from app import commands
+from app.database.queries import ADD_DONATION
 from app.i18n import t_
 
 if typing.TYPE_CHECKING:
@@ -38,16 +39,15 @@ class DonateEvents(commands.Cog):
         await self.bot.db.users.create(discord_id, False)
 
         await self.bot.db.execute(
-            """UPDATE users
-            SET credits = credits + $1,
-            donation_total = donation_total + $1
-            WHERE id = $2""",
+            ADD_DONATION,
             round(float(data["price"])),
             discord_id,
         )
 
         await self.bot.websocket.send_command(
-            "update_prem_roles", {"user_id": discord_id}
+            "update_prem_roles",
+            {"user_id": discord_id},
+            guild_id=config.ROLE_SERVER,
         )
 
         await alert_donator(
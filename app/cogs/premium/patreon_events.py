@@ -6,7 +6,14 @@ from typing import TYPE_CHECKING, Any, Dict, List
 import discord
 from discord.ext import tasks
 
+import config
 from app import commands
+from app.database.queries import (
+    ADD_PATREON_CREDITS,
+    CANCELLED_PATRONS,
+    REMOVE_PATRON,
+    SET_LAST_KNOWN_MONTHLY,
+)
 from app.i18n import t_
 
 from . import patreon
@@ -51,10 +58,7 @@ class PatreonEvents(commands.Cog):
             if patron["total"] > sql_user["last_patreon_total"]:
                 to_give = patron["total"] - sql_user["last_patreon_total"]
                 await self.bot.db.execute(
-                    """UPDATE users
-                    SET last_patreon_total=$1,
-                    credits = credits + $2
-                    WHERE id=$3""",
+                    ADD_PATREON_CREDITS,
                     patron["total"],
                     to_give,
                     sql_user["id"],
@@ -62,8 +66,7 @@ class PatreonEvents(commands.Cog):
 
             text = None
             await self.bot.db.execute(
-                """UPDATE users SET last_known_monthly=$1
-                WHERE id=$2""",
+                SET_LAST_KNOWN_MONTHLY,
                 patron["payment"],
                 sql_user["id"],
             )
@@ -99,26 +102,26 @@ class PatreonEvents(commands.Cog):
                 await alert_patron(self.bot, int(sql_user["id"]), text)
 
             await self.bot.websocket.send_command(
-                "update_prem_roles", {"user_id": int(patron["discord_id"])}
+                "update_prem_roles",
+                {"user_id": int(patron["discord_id"])},
+                guild_id=config.ROLE_SERVER,
             )
 
         # Check for removed/cancelled patrons
         cancelled_patrons = await self.bot.db.fetch(
-            """SELECT * FROM users WHERE patron_status!='no'
-            AND NOT id=any($1)""",
+            CANCELLED_PATRONS,
             all_patron_ids,
         )
         for p in cancelled_patrons:
             await self.bot.db.execute(
-                """UPDATE users
-                SET last_known_monthly=0,
-                patron_status='no'
-                WHERE id=$1""",
+                REMOVE_PATRON,
                 p["id"],
             )
 
             await self.bot.websocket.send_command(
-                "update_prem_roles", {"user_id": int(p["id"])}
+                "update_prem_roles",
+                {"user_id": int(p["id"])},
+                guild_id=config.ROLE_SERVER,
             )
 
             await alert_patron(
@@ -136,7 +136,7 @@ class Premium(commands.Cog, description=t_("Premium-related commands.", True)):
                 return
             p = commands.Paginator(prefix="", suffix="")
             for ar in all_autoredeem:
-                g = self.bot.get_guild(int(ar["guild_id"]))
+                g = self.bot.get_guild(ar["guild_id"])
                 if g:
                     p.add_line(g.name + f" (`{g.id}`)")
                 else:
@@ -6,6 +6,7 @@ from discord.ext import tasks
 
 import config
 from app import commands, errors, utils
+from app.database.queries import EXPIRED_PREMIUM_GUILDS
 from app.i18n import t_
 
 from .premium_funcs import redeem_credits
@@ -25,26 +26,25 @@ class PremiumEvents(commands.Cog):
         await self.bot.wait_until_ready()
         now = datetime.utcnow()
         expired_guilds = await self.bot.db.fetch(
-            """SELECT * FROM guilds
-            WHERE premium_end < $1""",
+            EXPIRED_PREMIUM_GUILDS,
             now,
         )
         for sql_guild in expired_guilds:
             autoredeemers = await self.bot.db.autoredeem.find_valid(
-                int(sql_guild["id"])
+                sql_guild["id"]
             )
-            obj = self.bot.get_guild(int(sql_guild["id"]))
+            obj = self.bot.get_guild(sql_guild["id"])
             autoredeemed = False
             if obj is not None:
                 for ar in autoredeemers:
-                    user = await self.bot.cache.fetch_user(int(ar["user_id"]))
+                    user = await self.bot.cache.fetch_user(ar["user_id"])
                     if not user:
                         continue
                     try:
                         await redeem_credits(
                             self.bot.db,
-                            int(sql_guild["id"]),
-                            int(ar["user_id"]),
+                            sql_guild["id"],
+                            ar["user_id"],
                             1,
                         )
                     except errors.NotEnoughCredits:
@@ -65,12 +65,7 @@ class PremiumEvents(commands.Cog):
             if autoredeemed:
                 continue
 
-            await self.bot.db.execute(
-                """UPDATE guilds
-                SET premium_end = null
-                WHERE id = $1""",
-                sql_guild["id"],
-            )
+            await self.bot.db.guilds.set_premium_end(sql_guild["id"], None)
             if obj is not None:
                 self.bot.dispatch(
                     "guild_log",
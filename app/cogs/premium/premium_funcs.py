@@ -1,6 +1,7 @@
 from typing import TYPE_CHECKING
 
 import config
+from app.database.queries import SPEND_CREDITS
 from app.errors import NotEnoughCredits
 
 if TYPE_CHECKING:
@@ -41,9 +42,7 @@ async def redeem_credits(
 
     await db.guilds.add_months(guild_id, months)
     await db.execute(
-        """UPDATE users
-        SET credits=credits-$1
-        WHERE id=$2""",
+        SPEND_CREDITS,
         credits,
         user_id,
     )
@@ -99,9 +99,9 @@ async def qa_recount(
     if not member.guild_permissions.manage_messages:
         return False
     message = await bot.cache.fetch_message(
-        int(orig_message["guild_id"]),
-        int(orig_message["channel_id"]),
-        int(orig_message["id"]),
+        orig_message["guild_id"],
+        orig_message["channel_id"],
+        orig_message["id"],
     )
     if not message:
         return
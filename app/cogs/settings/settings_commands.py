@@ -89,12 +89,8 @@ class Settings(
         if name in new_commands:
             raise errors.AlreadyDisabled(name)
         new_commands.append(name)
-        await self.bot.db.execute(
-            """UPDATE guilds
-            SET disabled_commands=$1::text[]
-            WHERE id=$2""",
-            new_commands,
-            ctx.guild.id,
+        await self.bot.db.guilds.set_disabled_commands(
+            ctx.guild.id, new_commands
         )
         await ctx.send(t_("Disabled `{0}`.").format(name))
 
@@ -109,12 +105,8 @@ class Settings(
         if name not in new_commands:
             raise errors.NotDisabled(name)
         new_commands.remove(name)
-        await self.bot.db.execute(
-            """UPDATE guilds
-            SET disabled_commands=$1::text[]
-            WHERE id=$2""",
-            new_commands,
-            ctx.guild.id,
+        await self.bot.db.guilds.set_disabled_commands(
+            ctx.guild.id, new_commands
         )
         await ctx.send(t_("Enabled `{0}`.").format(name))
 
@@ -237,9 +229,7 @@ class Settings(
     )
     @has_guild_permissions(manage_messages=True)
     async def enable_quickactions(self, ctx: "MyContext") -> None:
-        await self.bot.db.execute(
-            """UPDATE guilds SET qa_enabled=True WHERE id=$1""", ctx.guild.id
-        )
+        await self.bot.db.guilds.set_qa_enabled(ctx.guild.id, True)
         await ctx.send(t_("Enabled QuickActions."))
 
     @quickactions.command(
@@ -249,9 +239,7 @@ class Settings(
     )
     @has_guild_permissions(manage_messages=True)
     async def disable_quickactions(self, ctx: "MyContext") -> None:
-        await self.bot.db.execute(
-            """UPDATE guilds SET qa_enabled=False WHERE id=$1""", ctx.guild.id
-        )
+        await self.bot.db.guilds.set_qa_enabled(ctx.guild.id, False)
         await ctx.send(t_("Disabled QuickActions."))
 
     @quickactions.command(
@@ -259,17 +247,7 @@ class Settings(
     )
     @has_guild_permissions(manage_messages=True)
     async def reset_quickactions(self, ctx: "MyContext") -> None:
-        await self.bot.db.execute(
-            """UPDATE guilds
-            SET qa_force='🔒',
-            qa_unforce='🔓',
-            qa_freeze='❄️',
-            qa_trash='🗑️',
-            qa_recount='🔃',
-            qa_save='📥'
-            WHERE id=$1""",
-            ctx.guild.id,
-        )
+        await self.bot.db.guilds.reset_quickactions(ctx.guild.id)
         await ctx.send(t_("Reset quickActions."))
 
     @quickactions.command(
@@ -281,13 +259,7 @@ class Settings(
     ) -> None:
         clean = utils.clean_emoji(emoji)
         await raise_if_exists(clean, ctx)
-        await self.bot.db.execute(
-            """UPDATE guilds
-            SET qa_force=$1
-            WHERE id=$2""",
-            clean,
-            ctx.guild.id,
-        )
+        await self.bot.db.guilds.set_quickaction(ctx.guild.id, "force", clean)
         await ctx.send(t_("Set the force QuickAction to {0}.").format(emoji))
 
     @quickactions.command(
@@ -299,12 +271,8 @@ class Settings(
     ) -> None:
         clean = utils.clean_emoji(emoji)
         await raise_if_exists(clean, ctx)
-        await self.bot.db.execute(
-            """UPDATE guilds
-            SET qa_unforce=$1
-            WHERE id=$2""",
-            clean,
-            ctx.guild.id,
+        await self.bot.db.guilds.set_quickaction(
+            ctx.guild.id, "unforce", clean
         )
         await ctx.send(t_("Set the unforce QuickAction to {0}.").format(emoji))
 
@@ -319,13 +287,7 @@ class Settings(
     ) -> None:
         clean = utils.clean_emoji(emoji)
         await raise_if_exists(clean, ctx)
-        await self.bot.db.execute(
-            """UPDATE guilds
-            SET qa_freeze=$1
-            WHERE id=$2""",
-            clean,
-            ctx.guild.id,
-        )
+        await self.bot.db.guilds.set_quickaction(ctx.guild.id, "freeze", clean)
         await ctx.send(
             t_("Set the freeze/unfreeze QuickAction to {0}.").format(emoji)
         )
@@ -340,13 +302,7 @@ class Settings(
     ) -> None:
         clean = utils.clean_emoji(emoji)
         await raise_if_exists(clean, ctx)
-        await self.bot.db.execute(
-            """UPDATE guilds
-            SET qa_trash=$1
-            WHERE id=$2""",
-            clean,
-            ctx.guild.id,
-        )
+        await self.bot.db.guilds.set_quickaction(ctx.guild.id, "trash", clean)
         await ctx.send(
             t_("Set the trash/untrash QuickAction to {0}.").format(emoji)
         )
@@ -360,12 +316,8 @@ class Settings(
     ) -> None:
         clean = utils.clean_emoji(emoji)
         await raise_if_exists(clean, ctx)
-        await self.bot.db.execute(
-            """UPDATE guilds
-            SET qa_recount=$1
-            WHERE id=$2""",
-            clean,
-            ctx.guild.id,
+        await self.bot.db.guilds.set_quickaction(
+            ctx.guild.id, "recount", clean
         )
         await ctx.send(t_("Set the recount QuickAction to {0}.").format(emoji))
 
@@ -378,13 +330,7 @@ class Settings(
     ) -> None:
         clean = utils.clean_emoji(emoji)
         await raise_if_exists(clean, ctx)
-        await self.bot.db.execute(
-            """UPDATE guilds
-            SET qa_save=$1
-            WHERE id=$2""",
-            clean,
-            ctx.guild.id,
-        )
+        await self.bot.db.guilds.set_quickaction(ctx.guild.id, "save", clean)
         await ctx.send(t_("Set the save QuickAction to {0}.").format(emoji))
 
     @commands.group(
@@ -430,14 +376,7 @@ class Settings(
         if prefix in guild["prefixes"]:
             raise errors.AlreadyPrefix(prefix)
         new_prefixes = guild["prefixes"] + [prefix]
-        await self.bot.db.execute(
-            """UPDATE guilds
-            SET prefixes=$1
-            WHERE id=$2""",
-            new_prefixes,
-            ctx.guild.id,
-        )
-        await self.bot.db.guilds.cache.delete(ctx.guild.id)
+        await self.bot.db.guilds.set_prefixes(ctx.guild.id, new_prefixes)
 
         await ctx.send(t_("Added `{0}` to the prefixes.").format(prefix))
 
@@ -482,14 +421,7 @@ class Settings(
         new_prefixes = guild["prefixes"]
         new_prefixes.remove(to_remove)
 
-        await self.bot.db.execute(
-            """UPDATE guilds
-            SET prefixes=$1
-            WHERE id=$2""",
-            new_prefixes,
-            ctx.guild.id,
-        )
-        await self.bot.db.guilds.cache.delete(ctx.guild.id)
+        await self.bot.db.guilds.set_prefixes(ctx.guild.id, new_prefixes)
 
         await ctx.send(
             t_("Removed `{0}` from the prefixes.").format(to_remove)
@@ -507,12 +439,7 @@ class Settings(
         ).start(ctx):
             await ctx.send(t_("Cancelled."))
             return
-        await self.bot.db.execute(
-            """UPDATE guilds
-            SET prefixes='{"sb!"}'
-            WHERE id=$1""",
-            ctx.guild.id,
-        )
+        await self.bot.db.guilds.set_prefixes(ctx.guild.id, ["sb!"])
         await ctx.send(t_("Cleared all prefixes and added `sb!`."))
 
     @commands.command(
@@ -542,12 +469,8 @@ class Settings(
                 )
                 return
 
-        await self.bot.db.execute(
-            """UPDATE guilds
-            SET level_channel=$1
-            WHERE id=$2""",
-            channel.id if channel else None,
-            ctx.guild.id,
+        await self.bot.db.guilds.set_level_channel(
+            ctx.guild.id, channel.id if channel else None
         )
         if channel:
             await ctx.send(
@@ -565,11 +488,7 @@ class Settings(
     async def set_level_ping(
         self, ctx: "MyContext", ping: converters.mybool
     ) -> None:
-        await self.bot.db.execute(
-            """UPDATE guilds SET ping_user=$1 WHERE id=$2""",
-            ping,
-            ctx.guild.id,
-        )
+        await self.bot.db.guilds.set_ping_user(ctx.guild.id, ping)
         if ping:
             await ctx.send(t_("I will now ping users when they level up."))
         else:
@@ -602,14 +521,9 @@ class Settings(
                 )
                 return
 
-        await self.bot.db.execute(
-            """UPDATE guilds
-            SET log_channel=$1
-            WHERE id=$2""",
-            channel.id if channel else None,
-            ctx.guild.id,
+        await self.bot.db.guilds.set_log_channel(
+            ctx.guild.id, channel.id if channel else None
         )
-        await self.bot.db.guilds.cache.delete(ctx.guild.id)
         if channel:
             await ctx.send(
                 t_("Set the log channel to {0}.").format(channel.mention)
@@ -636,13 +550,7 @@ class Settings(
     async def set_allow_commands(
         self, ctx: "MyContext", value: converters.mybool
     ) -> None:
-        await self.bot.db.execute(
-            """UPDATE guilds
-            SET allow_commands=$1
-            WHERE id=$2""",
-            value,
-            ctx.guild.id,
-        )
+        await self.bot.db.guilds.set_allow_commands(ctx.guild.id, value)
         await ctx.send(t_("Set allowCommands to **{0}**.").format(value))
 
 
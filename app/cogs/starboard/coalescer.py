@@ -0,0 +1,72 @@
+import asyncio
+from typing import Dict, Optional, Tuple
+
+from app.classes.bot import Bot
+
+from . import starboard_funcs
+
+Deltas = Optional[Dict[int, int]]
+
+
+def merge_deltas(first: Deltas, second: Deltas) -> Deltas:
+    # None means "recalculate the points", which wins over any delta
+    if first is None or second is None:
+        return None
+    merged = first.copy()
+    for starboard_id, delta in second.items():
+        merged[starboard_id] = merged.get(starboard_id, 0) + delta
+    return merged
+
+
+class UpdateCoalescer:
+    """Collapses bursts of update_message calls for the same message.
+
+    The first update for a message runs right away. Any updates that
+    come in while it is running, or during the following `window`
+    seconds, are merged into a single trailing update."""
+
+    def __init__(self, bot: Bot, window: float) -> None:
+        self.bot = bot
+        self.window = window
+
+        self._pending: Dict[Tuple[int, int], Deltas] = {}
+        self._tasks: Dict[Tuple[int, int], asyncio.Task] = {}
+
+        self.submitted = 0
+        self.ran = 0
+
+    @property
+    def collapsed(self) -> int:
+        return self.submitted - self.ran - len(self._pending)
+
+    def submit(
+        self, guild_id: int, message_id: int, deltas: Deltas = None
+    ) -> None:
+        key = (int(guild_id), int(message_id))
+        self.submitted += 1
+
+        if key in self._pending:
+            self._pending[key] = merge_deltas(self._pending[key], deltas)
+        else:
+            self._pending[key] = deltas.copy() if deltas is not None else None
+
+        if key not in self._tasks:
+            self._tasks[key] = self.bot.loop.create_task(self._run(key))
+
+    async def _run(self, key: Tuple[int, int]) -> None:
+        guild_id, message_id = key
+        try:
+            while key in self._pending:
+                deltas = self._pending.pop(key)
+                self.ran += 1
+                try:
+                    await starboard_funcs.update_message(
+                        self.bot, message_id, guild_id, deltas
+                    )
+                except Exception as e:
+                    self.bot.dispatch(
+                        "log_error", "Error", e, [guild_id, message_id]
+                    )
+                await asyncio.sleep(self.window)
+        finally:
+            self._tasks.pop(key, None)
@@ -1,16 +1,48 @@
+import asyncio
+import weakref
+
 import discord
 
+import config
 from app import commands, utils
 from app.classes.bot import Bot
 from app.cogs.utility import utility_funcs
 from app.i18n import t_
 
 from . import starboard_funcs
+from .coalescer import UpdateCoalescer
 
 
 class StarboardEvents(commands.Cog):
     def __init__(self, bot: Bot) -> None:
         self.bot = bot
+        self.coalescer = UpdateCoalescer(bot, config.STARBOARD_UPDATE_WINDOW)
+        # message_id: lock held while a reaction user is created or
+        # deleted and its point deltas are worked out, so that two
+        # reactions from the same user can't both see the other one
+        self._point_locks = weakref.WeakValueDictionary()
+
+    def point_lock(self, message_id: int) -> asyncio.Lock:
+        lock = self._point_locks.get(message_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._point_locks[message_id] = lock
+        return lock
+
+    @commands.Cog.listener()
+    async def on_member_update(
+        self, before: discord.Member, after: discord.Member
+    ) -> None:
+        if before.roles == after.roles:
+            return
+        changed = {r.id for r in before.roles} ^ {r.id for r in after.roles}
+        guild_config = await self.bot.db.guild_config.get(after.guild.id)
+        if changed & guild_config.perm_role_ids:
+            # Stars this member gave before may count differently now, so
+            # messages they reacted to are recounted the next time they
+            # change. Only this cluster counts points for the guild, so
+            # there's no need to tell the other processes.
+            guild_config.mark_stale(after.id)
 
     @commands.Cog.listener()
     async def on_guild_channel_delete(
@@ -73,19 +105,15 @@ class StarboardEvents(commands.Cog):
         # Check if is starEmoji
         emoji = utils.clean_emoji(payload.emoji)
 
-        # Create necessary data
-        await self.bot.db.users.create(payload.member.id, payload.member.bot)
-        await self.bot.db.members.create(payload.member.id, payload.guild_id)
-
         # Get/create the message
         sql_message = await starboard_funcs.orig_message(
             self.bot, payload.message_id
         )
         if sql_message:
             guild_id, channel_id, message_id = (
-                int(sql_message["guild_id"]),
-                int(sql_message["channel_id"]),
-                int(sql_message["id"]),
+                sql_message["guild_id"],
+                sql_message["channel_id"],
+                sql_message["id"],
             )
         else:
             guild_id, channel_id, message_id = (
@@ -101,7 +129,7 @@ class StarboardEvents(commands.Cog):
             return
 
         if sql_message:
-            author_id = int(sql_message["author_id"])
+            author_id = sql_message["author_id"]
         elif message:
             author_id = message.author.id
         else:
@@ -115,29 +143,18 @@ class StarboardEvents(commands.Cog):
         else:
             author_roles = [r.id for r in _author[author_id].roles]
 
-        if not sql_message:
-            # Create message + needed data
-            await self.bot.db.users.create(
-                message.author.id, message.author.bot
-            )
-            await self.bot.db.members.create(
-                message.author.id, payload.guild_id
-            )
-            await self.bot.db.messages.create(
-                message.id,
-                message.guild.id,
-                message.channel.id,
-                message.author.id,
-                message.channel.is_nsfw(),
-            )
-
-        sql_author = await self.bot.db.users.get(author_id)
-
         # Check if valid
         frozen = trashed = False
         if sql_message:
             frozen = sql_message["frozen"]
             trashed = sql_message["trashed"]
+            is_nsfw = sql_message["is_nsfw"]
+            sql_author = await self.bot.db.users.get(author_id)
+        else:
+            # The message and author are only stored once the reaction
+            # is known to be valid
+            is_nsfw = message.channel.is_nsfw()
+            sql_author = {"id": author_id, "is_bot": message.author.bot}
         valid, remove = await starboard_funcs.can_add(
             self.bot,
             emoji,
@@ -162,13 +179,34 @@ class StarboardEvents(commands.Cog):
         if not valid:
             return
 
-        # Create the reaction
-        await self.bot.db.reactions.create_reaction_user(
-            emoji, message_id, payload.user_id
-        )
-        await starboard_funcs.update_message(
-            self.bot, message_id, payload.guild_id
-        )
+        async with self.point_lock(message_id):
+            # Create the reaction, along with the message and any other
+            # needed data
+            existed = await self.bot.db.ensure_reaction_context(
+                payload.guild_id,
+                channel_id,
+                message_id,
+                author_id,
+                sql_author["is_bot"],
+                is_nsfw,
+                payload.member.id,
+                payload.member.bot,
+                emoji,
+            )
+            if existed:
+                deltas = {}
+            else:
+                deltas = await starboard_funcs.point_deltas(
+                    self.bot,
+                    payload.guild_id,
+                    message_id,
+                    channel_id,
+                    author_id,
+                    payload.member,
+                    emoji,
+                    True,
+                )
+        self.coalescer.submit(payload.guild_id, message_id, deltas)
 
         self.bot.dispatch(
             "star_update",
@@ -203,17 +241,29 @@ class StarboardEvents(commands.Cog):
         if orig_message["frozen"] or orig_message["trashed"]:
             return
 
-        r_user = await self.bot.db.reactions.get_reaction_user(
-            emoji, int(orig_message["id"]), payload.user_id
-        )
-        if not r_user:
-            return
-        await self.bot.db.reactions.delete_reaction_user(
-            emoji, int(orig_message["id"]), payload.user_id
-        )
-        await starboard_funcs.update_message(
-            self.bot, orig_message["id"], payload.guild_id
-        )
+        guild = self.bot.get_guild(payload.guild_id)
+        _member = await self.bot.cache.get_members([payload.user_id], guild)
+
+        async with self.point_lock(orig_message["id"]):
+            r_user = await self.bot.db.reactions.get_reaction_user(
+                emoji, orig_message["id"], payload.user_id
+            )
+            if not r_user:
+                return
+            await self.bot.db.reactions.delete_reaction_user(
+                emoji, orig_message["id"], payload.user_id
+            )
+            deltas = await starboard_funcs.point_deltas(
+                self.bot,
+                payload.guild_id,
+                orig_message["id"],
+                orig_message["channel_id"],
+                orig_message["author_id"],
+                _member.get(payload.user_id),
+                emoji,
+                False,
+            )
+        self.coalescer.submit(payload.guild_id, orig_message["id"], deltas)
 
         self.bot.dispatch(
             "star_update",
@@ -3,13 +3,68 @@ from typing import Any, Dict, List, Optional, Tuple
 
 import discord
 
+import config
 from app import utils
 from app.classes.bot import Bot
+from app.classes.regex_engine import TIMEOUT
 from app.cogs.permroles import pr_functions
+from app.database.queries import query
 from app.i18n import t_
 
 from .embed_logic import embed_message
 
+SET_POINTS = query(
+    "starboard.set_points",
+    """UPDATE starboard_messages
+    SET points=$1 WHERE id=$2""",
+)
+
+ADD_POINTS = query(
+    "starboard.add_points",
+    """UPDATE starboard_messages
+    SET points=points + $1 WHERE id=$2 AND points + $1 >= 0
+    RETURNING points""",
+)
+
+SET_DIGEST = query(
+    "starboard.set_digest",
+    """UPDATE starboard_messages
+    SET last_digest=$1 WHERE id=$2""",
+)
+
+USER_EMOJIS = query(
+    "starboard.user_emojis",
+    """SELECT reactions.emoji FROM reactions
+    JOIN reaction_users ON reactions.id=reaction_users.reaction_id
+    WHERE reactions.message_id=$1
+    AND reaction_users.user_id=$2""",
+)
+
+STAR_GIVERS = query(
+    "starboard.star_givers",
+    """SELECT DISTINCT reaction_users.user_id FROM reaction_users
+    JOIN reactions ON reactions.id=reaction_users.reaction_id
+    WHERE reactions.message_id=$1
+    AND reactions.emoji=any($2::TEXT[])
+    AND ($3::bigint IS NULL OR $3::bigint!=reaction_users.user_id)""",
+)
+
+REACTED_ANY = query(
+    "starboard.reacted_any",
+    """SELECT EXISTS (
+        SELECT 1 FROM reactions
+        JOIN reaction_users ON reactions.id=reaction_users.reaction_id
+        WHERE reactions.message_id=$1
+        AND reaction_users.user_id=any($2::bigint[])
+    )""",
+)
+
+GET_STARBOARD_MESSAGE = query(
+    "starboard.get_starboard_message",
+    """SELECT * FROM starboard_messages
+    WHERE orig_id=$1 AND starboard_id=$2""",
+)
+
 
 async def can_add(
     bot: Bot,
@@ -34,20 +89,15 @@ async def can_add(
         return False, False  # Completely ignore bot reactions
 
     # First check if the emoji is a starEmoji on any of the starboards
-    _starboards = await bot.db.fetch(
-        """SELECT * FROM starboards
-        WHERE guild_id=$1
-        AND $2=any(star_emojis)""",
-        guild_id,
-        emoji,
-    )
+    guild_config = await bot.db.guild_config.get(guild_id)
+    _starboards = guild_config.starboards_for_emoji(emoji)
     starboards: List[Dict[Any, Any]] = []
     for s in _starboards:
         if s["channel_wl"]:
-            if channel_id not in [int(cid) for cid in s["channel_wl"]]:
+            if channel_id not in s["channel_wl"]:
                 continue
         elif s["channel_bl"]:
-            if channel_id in [int(cid) for cid in s["channel_bl"]]:
+            if channel_id in s["channel_bl"]:
                 continue
         starboards.append(s)
     if len(starboards) == 0:
@@ -84,7 +134,7 @@ async def can_add(
             continue
 
         # Check selfStar
-        if not s["self_star"] and member.id == int(sql_author["id"]):
+        if not s["self_star"] and member.id == sql_author["id"]:
             current_valid = False
             continue
 
@@ -99,7 +149,7 @@ async def can_add(
             [r.id for r in member.roles],
             guild_id,
             channel_id,
-            int(s["id"]),
+            s["id"],
         )
         if not giver_perms["give_stars"]:
             current_valid = False
@@ -107,7 +157,7 @@ async def can_add(
 
         # Check the perms of the star receiver
         recv_perms = await pr_functions.get_perms(
-            bot, author_roles, guild_id, channel_id, int(s["id"])
+            bot, author_roles, guild_id, channel_id, s["id"]
         )
         if not recv_perms["on_starboard"]:
             current_valid = False
@@ -169,7 +219,17 @@ async def orig_message(bot: Bot, message_id: int) -> Optional[dict]:
     return await bot.db.messages.get(message_id)
 
 
-async def update_message(bot: Bot, message_id: int, guild_id: int) -> None:
+async def update_message(
+    bot: Bot,
+    message_id: int,
+    guild_id: int,
+    deltas: Optional[Dict[int, int]] = None,
+) -> None:
+    """Updates the message on every starboard.
+
+    If deltas (starboard_id: change in points) is passed, the stored
+    points of existing starboard messages are adjusted by that much
+    instead of being recalculated from every reaction."""
     sql_message = await bot.db.messages.get(message_id)
 
     guild = bot.get_guild(guild_id)
@@ -177,73 +237,198 @@ async def update_message(bot: Bot, message_id: int, guild_id: int) -> None:
 
     if not sql_message:
         return
+    # Points are recounted once for each message after anything that
+    # decides who can give stars changes, since deltas can't account for
+    # that
+    guild_config = await bot.db.guild_config.get(guild_id)
+    stamp = guild_config.stamp
+    if deltas is not None and guild_config.needs_recount(message_id):
+        deltas = None
+    if deltas is not None:
+        stale_users = guild_config.stale_users_for(message_id)
+        if stale_users and await bot.db.fetchval(
+            REACTED_ANY, message_id, stale_users
+        ):
+            deltas = None
+
     sql_starboards = await bot.db.starboards.get_many(guild_id)
     sql_author = await bot.db.users.get(sql_message["author_id"])
     all_tasks = []
     if not sql_message["trashed"]:
+        regex_results = await starboard_regexes(
+            bot, sql_starboards, sql_message
+        )
         for s in sql_starboards:
+            if deltas is not None:
+                delta = deltas.get(s["id"], 0)
+            else:
+                delta = None
             all_tasks.append(
                 asyncio.create_task(
-                    handle_starboard(bot, s, sql_message, sql_author, guild)
+                    handle_starboard(
+                        bot,
+                        s,
+                        sql_message,
+                        sql_author,
+                        guild,
+                        delta,
+                        regex_results,
+                    )
                 )
             )
         for t in all_tasks:
             await t
+        if deltas is None:
+            guild_config.mark_recounted(message_id, stamp)
     else:
         for s in sql_starboards:
             await handle_trashed_message(bot, s, sql_message, sql_author)
 
 
+async def starboard_regexes(
+    bot: Bot, sql_starboards: List[dict], sql_message: dict
+) -> Optional[Dict[str, Optional[bool]]]:
+    """Matches the regex and exclude_regex of every starboard against the
+    message at once. Returns None if the message couldn't be fetched."""
+    patterns = [
+        p
+        for s in sql_starboards
+        for p in (s["regex"], s["exclude_regex"])
+        if p
+    ]
+    if not patterns:
+        return {}
+    try:
+        message = await bot.cache.fetch_message(
+            sql_message["guild_id"],
+            sql_message["channel_id"],
+            sql_message["id"],
+        )
+    except discord.Forbidden:
+        return None
+    if message is None:
+        return None
+    return await try_regex(bot, patterns, message)
+
+
 async def set_points(bot: Bot, points: int, message_id: int) -> None:
     await bot.db.execute(
-        """UPDATE starboard_messages
-        SET points=$1 WHERE id=$2""",
+        SET_POINTS,
         points,
         message_id,
     )
 
 
+async def save_digest(
+    bot: Bot, digest: Optional[str], message_id: int
+) -> None:
+    """Remembers what a starboard message was last edited to show. If
+    digest is None, the next edit won't be skipped."""
+    bot.cache.embeds.remember(message_id, digest)
+    if config.STORE_EDIT_DIGESTS:
+        await bot.db.execute(SET_DIGEST, digest, message_id)
+
+
+async def edit_starboard_message(
+    bot: Bot,
+    starboard_message: discord.Message,
+    webhook: Optional[discord.Webhook],
+    **kwargs: Any,
+) -> bool:
+    """Edits a starboard message, whether the bot or the webhook sent
+    it. Returns False if it couldn't be edited."""
+    try:
+        if starboard_message.author.id == bot.user.id:
+            await starboard_message.edit(**kwargs)
+        elif webhook and starboard_message.author.id == webhook.id:
+            await webhook.edit_message(starboard_message.id, **kwargs)
+        else:
+            return False
+    except discord.errors.NotFound:
+        return False
+    return True
+
+
+async def add_points(bot: Bot, delta: int, message_id: int) -> Optional[int]:
+    """Returns the new points, or None if they would have gone below 0,
+    which means the stored points had drifted."""
+    return await bot.db.fetchval(
+        ADD_POINTS,
+        delta,
+        message_id,
+    )
+
+
+async def point_deltas(
+    bot: Bot,
+    guild_id: int,
+    message_id: int,
+    channel_id: int,
+    author_id: Optional[int],
+    member: Optional[discord.Member],
+    emoji: str,
+    added: bool,
+) -> Optional[Dict[int, int]]:
+    """Works out how a single added or removed reaction changes the
+    points on each starboard. Should be called after the reaction user
+    has been created or deleted.
+
+    Returns None if it can't be worked out, in which case the points
+    should be recalculated."""
+    if member is None:
+        return None
+
+    guild_config = await bot.db.guild_config.get(guild_id)
+    _emojis = await bot.db.fetch(
+        USER_EMOJIS,
+        message_id,
+        member.id,
+    )
+    # Other emojis this user has reacted with. If any of them are also
+    # starEmojis for a starboard, this reaction doesn't change whether
+    # the user is counted there.
+    other_emojis = set(r["emoji"] for r in _emojis)
+    other_emojis.discard(emoji)
+
+    roles = [r.id for r in member.roles]
+    deltas: Dict[int, int] = {}
+    for s in guild_config.starboards_for_emoji(emoji):
+        if not s["self_star"] and member.id == author_id:
+            continue
+        if other_emojis.intersection(s["star_emojis"]):
+            continue
+        perms = guild_config.perm_index.resolve(roles, channel_id, s["id"])
+        if not perms["give_stars"]:
+            continue
+        deltas[s["id"]] = 1 if added else -1
+
+    return deltas
+
+
 async def calculate_points(
     bot: Bot, message: dict, starboard: dict, guild: discord.Guild
 ) -> int:
-    _reactions = await bot.db.fetch(
-        """SELECT * FROM reactions
-        WHERE message_id=$1
-        AND emoji=any($2::TEXT[])""",
-        message["id"],
-        starboard["star_emojis"],
-    )
-
     if starboard["self_star"] is False:
         uid = message["author_id"]
     else:
         uid = None
 
-    _reactions = await bot.db.fetch(
-        """SELECT * FROM reaction_users
-        WHERE reaction_id=any($1::INT[])
-        AND ($2::numeric IS NULL OR $2::numeric!=user_id)""",
-        [r["id"] for r in _reactions],
+    _users = await bot.db.fetch(
+        STAR_GIVERS,
+        message["id"],
+        starboard["star_emojis"],
         uid,
     )
-    users = list(set(int(r["user_id"]) for r in _reactions))
+    users = [r["user_id"] for r in _users]
     user_objs = await bot.cache.get_members(users, guild)
-    valid = 0
-    for uid in users:
-        obj = user_objs.get(uid, None)
-        if not obj:
-            continue
-        perms = await pr_functions.get_perms(
-            bot,
-            [r.id for r in obj.roles],
-            guild.id,
-            message["channel_id"],
-            starboard["id"],
-        )
-        if not perms["give_stars"]:
-            continue
-        valid += 1
-    return valid
+    perms = await pr_functions.get_perms_many(
+        bot,
+        [obj for obj in user_objs.values() if obj],
+        guild.id,
+        message["channel_id"],
+        starboard["id"],
+    )
+    return sum(1 for p in perms.values() if p["give_stars"])
 
 
 async def handle_trashed_message(
@@ -254,8 +439,7 @@ async def handle_trashed_message(
         webhook = bot.get_webhook(sql_starboard["webhook_url"])
 
     sql_starboard_message = await bot.db.fetchrow(
-        """SELECT * FROM starboard_messages
-        WHERE orig_id=$1 AND starboard_id=$2""",
+        GET_STARBOARD_MESSAGE,
         sql_message["id"],
         sql_starboard["id"],
     )
@@ -279,24 +463,25 @@ async def handle_trashed_message(
             utils.escmd(sql_message["trash_reason"]),
         ),
     )
-    try:
-        if starboard_message.author.id == bot.user.id:
-            await starboard_message.edit(embed=embed)
-        elif webhook and starboard_message.author.id == webhook.id:
-            await webhook.edit_message(starboard_message.id, embed=embed)
-    except discord.errors.NotFound:
-        pass
+    # Whatever happens, the starboard message may no longer show what
+    # the embed cache or the stored digest say it does
+    bot.cache.embeds.forget(starboard_message.id)
+    await save_digest(bot, None, starboard_message.id)
+    await edit_starboard_message(bot, starboard_message, webhook, embed=embed)
 
 
 async def try_regex(
-    bot: Bot, pattern: str, message: discord.Message
-) -> Optional[bool]:
-    string = message.system_content
-    jump = message.jump_url
-    try:
-        if utils.safe_regex(string, pattern):
-            return True
-    except TimeoutError:
+    bot: Bot, patterns: List[str], message: discord.Message
+) -> Dict[str, Optional[bool]]:
+    """Matches several patterns against a message in one go.
+
+    Returns pattern: True or False, or None if the pattern is invalid
+    or took too long to match."""
+    results = await bot.regex.search_many(message.system_content, patterns)
+    for pattern, result in results.items():
+        if result is not TIMEOUT:
+            continue
+        results[pattern] = None
         async with bot.temp_locale(message.guild):
             bot.dispatch(
                 "guild_log",
@@ -305,12 +490,11 @@ async def try_regex(
                     "[a message]({1}), but it took too long. "
                     "Try improving the efficiency of your regex. If "
                     "you need help, feel free to join the support server."
-                ).format(pattern, jump),
+                ).format(pattern, message.jump_url),
                 "error",
                 message.guild,
             )
-        return None
-    return False
+    return results
 
 
 async def handle_starboard(
@@ -319,10 +503,10 @@ async def handle_starboard(
     sql_message: dict,
     sql_author: dict,
     guild: discord.Guild,
+    delta: Optional[int] = None,
+    regex_results: Optional[Dict[str, Optional[bool]]] = None,
 ) -> None:
-    starboard: discord.TextChannel = guild.get_channel(
-        int(sql_starboard["id"])
-    )
+    starboard: discord.TextChannel = guild.get_channel(sql_starboard["id"])
 
     webhook = None
     if sql_starboard["use_webhook"]:
@@ -331,23 +515,31 @@ async def handle_starboard(
         webhook = bot.get_webhook(sql_starboard["webhook_url"])
 
     sql_starboard_message = await bot.db.fetchrow(
-        """SELECT * FROM starboard_messages
-        WHERE orig_id=$1 AND starboard_id=$2""",
+        GET_STARBOARD_MESSAGE,
         sql_message["id"],
         sql_starboard["id"],
     )
-    if not sql_message["frozen"] or sql_starboard_message is None:
-        points = await calculate_points(bot, sql_message, sql_starboard, guild)
-    else:
+    if sql_message["frozen"] and sql_starboard_message is not None:
         points = sql_starboard_message["points"]
-    if sql_starboard_message is not None:
-        await set_points(bot, points, sql_starboard_message["id"])
+    elif delta is not None and sql_starboard_message is not None:
+        points = sql_starboard_message["points"]
+        if delta:
+            points = await add_points(bot, delta, sql_starboard_message["id"])
+        if points is None:
+            points = await calculate_points(
+                bot, sql_message, sql_starboard, guild
+            )
+            await set_points(bot, points, sql_starboard_message["id"])
+    else:
+        points = await calculate_points(bot, sql_message, sql_starboard, guild)
+        if sql_starboard_message is not None:
+            await set_points(bot, points, sql_starboard_message["id"])
 
     try:
         message = await bot.cache.fetch_message(
-            int(sql_message["guild_id"]),
-            int(sql_message["channel_id"]),
-            int(sql_message["id"]),
+            sql_message["guild_id"],
+            sql_message["channel_id"],
+            sql_message["id"],
         )
     except discord.Forbidden:
         return
@@ -357,11 +549,9 @@ async def handle_starboard(
     if whitelisted:
         blacklisted = False
 
-    _author = await bot.cache.get_members(
-        [int(sql_message["author_id"])], guild
-    )
+    _author = await bot.cache.get_members([sql_message["author_id"]], guild)
     if _author:
-        author = _author[int(sql_message["author_id"])]
+        author = _author[sql_message["author_id"]]
         roles = [r.id for r in author.roles]
     else:
         roles = []
@@ -396,15 +586,18 @@ async def handle_starboard(
         delete = True
 
     if message is not None:
+        if regex_results is None:
+            regex_results = await try_regex(
+                bot,
+                [sql_starboard["regex"], sql_starboard["exclude_regex"]],
+                message,
+            )
         if sql_starboard["regex"] != "":
-            if await try_regex(bot, sql_starboard["regex"], message) is False:
+            if regex_results.get(sql_starboard["regex"]) is False:
                 add = False
                 delete = True
         if sql_starboard["exclude_regex"] != "":
-            if (
-                await try_regex(bot, sql_starboard["exclude_regex"], message)
-                is True
-            ):
+            if regex_results.get(sql_starboard["exclude_regex"]) is True:
                 add = False
                 delete = True
 
@@ -420,11 +613,18 @@ async def handle_starboard(
         add = True
         delete = False
 
+    last_digest: Optional[str] = None
     if sql_starboard_message is not None:
+        if config.STORE_EDIT_DIGESTS:
+            last_digest = sql_starboard_message["last_digest"]
+        elif sql_starboard_message["last_digest"] is not None:
+            # Stored before digests were turned off, so it may be out of
+            # date. Clear it so it isn't trusted if they're turned on again.
+            await bot.db.execute(SET_DIGEST, None, sql_starboard_message["id"])
         starboard_message = await bot.cache.fetch_message(
-            int(sql_message["guild_id"]),
-            int(sql_starboard_message["starboard_id"]),
-            int(sql_starboard_message["id"]),
+            sql_message["guild_id"],
+            sql_starboard_message["starboard_id"],
+            sql_starboard_message["id"],
         )
         if starboard_message is None:
             await bot.db.sb_messages.delete(sql_starboard_message["id"])
@@ -439,7 +639,7 @@ async def handle_starboard(
         except (discord.NotFound, discord.Forbidden):
             pass
     elif not delete:
-        guild = bot.get_guild(int(sql_message["guild_id"]))
+        guild = bot.get_guild(sql_message["guild_id"])
 
         plain_text = get_plain_text(sql_starboard, sql_message, points, guild)
 
@@ -450,7 +650,7 @@ async def handle_starboard(
                 color=sql_starboard["color"],
                 nicknames=sql_starboard["nicknames"],
             )
-            # starboard = guild.get_channel(int(sql_starboard["id"]))
+            # starboard = guild.get_channel(sql_starboard["id"])
             try:
                 if not webhook or not sql_starboard["use_webhook"]:
                     m = await starboard.send(
@@ -497,6 +697,14 @@ async def handle_starboard(
                 m.id, message.id, sql_starboard["id"]
             )
             await set_points(bot, points, m.id)
+            embeds = bot.cache.embeds
+            key = embeds.key(
+                message, sql_starboard["color"], sql_starboard["nicknames"]
+            )
+            embeds.mark_sent(m.id, key)
+            await save_digest(
+                bot, embeds.digest(plain_text, key if edit else None), m.id
+            )
             if sql_starboard["autoreact"] is True:
                 for emoji in sql_starboard["star_emojis"]:
                     try:
@@ -524,8 +732,22 @@ async def handle_starboard(
                                 guild,
                             )
         elif starboard_message is not None and message:
-            try:
-                if edit:
+            embeds = bot.cache.embeds
+            key = embeds.key(
+                message, sql_starboard["color"], sql_starboard["nicknames"]
+            )
+            digest = embeds.digest(plain_text, key if edit else None)
+            # Recounts and freezes often produce the same result, in which
+            # case there's nothing to send
+            if embeds.is_unchanged(starboard_message.id, digest, last_digest):
+                return
+
+            embed = None
+            # If only the points changed, the embed doesn't need to be
+            # rendered or sent again
+            if edit and not embeds.is_current(starboard_message.id, key):
+                embed = embeds.get(key)
+                if embed is None:
                     embed, _ = await embed_message(
                         bot,
                         message,
@@ -533,32 +755,24 @@ async def handle_starboard(
                         files=False,
                         nicknames=sql_starboard["nicknames"],
                     )
-                    if starboard_message.author.id == bot.user.id:
-                        await starboard_message.edit(
-                            content=plain_text, embed=embed
-                        )
-                    elif webhook and starboard_message.author.id == webhook.id:
-                        await webhook.edit_message(
-                            starboard_message.id,
-                            content=plain_text,
-                            embed=embed,
-                        )
-                else:
-                    if starboard_message.author.id == bot.user.id:
-                        await starboard_message.edit(content=plain_text)
-                    elif webhook and starboard_message.author.id == webhook.id:
-                        await webhook.edit_message(
-                            starboard_message.id, content=plain_text
-                        )
-            except discord.errors.NotFound:
-                pass
+                    embeds.set(key, embed)
+
+            to_edit: Dict[str, Any] = {"content": plain_text}
+            if embed is not None:
+                to_edit["embed"] = embed
+            if await edit_starboard_message(
+                bot, starboard_message, webhook, **to_edit
+            ):
+                if embed is not None:
+                    embeds.mark_sent(starboard_message.id, key)
+                await save_digest(bot, digest, starboard_message.id)
         elif starboard_message is not None:
-            try:
-                if starboard_message.author.id == bot.user.id:
-                    await starboard_message.edit(content=plain_text)
-                elif webhook and starboard_message.author.id == webhook.id:
-                    await webhook.edit_message(
-                        starboard_message.id, content=plain_text
-                    )
-            except discord.errors.NotFound:
-                pass
+            digest = bot.cache.embeds.digest(plain_text)
+            if bot.cache.embeds.is_unchanged(
+                starboard_message.id, digest, last_digest
+            ):
+                return
+            if await edit_starboard_message(
+                bot, starboard_message, webhook, content=plain_text
+            ):
+                await save_digest(bot, digest, starboard_message.id)
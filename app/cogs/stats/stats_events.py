@@ -1,7 +1,9 @@
+import discord
 from discord.ext import tasks
 
 from app import commands
 from app.classes.bot import Bot
+from app.classes.ipc_connection import HUB
 
 
 class StatsEvents(commands.Cog):
@@ -24,6 +26,42 @@ class StatsEvents(commands.Cog):
                 "member_count": member_count,
             },
         )
+        await self.send_guilds()
+
+    async def send_guilds(self) -> None:
+        """Lets the IPC server answer guild lookups without asking every
+        cluster."""
+        if not self.bot.is_ready():
+            return
+        await self.bot.websocket.send_command(
+            "set_guilds",
+            {"guild_ids": [g.id for g in self.bot.guilds]},
+            cluster=HUB,
+        )
+
+    # The IPC server only knows this cluster's guilds once they're sent,
+    # so send them as soon as they're known, and again whenever the
+    # connection is re-established, rather than waiting for the next
+    # broadcast_stats.
+    @commands.Cog.listener()
+    async def on_ready(self) -> None:
+        await self.send_guilds()
+
+    @commands.Cog.listener()
+    async def on_ipc_connect(self) -> None:
+        await self.send_guilds()
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild) -> None:
+        await self.bot.websocket.send_command(
+            "guild_join", {"guild_id": guild.id}, cluster=HUB
+        )
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        await self.bot.websocket.send_command(
+            "guild_remove", {"guild_id": guild.id}, cluster=HUB
+        )
 
 
 def setup(bot: Bot) -> None:
@@ -29,7 +29,7 @@ async def clean_starboards(guild: discord.Guild, bot: Bot) -> int:
 
     sql_starboards = await bot.db.starboards.get_many(guild.id)
     for ss in sql_starboards:
-        obj = guild.get_channel(int(ss["id"]))
+        obj = guild.get_channel(ss["id"])
         if not obj:
             await bot.db.starboards.delete(ss["id"])
             removed += 1
@@ -99,7 +99,7 @@ async def clean_aschannels(guild: discord.Guild, bot: Bot) -> int:
 
     sql_aschannels = await bot.db.aschannels.get_many(guild.id)
     for sasc in sql_aschannels:
-        obj = guild.get_channel(int(sasc["id"]))
+        obj = guild.get_channel(sasc["id"])
         if not obj:
             await bot.db.aschannels.delete(sasc["id"])
             removed += 1
@@ -64,7 +64,7 @@ async def debug_guild(bot: Bot, guild: discord.Guild) -> Dict[Any, Any]:
 
     # Check starboard
     sql_starboards = await bot.db.starboards.get_many(guild.id)
-    starboards = [guild.get_channel(int(s["id"])) for s in sql_starboards]
+    starboards = [guild.get_channel(s["id"]) for s in sql_starboards]
     if len(sql_starboards) == 0:
         result["warns"].append(t_("You have no starboards set."))
     else:
@@ -167,7 +167,7 @@ async def debug_guild(bot: Bot, guild: discord.Guild) -> Dict[Any, Any]:
 
     # Check AutoStar channels
     sql_aschannels = await bot.db.aschannels.get_many(guild.id)
-    aschannels = [guild.get_channel(int(asc["id"])) for asc in sql_aschannels]
+    aschannels = [guild.get_channel(asc["id"]) for asc in sql_aschannels]
     if None in aschannels:
         result["warns"].append(
             t_(
@@ -34,10 +34,16 @@ async def recount_reactions(
         async for user in reaction.users():
             if user.bot:
                 continue
-            await bot.db.users.create(user.id, user.bot)
-            await bot.db.members.create(user.id, message.guild.id)
-            await bot.db.reactions.create_reaction_user(
-                clean, message.id, user.id
+            await bot.db.ensure_reaction_context(
+                message.guild.id,
+                message.channel.id,
+                message.id,
+                message.author.id,
+                message.author.bot,
+                message.channel.is_nsfw(),
+                user.id,
+                user.bot,
+                clean,
             )
 
     await starboard_funcs.update_message(bot, message.id, message.guild.id)
@@ -63,6 +69,6 @@ async def scan_recount(
             )
         else:
             message = await bot.cache.fetch_message(
-                message.guild.id, int(orig["channel_id"]), int(orig["id"])
+                message.guild.id, orig["channel_id"], orig["id"]
             )
         await recount_reactions(bot, message, sbemojis=sbemojis)
@@ -8,6 +8,12 @@ from app.classes.bot import Bot
 from app.classes.context import MyContext
 from app.cogs.leveling import leveling_funcs
 from app.cogs.starboard import starboard_funcs
+from app.database.queries import (
+    RESET_LEADERBOARD,
+    SET_MEMBER_XP,
+    TRASHED_MESSAGES,
+    UNTRASH_ALL,
+)
 from app.i18n import t_
 
 from . import cleaner, debugger, recounter, utility_funcs
@@ -100,10 +106,7 @@ class Utility(
             await ctx.send(t_("Cancelled."))
             return
         await self.bot.db.execute(
-            """UPDATE members
-            SET xp=0,
-            level=0
-            WHERE guild_id=$1""",
+            RESET_LEADERBOARD,
             ctx.guild.id,
         )
         await ctx.send(t_("Reset the leaderboard."))
@@ -128,11 +131,7 @@ class Utility(
 
         new_level = leveling_funcs.current_level(xp)
         await self.bot.db.execute(
-            """UPDATE members
-            SET xp=$1,
-            level=$2
-            WHERE user_id=$3
-            AND guild_id=$4""",
+            SET_MEMBER_XP,
             xp,
             new_level,
             user.id,
@@ -194,8 +193,8 @@ class Utility(
         else:
             message = await self.bot.cache.fetch_message(
                 ctx.guild.id,
-                int(orig_sql_message["channel_id"]),
-                int(orig_sql_message["id"]),
+                orig_sql_message["channel_id"],
+                orig_sql_message["id"],
             )
         async with ctx.typing():
             await recounter.recount_reactions(self.bot, message)
@@ -489,8 +488,7 @@ class Utility(
     @commands.guild_only()
     async def trashcan(self, ctx: "MyContext") -> None:
         trashed_messages = await self.bot.db.fetch(
-            """SELECT * FROM messages
-            WHERE guild_id=$1 AND trashed=True""",
+            TRASHED_MESSAGES,
             ctx.guild.id,
         )
         if len(trashed_messages) == 0:
@@ -532,9 +530,7 @@ class Utility(
         ).start(ctx):
             await ctx.send("Cancelled.")
         await self.bot.db.execute(
-            """UPDATE messages
-            SET trashed=False
-            WHERE guild_id=$1 and trashed=True""",
+            UNTRASH_ALL,
             ctx.guild.id,
         )
         await ctx.send(t_("All messages have been untrashed."))
@@ -655,12 +651,11 @@ class Utility(
             ).format(jump, orig),
         )
         for s in await self.bot.db.starboards.get_many(ctx.guild.id):
-            s_obj = ctx.guild.get_channel(int(s["id"]))
+            s_obj = ctx.guild.get_channel(s["id"])
             if not s_obj:
                 continue
             sb_message = await self.bot.db.fetchrow(
-                """SELECT * FROM starboard_messages
-                WHERE orig_id=$1 AND starboard_id=$2""",
+                starboard_funcs.GET_STARBOARD_MESSAGE,
                 orig["id"],
                 s["id"],
             )
@@ -4,6 +4,12 @@ import discord
 
 from app.classes.bot import Bot
 from app.cogs.starboard import starboard_funcs
+from app.database.queries import (
+    SET_FORCED,
+    SET_FROZEN,
+    SET_TRASH_REASON,
+    SET_TRASHED,
+)
 from app.i18n import t_
 
 
@@ -20,9 +26,9 @@ async def handle_purging(
     total = 0
 
     def check(m: discord.Message, sql: dict) -> bool:
-        if by and int(sql["author_id"]) != by.id:
+        if by and sql["author_id"] != by.id:
             return False
-        if notby and int(sql["author_id"]) == notby.id:
+        if notby and sql["author_id"] == notby.id:
             return False
 
         em_content = m.embeds[0].description if m.embeds else ""
@@ -61,9 +67,7 @@ async def handle_freezing(
     bot: Bot, message_id: int, guild_id: int, freeze: bool
 ) -> None:
     await bot.db.execute(
-        """UPDATE messages
-        SET frozen=$1
-        WHERE id=$2""",
+        SET_FROZEN,
         freeze,
         message_id,
     )
@@ -99,9 +103,7 @@ async def handle_forcing(
             new_forced.remove(s)
 
     await bot.db.execute(
-        """UPDATE messages
-        SET forced=$1::numeric[]
-        WHERE id=$2""",
+        SET_FORCED,
         new_forced,
         message_id,
     )
@@ -113,9 +115,7 @@ async def set_trash_reason(
     bot: Bot, message_id: int, guild_id: int, reason: str
 ) -> None:
     await bot.db.execute(
-        """UPDATE messages
-        SET trash_reason=$1
-        WHERE id=$2""",
+        SET_TRASH_REASON,
         reason,
         message_id,
     )
@@ -126,10 +126,7 @@ async def handle_trashing(
     bot: Bot, message_id: int, guild_id: int, trash: bool, reason: str = None
 ) -> None:
     await bot.db.execute(
-        """UPDATE messages
-        SET trashed=$1,
-        trash_reason=$2
-        WHERE id=$3""",
+        SET_TRASHED,
         trash,
         reason,
         message_id,
@@ -270,7 +270,7 @@ class PermRole(commands.RoleConverter):
         group = ctx.args[self.group_arg_index]
         role = await super().convert(ctx, arg)
 
-        permrole = await ctx.bot.db.permroles.get(role.id, int(group["id"]))
+        permrole = await ctx.bot.db.permroles.get(role.id, group["id"])
         if not permrole:
             raise errors.PermRoleNotFound(role.name, group["name"])
         return SQLObject(role, permrole)
@@ -1,5 +1,5 @@
 import os
-from typing import Dict, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import asyncpg
 import dotenv
@@ -11,7 +11,7 @@ from quart_discord import AccessDenied, DiscordOAuth2Session, Unauthorized
 from quart_discord.utils import requires_authorization
 
 import config
-from app.classes.ipc_connection import WebsocketConnection
+from app.classes.ipc_connection import HUB, WebsocketConnection
 from app.dashboard.db_wrapper import Wrapper
 
 from . import app_config
@@ -50,9 +50,12 @@ async def get_guild(guild_id: int):
 async def get_guild_channels(guild_id: int) -> Dict[str, Dict[int, str]]:
     channels: Dict[str, Dict[int, str]] = {}
     for c in await app.config["WEBSOCKET"].send_command(
-        "guild_channels", {"guild_id": guild_id}, expect_resp=True
+        "guild_channels",
+        {"guild_id": guild_id},
+        expect_resp=True,
+        guild_id=guild_id,
     ):
-        channels.update(c["data"])
+        channels.update(c["data"] or {})
     return channels
 
 
@@ -79,6 +82,9 @@ async def handle_command(msg: dict) -> Optional[Union[dict, str]]:
     resp = None
     if cmd == "ping":
         resp = "pont"
+    if cmd == "invalidate":
+        if msg["author"] != "Dashboard":
+            await db.db.apply_invalidation(data["namespace"], data["key"])
     if cmd == "set_stats":
         app.config["STATS"][msg["author"]] = {
             "guilds": data["guild_count"],
@@ -88,6 +94,15 @@ async def handle_command(msg: dict) -> Optional[Union[dict, str]]:
     return resp
 
 
+async def publish_invalidation(namespace: str, key: Any) -> None:
+    try:
+        await app.config["WEBSOCKET"].send_command(
+            "invalidate", {"namespace": namespace, "key": key}
+        )
+    except Exception as e:
+        print("Unable to publish invalidation:", e)
+
+
 def bot_stats() -> Tuple[str, str, str]:
     return (  # TODO FIX THIS LOL
         humanize.intcomma(7124),
@@ -115,15 +130,27 @@ def can_manage_list(guilds: list) -> list:
     return result
 
 
+async def get_mutual(guild_ids: List[int]) -> List[int]:
+    """Returns the guilds that the bot is in, according to the IPC
+    server, without asking any cluster."""
+    resp = await app.config["WEBSOCKET"].send_command(
+        "mutual_guilds",
+        {"guild_ids": guild_ids},
+        expect_resp=True,
+        cluster=HUB,
+    )
+    mutual: List[int] = []
+    for r in resp:
+        mutual += r["data"] or []
+    return mutual
+
+
 async def does_share(guild) -> bool:
     try:
-        resp = await app.config["WEBSOCKET"].send_command(
-            "is_mutual", {"gid": guild.id}, expect_resp=True
-        )
+        return bool(await get_mutual([guild.id]))
     except Exception as e:
         print(e)
         return False
-    return any([s["data"] for s in resp])
 
 
 # Jump Routes
@@ -157,11 +184,7 @@ async def servers():
 
     mutual_ids = []
     try:
-        msgs = await app.config["WEBSOCKET"].send_command(
-            "get_mutual", [g.id for g in guilds], expect_resp=True
-        )
-        for msg in msgs:
-            mutual_ids += msg["data"]
+        mutual_ids = await get_mutual([g.id for g in guilds])
     except Exception as e:
         print(e)
 
@@ -229,19 +252,20 @@ async def server_starboards(guild_id: int):
     starboards = [dict(s) for s in await db.get_starboards(guild_id)]
     names = await app.config["WEBSOCKET"].send_command(
         "channel_names",
-        {"channel_ids": [int(s["id"]) for s in starboards]},
+        {"channel_ids": [s["id"] for s in starboards]},
         expect_resp=True,
+        guild_id=guild_id,
     )
     name_dict = {}
     for c in names:  # each cluster returns it's own response
-        for cid, name in c["data"].items():
+        for cid, name in (c["data"] or {}).items():
             if name:
                 name_dict[int(cid)] = name
 
     categories = await get_guild_channels(guild_id)
 
     for s in starboards:
-        s["name"] = name_dict[int(s["id"])]
+        s["name"] = name_dict[s["id"]]
 
     return await render_template(
         "dashboard/server/starboard/list.jinja",
@@ -303,7 +327,7 @@ async def delete_starboard(guild_id: int, starboard_id: int):
     if not await does_share(guild):
         return await handle_invite(guild.id)
 
-    starboard_ids = [int(s["id"]) for s in await db.get_starboards(guild_id)]
+    starboard_ids = [s["id"] for s in await db.get_starboards(guild_id)]
     if starboard_id not in starboard_ids:
         return redirect(url_for("server_starboards", guild_id=guild_id))
 
@@ -324,17 +348,18 @@ async def manage_starboard(guild_id: int, starboard_id: int):
     if not await does_share(guild):
         return await handle_invite(guild.id)
 
-    starboard_ids = [int(s["id"]) for s in await db.get_starboards(guild_id)]
+    starboard_ids = [s["id"] for s in await db.get_starboards(guild_id)]
     if starboard_id not in starboard_ids:
         return redirect(url_for("servers"))
 
     starboard = dict(await db.get_starboard(starboard_id))
     for c in await app.config["WEBSOCKET"].send_command(
         "channel_names",
-        {"channel_ids": [int(starboard["id"])]},
+        {"channel_ids": [starboard["id"]]},
         expect_resp=True,
+        guild_id=guild.id,
     ):
-        if c["data"][str(starboard["id"])]:
+        if c["data"] and c["data"].get(str(starboard["id"])):
             starboard["name"] = c["data"][str(starboard["id"])]
             break
     else:
@@ -442,7 +467,7 @@ async def handle_donate_event():
         "auth": request.headers["Authorization"],
     }
     await app.config["WEBSOCKET"].send_command(
-        "donate_event", data, expect_resp=False
+        "donate_event", data, expect_resp=False, shard_id=0
     )
     return "OK"
 
@@ -461,7 +486,7 @@ async def handle_topgg_vote():
                 pass
         await db.db.users.add_vote(int(data["user"]))
         await app.config["WEBSOCKET"].send_command(
-            "vote", data, expect_resp=False
+            "vote", data, expect_resp=False, shard_id=0
         )
     else:
         print("Test successful.")
@@ -487,9 +512,14 @@ async def before_first_request():
         print("Unable to connect to db:", e)
     try:
         app.config["WEBSOCKET"] = WebsocketConnection(
-            "Dashboard", handle_command
+            "Dashboard",
+            handle_command,
+            timeout=config.IPC_TIMEOUT,
+            serializers=config.IPC_SERIALIZERS,
+            compress_threshold=config.IPC_COMPRESS_THRESHOLD,
         )
         await app.config["WEBSOCKET"].ensure_connection()
+        db.db.invalidation_publisher = publish_invalidation
     except Exception as e:
         print("Unable to launch ipc, running with out it.")
         print(e)
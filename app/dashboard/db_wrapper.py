@@ -1,6 +1,8 @@
 import os
 from typing import Any, Dict, List
 
+import config
+
 from app.database.database import Database
 
 
@@ -15,6 +17,7 @@ class Wrapper:
             os.getenv("DB_NAME"),
             os.getenv("DB_USER"),
             os.getenv("DB_PASSWORD"),
+            **config.DATABASE_POOL,
         )
         self.ready = False
 
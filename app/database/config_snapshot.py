@@ -0,0 +1,201 @@
+import asyncio
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
+
+from app.classes.lru_cache import LRUCache
+
+from .permission_index import PermissionIndex
+from .queries import query
+
+if TYPE_CHECKING:
+    from app.database.database import Database
+
+# How many recounted messages each guild remembers. Forgetting one only
+# means it's recounted again.
+RECOUNTED_SIZE = 10_000
+# How many members each guild tracks stale stars for before it falls back
+# to recounting every message
+STALE_USERS_SIZE = 1_000
+
+
+LOAD_STARBOARDS = query(
+    "guild_config.starboards",
+    """SELECT * FROM starboards
+    WHERE guild_id=$1""",
+)
+
+LOAD_ASCHANNELS = query(
+    "guild_config.aschannels",
+    """SELECT * FROM aschannels
+    WHERE guild_id=$1""",
+)
+
+LOAD_PERMGROUPS = query(
+    "guild_config.permgroups",
+    """SELECT * FROM permgroups
+    WHERE guild_id=$1 ORDER BY index""",
+)
+
+LOAD_PERMROLES = query(
+    "guild_config.permroles",
+    """SELECT permroles.* FROM permroles
+    JOIN permgroups ON permgroups.id=permroles.permgroup_id
+    WHERE permgroups.guild_id=$1
+    ORDER BY permroles.index""",
+)
+
+
+class GuildConfig:
+    def __init__(
+        self,
+        guild_id: int,
+        starboards: List[dict],
+        aschannels: List[dict],
+        permgroups: List[dict],
+        permroles: Dict[int, List[dict]],
+        points_stale: bool = False,
+    ) -> None:
+        self.guild_id = guild_id
+        self.starboards = starboards
+        self.aschannels = aschannels
+        self.permgroups = permgroups  # ordered by index
+        self.permroles = permroles  # permgroup_id: ordered permroles
+
+        self._perm_index: Optional[PermissionIndex] = None
+
+        # Whether the config changed since this cluster started, in which
+        # case stored points may no longer be right, and each message
+        # needs a full recount before deltas can be applied to it again.
+        self.points_stale = points_stale
+        # Bumped whenever a member's stars may count differently
+        self.stamp = 0
+        # message_id: stamp when it was last recounted
+        self.recounted = LRUCache(RECOUNTED_SIZE)
+        # user_id: stamp when their roles last changed
+        self.stale_users: Dict[int, int] = {}
+
+    @property
+    def perm_index(self) -> PermissionIndex:
+        if self._perm_index is None:
+            self._perm_index = PermissionIndex(self.permgroups, self.permroles)
+        return self._perm_index
+
+    @property
+    def perm_role_ids(self) -> Set[int]:
+        return {pr["role_id"] for prs in self.permroles.values() for pr in prs}
+
+    def needs_recount(self, message_id: int) -> bool:
+        return self.points_stale and message_id not in self.recounted
+
+    def mark_stale(self, user_id: int) -> None:
+        """Marks the stars a member gave before now as possibly counting
+        differently, because their roles changed."""
+        self.stamp += 1
+        self.stale_users[user_id] = self.stamp
+        if len(self.stale_users) > STALE_USERS_SIZE:
+            self.points_stale = True
+            self.stale_users.clear()
+            self.recounted.clear()
+
+    def stale_users_for(self, message_id: int) -> List[int]:
+        """Members whose roles changed since the message was last
+        recounted. If any of them reacted to it, it needs a recount."""
+        last = self.recounted.peek(message_id, 0)
+        return [
+            user_id
+            for user_id, stamp in self.stale_users.items()
+            if stamp > last
+        ]
+
+    def mark_recounted(self, message_id: int, stamp: int) -> None:
+        """`stamp` is what self.stamp was when the recount started."""
+        self.recounted.set(message_id, stamp)
+
+    @property
+    def star_emojis(self) -> List[str]:
+        return [e for s in self.starboards for e in s["star_emojis"] or []]
+
+    def starboards_for_emoji(self, emoji: str) -> List[dict]:
+        return [
+            s for s in self.starboards if emoji in (s["star_emojis"] or [])
+        ]
+
+
+class GuildConfigSnapshot:
+    """A per-cluster, write-through snapshot of each guild's starboards,
+    aschannels, permgroups and permroles.
+
+    A guild is loaded once, on first access, and kept until one of the
+    mutators in database_functions calls invalidate()."""
+
+    def __init__(self, db: "Database") -> None:
+        self.db = db
+        self._configs: Dict[int, GuildConfig] = {}
+        self._loading: Dict[int, "asyncio.Future[GuildConfig]"] = {}
+        # Guilds whose config has changed since this process started
+        self._changed: Set[int] = set()
+
+        # Bumped on every invalidation so that a load that was already
+        # running when the config changed doesn't store stale data.
+        self._generation = 0
+
+    async def get(self, guild_id: int) -> GuildConfig:
+        guild_id = int(guild_id)
+        config = self._configs.get(guild_id)
+        if config is not None:
+            return config
+
+        fut = self._loading.get(guild_id)
+        if fut is None:
+            fut = asyncio.ensure_future(self._load(guild_id))
+            self._loading[guild_id] = fut
+
+            def _done(_):
+                if self._loading.get(guild_id) is fut:
+                    self._loading.pop(guild_id)
+
+            fut.add_done_callback(_done)
+
+        return await asyncio.shield(fut)
+
+    def invalidate(self, guild_id: int) -> None:
+        guild_id = int(guild_id)
+        self._generation += 1
+        self._changed.add(guild_id)
+        self._configs.pop(guild_id, None)
+        self._loading.pop(guild_id, None)
+
+    async def _load(self, guild_id: int) -> GuildConfig:
+        generation = self._generation
+
+        starboards = await self.db.fetch(
+            LOAD_STARBOARDS,
+            guild_id,
+        )
+        aschannels = await self.db.fetch(
+            LOAD_ASCHANNELS,
+            guild_id,
+        )
+        permgroups = await self.db.fetch(
+            LOAD_PERMGROUPS,
+            guild_id,
+        )
+        _permroles = await self.db.fetch(
+            LOAD_PERMROLES,
+            guild_id,
+        )
+
+        permroles: Dict[int, List[dict]] = {g["id"]: [] for g in permgroups}
+        for pr in _permroles:
+            permroles.setdefault(pr["permgroup_id"], []).append(pr)
+
+        config = GuildConfig(
+            guild_id,
+            starboards,
+            aschannels,
+            permgroups,
+            permroles,
+            points_stale=guild_id in self._changed,
+        )
+        if generation == self._generation:
+            self._configs[guild_id] = config
+        return config
@@ -1,9 +1,22 @@
-import pathlib
+import asyncio
 import time
-from typing import Any, Dict, List, Optional
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import asyncpg
 
+from .config_snapshot import GuildConfigSnapshot
 from .database_functions import (
     aschannels,
     autoredeem,
@@ -19,18 +32,100 @@ from .database_functions import (
     users,
     xproles,
 )
+from .migrations import Migrator
+from .queries import REGISTRY, Query, query, resolve
+
+ENSURE_GUILD = query(
+    "ensure.guild",
+    """INSERT INTO guilds (id) VALUES ($1)
+    ON CONFLICT DO NOTHING""",
+)
+ENSURE_USER = query(
+    "ensure.user",
+    """INSERT INTO users (id, is_bot) VALUES ($1, $2)
+    ON CONFLICT DO NOTHING""",
+)
+ENSURE_MEMBER = query(
+    "ensure.member",
+    """INSERT INTO members (user_id, guild_id) VALUES ($1, $2)
+    ON CONFLICT (user_id, guild_id) DO NOTHING""",
+)
+# Creates everything a reaction needs in one statement. Every part is
+# an upsert that does nothing on conflict, so it's safe to run again.
+# Foreign keys are checked at the end of the statement, after all of
+# the inserts.
+ENSURE_REACTION_CONTEXT = query(
+    "ensure.reaction_context",
+    """WITH people AS (
+        SELECT DISTINCT id, is_bot FROM (
+            VALUES ($7::bigint, $8::bool), ($4::bigint, $5::bool)
+        ) AS p (id, is_bot)
+        WHERE id IS NOT NULL
+    ), new_guild AS (
+        INSERT INTO guilds (id) VALUES ($1)
+        ON CONFLICT DO NOTHING
+    ), new_users AS (
+        INSERT INTO users (id, is_bot) SELECT id, is_bot FROM people
+        ON CONFLICT DO NOTHING
+    ), new_members AS (
+        INSERT INTO members (user_id, guild_id)
+        SELECT id, $1::bigint FROM people
+        ON CONFLICT (user_id, guild_id) DO NOTHING
+    ), new_message AS (
+        INSERT INTO messages
+        (id, guild_id, channel_id, author_id, is_nsfw)
+        VALUES ($3, $1, $2, $4, $6)
+        ON CONFLICT DO NOTHING
+    ), new_reaction AS (
+        INSERT INTO reactions (message_id, emoji) VALUES ($3, $9)
+        ON CONFLICT (message_id, emoji) DO NOTHING
+        RETURNING id
+    ), reaction AS (
+        SELECT id FROM new_reaction
+        UNION ALL
+        SELECT id FROM reactions WHERE message_id=$3 AND emoji=$9
+        LIMIT 1
+    ), new_reaction_user AS (
+        INSERT INTO reaction_users (reaction_id, user_id)
+        SELECT id, $7 FROM reaction
+        ON CONFLICT DO NOTHING
+        RETURNING reaction_id
+    )
+    SELECT
+        (SELECT id FROM reaction) AS reaction_id,
+        EXISTS (SELECT 1 FROM new_reaction_user) AS created""",
+)
 
 
 class Database:
-    def __init__(self, database: str, user: str, password: str) -> None:
+    def __init__(
+        self, database: str, user: str, password: str, **pool_kwargs: Any
+    ) -> None:
         self.name = database
         self.user = user
         self.password = password
 
+        # min_size, max_size, statement_cache_size,
+        # max_inactive_connection_lifetime, etc.
+        self.pool_kwargs = pool_kwargs
         self.pool: Optional[asyncpg.pool.Pool] = None
+        self._session: ContextVar[
+            Optional[Tuple[asyncio.Task, asyncpg.Connection]]
+        ] = ContextVar("db_session", default=None)
 
         self.sql_times: dict = {}
 
+        self.guild_config = GuildConfigSnapshot(self)
+
+        # Set by the bot and the dashboard to send invalidations to the
+        # other processes over IPC.
+        self.invalidation_publisher: Optional[
+            Callable[[str, Any], Awaitable[None]]
+        ] = None
+        # Set by the bot, so that regexes that are no longer used can be
+        # dropped from its RegexEngine's caches
+        self.forget_pattern: Optional[Callable[[str], None]] = None
+
         self.guilds = guilds.Guilds(self)
         self.members = members.Members(self)
         self.users = users.Users(self)
@@ -45,55 +140,167 @@ class Database:
         self.sb_messages = sb_messags.SBMessages(self)
         self.reactions = reactions.Reactions(self)
 
-    def log(self, sql: str, time: float) -> None:
-        self.sql_times.setdefault(sql, [])
-        self.sql_times[sql].append(time)
+    async def invalidate(self, namespace: str, key: Any) -> None:
+        """Drops a cached item in this process and every other process
+        connected to IPC."""
+        await self.apply_invalidation(namespace, key)
+        if self.invalidation_publisher:
+            await self.invalidation_publisher(namespace, key)
+
+    async def apply_invalidation(self, namespace: str, key: Any) -> None:
+        if namespace == "guild_config":
+            self.guild_config.invalidate(key)
+        elif namespace == "guilds":
+            await self.guilds.cache.delete(key)
+        elif namespace == "starboards":
+            await self.starboards.cache.delete(key)
+        elif namespace == "asc_id":
+            await self.aschannels.id_cache.delete(key)
+        elif namespace == "regex":
+            if self.forget_pattern:
+                self.forget_pattern(key)
+        else:
+            raise ValueError(f"Unknown cache namespace {namespace}.")
+
+    def log(self, key: str, time: float) -> None:
+        self.sql_times.setdefault(key, [])
+        self.sql_times[key].append(time)
 
     async def init_database(self) -> None:
+        pool_kwargs = self.pool_kwargs.copy()
+        # Leave room in asyncpg's statement cache for every named query,
+        # plus some unnamed ones, so named queries stay prepared.
+        cache_size = pool_kwargs.get("statement_cache_size", 100)
+        if cache_size:
+            pool_kwargs["statement_cache_size"] = max(
+                cache_size, len(REGISTRY) + 100
+            )
+
         self.pool = await asyncpg.create_pool(
             database=self.name,
             user=self.user,
             password=self.password,
             host="127.0.0.1",
+            **pool_kwargs,
         )
-        app_dir = pathlib.Path("app/database/")
+        await Migrator(self.pool).migrate()
 
-        async with self.pool.acquire() as con:
-            async with con.transaction():
-                with open(app_dir / "types.sql", "r") as f:
-                    await con.execute(f.read())
-                with open(app_dir / "tables.sql", "r") as f:
-                    await con.execute(f.read())
-                with open(app_dir / "indexes.sql", "r") as f:
-                    await con.execute(f.read())
-
-    async def execute(self, sql: str, *args: Any) -> None:
-        async with self.pool.acquire() as con:
-            async with con.transaction():
-                s = time.perf_counter()
-                await con.execute(sql, *args)
-        self.log(sql, time.perf_counter() - s)
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[asyncpg.Connection]:
+        """Reuses one pool connection for every query the current task
+        makes inside this block. Tasks created inside the block still
+        acquire their own connections.
+
+        The connection is held for the whole block, so it should only
+        wrap database calls. Waiting on Discord, or on anything that
+        needs a connection of its own, inside it can exhaust the pool."""
+        task = asyncio.current_task()
+        current = self._session.get()
+        if current is not None and current[0] is task:
+            yield current[1]
+            return
 
-    async def fetch(self, sql: str, *args: Any) -> List[Dict]:
         async with self.pool.acquire() as con:
+            token = self._session.set((task, con))
+            try:
+                yield con
+            finally:
+                self._session.reset(token)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[asyncpg.Connection]:
+        async with self.session() as con:
             async with con.transaction():
-                s = time.perf_counter()
-                result = await con.fetch(sql, *args)
-        self.log(sql, time.perf_counter() - s)
+                yield con
+
+    @asynccontextmanager
+    async def _connection(self) -> AsyncIterator[asyncpg.Connection]:
+        current = self._session.get()
+        if current is not None and current[0] is asyncio.current_task():
+            yield current[1]
+        else:
+            async with self.pool.acquire() as con:
+                yield con
+
+    async def ensure_member(
+        self, user_id: int, is_bot: bool, guild_id: int
+    ) -> None:
+        """Ensures the guild, user and member rows exist."""
+        async with self.transaction():
+            await self.execute(ENSURE_GUILD, guild_id)
+            await self.execute(ENSURE_USER, user_id, is_bot)
+            await self.execute(ENSURE_MEMBER, user_id, guild_id)
+
+    async def ensure_reaction_context(
+        self,
+        guild_id: int,
+        channel_id: int,
+        message_id: int,
+        author_id: Optional[int],
+        author_is_bot: bool,
+        is_nsfw: bool,
+        giver_id: int,
+        giver_is_bot: bool,
+        emoji: str,
+    ) -> bool:
+        """Ensures everything needed to store a reaction exists (the
+        guild, giver, author, their member rows, the message, and the
+        reaction) and then creates the reaction user, in one statement.
+
+        Returns True if the reaction user already existed."""
+        args = (
+            guild_id,
+            channel_id,
+            message_id,
+            author_id,
+            author_is_bot,
+            is_nsfw,
+            giver_id,
+            giver_is_bot,
+            emoji,
+        )
+        row = await self.fetchrow(ENSURE_REACTION_CONTEXT, *args)
+        if row["reaction_id"] is None:
+            # Another transaction inserted the reaction after this
+            # statement's snapshot was taken, so run it again with a
+            # fresh one.
+            row = await self.fetchrow(ENSURE_REACTION_CONTEXT, *args)
+        return not row["created"]
+
+    # Single statements run in autocommit mode, so they don't need to be
+    # wrapped in a transaction. Use db.transaction() for anything that
+    # needs more than one statement to be atomic.
+    async def execute(self, sql: Union[str, Query], *args: Any) -> None:
+        key, sql = resolve(sql)
+        async with self._connection() as con:
+            s = time.perf_counter()
+            await con.execute(sql, *args)
+        self.log(key, time.perf_counter() - s)
+
+    async def fetch(self, sql: Union[str, Query], *args: Any) -> List[Dict]:
+        key, sql = resolve(sql)
+        async with self._connection() as con:
+            s = time.perf_counter()
+            result = await con.fetch(sql, *args)
+        self.log(key, time.perf_counter() - s)
         return result
 
-    async def fetchrow(self, sql: str, *args: Any) -> Optional[dict]:
-        async with self.pool.acquire() as con:
-            async with con.transaction():
-                s = time.perf_counter()
-                result = await con.fetchrow(sql, *args)
-        self.log(sql, time.perf_counter() - s)
+    async def fetchrow(
+        self, sql: Union[str, Query], *args: Any
+    ) -> Optional[dict]:
+        key, sql = resolve(sql)
+        async with self._connection() as con:
+            s = time.perf_counter()
+            result = await con.fetchrow(sql, *args)
+        self.log(key, time.perf_counter() - s)
         return result
 
-    async def fetchval(self, sql: str, *args: Any) -> Optional[Any]:
-        async with self.pool.acquire() as con:
-            async with con.transaction():
-                s = time.perf_counter()
-                result = await con.fetchval(sql, *args)
-        self.log(sql, time.perf_counter() - s)
+    async def fetchval(
+        self, sql: Union[str, Query], *args: Any
+    ) -> Optional[Any]:
+        key, sql = resolve(sql)
+        async with self._connection() as con:
+            s = time.perf_counter()
+            result = await con.fetchval(sql, *args)
+        self.log(key, time.perf_counter() - s)
         return result
@@ -1,22 +1,70 @@
 from typing import TYPE_CHECKING, Dict, List, Optional
 
 import asyncpg
-import buildpg
 from aiocache import Cache, SimpleMemoryCache
 
+import config
 from app import commands, errors
 from app.cogs.premium.premium_funcs import can_increase, limit_for
 from app.constants import MISSING
+from app.database.queries import query
 from app.i18n import t_
 
 if TYPE_CHECKING:
     from app.database.database import Database
 
 
+GET = query(
+    "aschannels.get",
+    """SELECT * FROM aschannels
+    WHERE id=$1""",
+)
+
+CREATE_COUNT = query(
+    "aschannels.create_count",
+    """SELECT COUNT(1) FROM aschannels WHERE guild_id=$1""",
+)
+
+CREATE = query(
+    "aschannels.create",
+    """INSERT INTO aschannels (id, guild_id)
+    VALUES ($1, $2)""",
+)
+
+DELETE = query(
+    "aschannels.delete",
+    """DELETE FROM aschannels
+    WHERE id=$1""",
+)
+
+EDIT_SETTINGS = (
+    "emojis",
+    "min_chars",
+    "require_image",
+    "regex",
+    "exclude_regex",
+    "delete_invalid",
+)
+
+EDIT = query(
+    "aschannels.edit",
+    """UPDATE aschannels
+    SET emojis=$1,
+    min_chars=$2,
+    require_image=$3,
+    regex=$4,
+    exclude_regex=$5,
+    delete_invalid=$6
+    WHERE id=$7""",
+)
+
+
 class ASChannels:
     def __init__(self, db: "Database") -> None:
         self.db = db
-        self.id_cache: SimpleMemoryCache = Cache(namespace="asc_id", ttl=10)
+        self.id_cache: SimpleMemoryCache = Cache(
+            namespace="asc_id", ttl=config.DATABASE_CACHE_TTL
+        )
 
     async def get(self, aschannel_id: int) -> Optional[dict]:
         r = await self.id_cache.get(aschannel_id)
@@ -24,19 +72,15 @@ class ASChannels:
             return r if r is not MISSING else None
 
         r = await self.db.fetchrow(
-            """SELECT * FROM aschannels
-            WHERE id=$1""",
+            GET,
             aschannel_id,
         )
         await self.id_cache.set(aschannel_id, r if r else MISSING)
         return r
 
     async def get_many(self, guild_id: int) -> List[Dict]:
-        return await self.db.fetch(
-            """SELECT * FROM aschannels
-            WHERE guild_id=$1""",
-            guild_id,
-        )
+        config = await self.db.guild_config.get(guild_id)
+        return config.aschannels
 
     async def create(
         self, channel_id: int, guild_id: int, check_first: bool = True
@@ -50,7 +94,7 @@ class ASChannels:
         if is_starboard:
             raise errors.CannotBeStarboardAndAutostar()
         count = await self.db.fetchval(
-            """SELECT COUNT(1) FROM aschannels WHERE guild_id=$1""",
+            CREATE_COUNT,
             guild_id,
         )
         limit = await limit_for("aschannels", guild_id, self.db)
@@ -62,23 +106,25 @@ class ASChannels:
         await self.db.guilds.create(guild_id)
         try:
             await self.db.execute(
-                """INSERT INTO aschannels (id, guild_id)
-                VALUES ($1, $2)""",
+                CREATE,
                 channel_id,
                 guild_id,
             )
         except asyncpg.exceptions.UniqueViolationError:
             return True
-        await self.id_cache.delete(channel_id)
+        await self.db.invalidate("asc_id", channel_id)
+        await self.db.invalidate("guild_config", guild_id)
         return False
 
     async def delete(self, aschannel_id: int) -> None:
+        asc = await self.get(aschannel_id)
         await self.db.execute(
-            """DELETE FROM aschannels
-            WHERE id=$1""",
+            DELETE,
             aschannel_id,
         )
-        await self.id_cache.delete(aschannel_id)
+        await self.db.invalidate("asc_id", aschannel_id)
+        if asc:
+            await self.db.invalidate("guild_config", asc["guild_id"])
 
     async def edit(
         self,
@@ -89,17 +135,8 @@ class ASChannels:
         if not asc:
             raise errors.NotAutoStarChannel(str(aschannel_id))
 
-        valid_settings = [
-            "emojis",
-            "min_chars",
-            "require_image",
-            "regex",
-            "exclude_regex",
-            "delete_invalid",
-        ]
-
         settings = {}
-        for key in valid_settings:
+        for key in EDIT_SETTINGS:
             settings[key] = attrs.get(key, asc[key])
 
         if settings["min_chars"] < 0:
@@ -109,31 +146,22 @@ class ASChannels:
                 t_("minChars cannot be greater than 2,000.")
             )
 
-        asemojis_limit = await limit_for(
-            "asemojis", int(asc["guild_id"]), self.db
-        )
+        asemojis_limit = await limit_for("asemojis", asc["guild_id"], self.db)
         if len(settings["emojis"]) > asemojis_limit and len(
             settings["emojis"]
         ) > len(asc["emojis"]):
             raise errors.AsEmojiLimitReached(
-                await can_increase("asemojis", int(asc["guild_id"]), self.db)
+                await can_increase("asemojis", asc["guild_id"], self.db)
             )
 
-        query, args = buildpg.render(
-            """UPDATE aschannels
-            SET emojis=:emojis,
-            min_chars=:min_chars,
-            require_image=:require_image,
-            delete_invalid=:delete_invalid,
-            regex=:regex,
-            exclude_regex=:exclude_regex
-            WHERE id=:asc_id""",
-            **settings,
-            asc_id=aschannel_id,
+        await self.db.execute(
+            EDIT, *(settings[key] for key in EDIT_SETTINGS), aschannel_id
         )
-
-        await self.db.execute(query, *args)
-        await self.id_cache.delete(aschannel_id)
+        await self.db.invalidate("asc_id", aschannel_id)
+        await self.db.invalidate("guild_config", asc["guild_id"])
+        for key in ("regex", "exclude_regex"):
+            if asc[key] and settings[key] != asc[key]:
+                await self.db.invalidate("regex", asc[key])
 
     async def add_asemoji(self, aschannel_id: int, emoji: str) -> None:
         aschannel = await self.get(aschannel_id)
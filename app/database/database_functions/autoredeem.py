@@ -1,11 +1,49 @@
 from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from app import errors
+from app.database.queries import query
 
 if TYPE_CHECKING:
     from app.database.database import Database
 
 
+GET = query(
+    "autoredeem.get",
+    """SELECT * FROM autoredeem
+    WHERE guild_id=$1 AND user_id=$2""",
+)
+
+FIND_VALID = query(
+    "autoredeem.find_valid",
+    """SELECT * FROM autoredeem
+    WHERE guild_id=$1
+    AND EXISTS (
+        SELECT * FROM users
+        WHERE id=user_id
+        AND credits >= 3
+    )
+    ORDER BY enabled_on DESC""",
+)
+
+GET_USER_GUILDS = query(
+    "autoredeem.get_user_guilds",
+    """SELECT * FROM autoredeem WHERE user_id=$1""",
+)
+
+CREATE = query(
+    "autoredeem.create",
+    """INSERT INTO autoredeem (guild_id, user_id)
+    VALUES ($1, $2)""",
+)
+
+DELETE = query(
+    "autoredeem.delete",
+    """DELETE FROM autoredeem
+    WHERE guild_id=$1
+    AND user_id=$2""",
+)
+
+
 class Autoredeem:
     def __init__(self, db: "Database"):
         self.db = db
@@ -14,22 +52,14 @@ class Autoredeem:
         self, guild_id: int, user_id: int
     ) -> Optional[Dict[str, Any]]:
         return await self.db.fetchrow(
-            """SELECT * FROM autoredeem
-            WHERE guild_id=$1 AND user_id=$2""",
+            GET,
             guild_id,
             user_id,
         )
 
     async def find_valid(self, guild_id: int) -> List[Dict[str, Any]]:
         return await self.db.fetch(
-            """SELECT * FROM autoredeem
-            WHERE guild_id=$1
-            AND EXISTS (
-                SELECT * FROM users
-                WHERE id=user_id
-                AND credits >= 3
-            )
-            ORDER BY enabled_on DESC""",
+            FIND_VALID,
             guild_id,
         )
 
@@ -38,7 +68,7 @@ class Autoredeem:
         user_id: int,
     ) -> List[Dict[str, Any]]:
         return await self.db.fetch(
-            """SELECT * FROM autoredeem WHERE user_id=$1""",
+            GET_USER_GUILDS,
             user_id,
         )
 
@@ -46,17 +76,14 @@ class Autoredeem:
         if await self.get(guild_id, user_id):
             raise errors.AutoRedeemAlreadyOn()
         await self.db.execute(
-            """INSERT INTO autoredeem (guild_id, user_id)
-            VALUES ($1, $2)""",
+            CREATE,
             guild_id,
             user_id,
         )
 
     async def delete(self, guild_id: int, user_id: int):
         await self.db.execute(
-            """DELETE FROM autoredeem
-            WHERE guild_id=$1
-            AND user_id=$2""",
+            DELETE,
             guild_id,
             user_id,
         )
@@ -1,24 +1,162 @@
 import datetime
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, List, Optional
 
 import asyncpg
 from aiocache import Cache, SimpleMemoryCache
 
+import config
 from app import commands, constants, errors, i18n
+from app.database.queries import query
 from app.i18n import t_
 
 if TYPE_CHECKING:
     from app.database.database import Database
 
 
+DELETE = query(
+    "guilds.delete",
+    """DELETE FROM guilds WHERE id=$1""",
+)
+
+SET_XPROLE_STACK = query(
+    "guilds.set_xprole_stack",
+    """UPDATE guilds
+    SET stack_xp_roles=$1
+    WHERE id=$2""",
+)
+
+SET_POSROLE_STACK = query(
+    "guilds.set_posrole_stack",
+    """UPDATE guilds
+    SET stack_pos_roles=$1
+    WHERE id=$2""",
+)
+
+SET_COOLDOWN = query(
+    "guilds.set_cooldown",
+    """UPDATE guilds
+    SET xp_cooldown=$1,
+    xp_cooldown_per=$2
+    WHERE id=$3""",
+)
+
+SET_COOLDOWN_ENABLED = query(
+    "guilds.set_cooldown_enabled",
+    """UPDATE guilds
+    SET xp_cooldown_on=$1
+    WHERE id=$2""",
+)
+
+SET_LOCALE = query(
+    "guilds.set_locale",
+    """UPDATE guilds
+    SET locale=$1
+    WHERE id=$2""",
+)
+
+SET_PREMIUM_END = query(
+    "guilds.set_premium_end",
+    """UPDATE guilds
+    SET premium_end=$1
+    WHERE id=$2""",
+)
+
+SET_DISABLED_COMMANDS = query(
+    "guilds.set_disabled_commands",
+    """UPDATE guilds
+    SET disabled_commands=$1::text[]
+    WHERE id=$2""",
+)
+
+SET_PREFIXES = query(
+    "guilds.set_prefixes",
+    """UPDATE guilds
+    SET prefixes=$1
+    WHERE id=$2""",
+)
+
+SET_QA_ENABLED = query(
+    "guilds.set_qa_enabled",
+    """UPDATE guilds
+    SET qa_enabled=$1
+    WHERE id=$2""",
+)
+
+RESET_QUICKACTIONS = query(
+    "guilds.reset_quickactions",
+    """UPDATE guilds
+    SET qa_force='🔒',
+    qa_unforce='🔓',
+    qa_freeze='❄️',
+    qa_trash='🗑️',
+    qa_recount='🔃',
+    qa_save='📥'
+    WHERE id=$1""",
+)
+
+# action: query to set that QuickAction's emoji
+SET_QUICKACTION = {
+    action: query(
+        f"guilds.set_qa_{action}",
+        f"""UPDATE guilds
+        SET qa_{action}=$1
+        WHERE id=$2""",
+    )
+    for action in ("force", "unforce", "freeze", "trash", "recount", "save")
+}
+
+SET_LEVEL_CHANNEL = query(
+    "guilds.set_level_channel",
+    """UPDATE guilds
+    SET level_channel=$1
+    WHERE id=$2""",
+)
+
+SET_LOG_CHANNEL = query(
+    "guilds.set_log_channel",
+    """UPDATE guilds
+    SET log_channel=$1
+    WHERE id=$2""",
+)
+
+SET_PING_USER = query(
+    "guilds.set_ping_user",
+    """UPDATE guilds
+    SET ping_user=$1
+    WHERE id=$2""",
+)
+
+SET_ALLOW_COMMANDS = query(
+    "guilds.set_allow_commands",
+    """UPDATE guilds
+    SET allow_commands=$1
+    WHERE id=$2""",
+)
+
+GET = query(
+    "guilds.get",
+    """SELECT * FROM guilds
+    WHERE id=$1""",
+)
+
+CREATE = query(
+    "guilds.create",
+    """INSERT INTO guilds (id)
+    VALUES ($1)""",
+)
+
+
 class Guilds:
     def __init__(self, db: "Database") -> None:
         self.db = db
-        self.cache: SimpleMemoryCache = Cache(namespace="guilds", ttl=10)
+        self.cache: SimpleMemoryCache = Cache(
+            namespace="guilds", ttl=config.DATABASE_CACHE_TTL
+        )
 
     async def delete(self, guild_id: int):
-        await self.db.execute("""DELETE FROM guilds WHERE id=$1""", guild_id)
-        await self.cache.delete(guild_id)
+        await self.db.execute(DELETE, guild_id)
+        await self.db.invalidate("guilds", guild_id)
+        await self.db.invalidate("guild_config", guild_id)
 
     async def add_months(self, guild_id: int, months: int):
         guild = await self.get(guild_id)
@@ -26,33 +164,105 @@ class Guilds:
             guild["premium_end"] or datetime.datetime.utcnow()
         )
         to_add = datetime.timedelta(days=constants.PREMIUM_MONTH_DAYS * months)
+        await self.set_premium_end(guild_id, current + to_add)
+
+    async def set_premium_end(
+        self, guild_id: int, premium_end: Optional[datetime.datetime]
+    ) -> None:
+        await self.db.execute(SET_PREMIUM_END, premium_end, guild_id)
+        await self.db.invalidate("guilds", guild_id)
+
+    async def set_disabled_commands(
+        self, guild_id: int, disabled_commands: List[str]
+    ) -> None:
+        await self.db.execute(
+            SET_DISABLED_COMMANDS,
+            disabled_commands,
+            guild_id,
+        )
+        await self.db.invalidate("guilds", guild_id)
+
+    async def set_prefixes(self, guild_id: int, prefixes: List[str]) -> None:
+        await self.db.execute(
+            SET_PREFIXES,
+            prefixes,
+            guild_id,
+        )
+        await self.db.invalidate("guilds", guild_id)
+
+    async def set_qa_enabled(self, guild_id: int, enabled: bool) -> None:
+        await self.db.execute(
+            SET_QA_ENABLED,
+            enabled,
+            guild_id,
+        )
+        await self.db.invalidate("guilds", guild_id)
+
+    async def set_quickaction(
+        self, guild_id: int, action: str, emoji: str
+    ) -> None:
+        await self.db.execute(
+            SET_QUICKACTION[action],
+            emoji,
+            guild_id,
+        )
+        await self.db.invalidate("guilds", guild_id)
+
+    async def reset_quickactions(self, guild_id: int) -> None:
+        await self.db.execute(RESET_QUICKACTIONS, guild_id)
+        await self.db.invalidate("guilds", guild_id)
+
+    async def set_level_channel(
+        self, guild_id: int, channel_id: Optional[int]
+    ) -> None:
+        await self.db.execute(
+            SET_LEVEL_CHANNEL,
+            channel_id,
+            guild_id,
+        )
+        await self.db.invalidate("guilds", guild_id)
+
+    async def set_log_channel(
+        self, guild_id: int, channel_id: Optional[int]
+    ) -> None:
+        await self.db.execute(
+            SET_LOG_CHANNEL,
+            channel_id,
+            guild_id,
+        )
+        await self.db.invalidate("guilds", guild_id)
+
+    async def set_ping_user(self, guild_id: int, ping: bool) -> None:
+        await self.db.execute(
+            SET_PING_USER,
+            ping,
+            guild_id,
+        )
+        await self.db.invalidate("guilds", guild_id)
+
+    async def set_allow_commands(self, guild_id: int, allow: bool) -> None:
         await self.db.execute(
-            """UPDATE guilds
-            SET premium_end=$1
-            WHERE id=$2""",
-            current + to_add,
+            SET_ALLOW_COMMANDS,
+            allow,
             guild_id,
         )
+        await self.db.invalidate("guilds", guild_id)
 
     async def set_xprole_stack(self, guild_id: int, stack: bool):
         await self.db.execute(
-            """UPDATE guilds
-            SET stack_xp_roles=$1
-            WHERE id=$2""",
+            SET_XPROLE_STACK,
             stack,
             guild_id,
         )
-        await self.cache.delete(guild_id)
+        await self.db.invalidate("guilds", guild_id)
 
     async def set_posrole_stack(self, guild_id: int, stack: bool):
         await self.db.execute(
-            """UPDATE guilds
-            SET stack_pos_roles=$1
-            WHERE id=$2""",
+            SET_POSROLE_STACK,
             stack,
             guild_id,
         )
-        await self.cache.delete(guild_id)
+        await self.db.invalidate("guilds", guild_id)
 
     async def set_cooldown(self, guild_id: int, ammount: int, per: int):
         if ammount < 1:
@@ -72,45 +282,37 @@ class Guilds:
             )
 
         await self.db.execute(
-            """UPDATE guilds
-            SET xp_cooldown=$1,
-            xp_cooldown_per=$2
-            WHERE id=$3""",
+            SET_COOLDOWN,
             ammount,
             per,
             guild_id,
         )
-        await self.cache.delete(guild_id)
+        await self.db.invalidate("guilds", guild_id)
 
     async def set_cooldown_enabled(self, guild_id: int, enabled: bool):
         await self.db.execute(
-            """UPDATE guilds
-            SET xp_cooldown_on=$1
-            WHERE id=$2""",
+            SET_COOLDOWN_ENABLED,
             enabled,
             guild_id,
         )
-        await self.cache.delete(guild_id)
+        await self.db.invalidate("guilds", guild_id)
 
     async def set_locale(self, guild_id: int, locale: str) -> None:
         if locale not in i18n.locales:
             raise errors.InvalidLocale(locale)
         await self.db.execute(
-            """UPDATE guilds
-            SET locale=$1
-            WHERE id=$2""",
+            SET_LOCALE,
             locale,
             guild_id,
         )
-        await self.cache.delete(guild_id)
+        await self.db.invalidate("guilds", guild_id)
 
     async def get(self, guild_id: int) -> Optional[dict]:
         r = await self.cache.get(guild_id)
         if r:
             return r
         sql_guild = await self.db.fetchrow(
-            """SELECT * FROM guilds
-            WHERE id=$1""",
+            GET,
             guild_id,
         )
         await self.cache.set(guild_id, sql_guild)
@@ -124,11 +326,10 @@ class Guilds:
 
         try:
             await self.db.execute(
-                """INSERT INTO guilds (id)
-                VALUES ($1)""",
+                CREATE,
                 guild_id,
             )
         except asyncpg.exceptions.UniqueViolationError:
             return False
-        await self.cache.delete(guild_id)
+        await self.db.invalidate("guilds", guild_id)
         return True
@@ -2,6 +2,20 @@ from typing import Optional
 
 import asyncpg
 
+from app.database.queries import query
+
+GET = query(
+    "members.get",
+    """SELECT * FROM members
+    WHERE user_id=$1 AND guild_id=$2""",
+)
+
+CREATE = query(
+    "members.create",
+    """INSERT INTO members (user_id, guild_id)
+    VALUES ($1, $2)""",
+)
+
 
 class Members:
     def __init__(self, db) -> None:
@@ -9,8 +23,7 @@ class Members:
 
     async def get(self, user_id: int, guild_id: int) -> Optional[dict]:
         return await self.db.fetchrow(
-            """SELECT * FROM members
-            WHERE user_id=$1 AND guild_id=$2""",
+            GET,
             user_id,
             guild_id,
         )
@@ -27,8 +40,7 @@ class Members:
 
         try:
             await self.db.execute(
-                """INSERT INTO members (user_id, guild_id)
-                VALUES ($1, $2)""",
+                CREATE,
                 user_id,
                 guild_id,
             )
@@ -1,6 +1,20 @@
 import asyncpg
 
 from app import errors
+from app.database.queries import query
+
+GET = query(
+    "messages.get",
+    """SELECT * FROM messages
+    WHERE id=$1""",
+)
+
+CREATE = query(
+    "messages.create",
+    """INSERT INTO messages
+    (id, guild_id, channel_id, author_id, is_nsfw)
+    VALUES ($1, $2, $3, $4, $5)""",
+)
 
 
 class Messages:
@@ -9,8 +23,7 @@ class Messages:
 
     async def get(self, message_id: int) -> dict:
         return await self.db.fetchrow(
-            """SELECT * FROM messages
-            WHERE id=$1""",
+            GET,
             message_id,
         )
 
@@ -41,9 +54,7 @@ class Messages:
 
         try:
             await self.db.execute(
-                """INSERT INTO messages
-                (id, guild_id, channel_id, author_id, is_nsfw)
-                VALUES ($1, $2, $3, $4, $5)""",
+                CREATE,
                 message_id,
                 guild_id,
                 channel_id,
@@ -3,11 +3,74 @@ from typing import List, Optional
 
 from app import errors
 from app.cogs.premium.premium_funcs import can_increase, limit_for
+from app.database.queries import query
 
 if typing.TYPE_CHECKING:
     from app.database.database import Database
 
 
+CREATE = query(
+    "permgroups.create",
+    """INSERT INTO permgroups (guild_id, name, index)
+    VALUES ($1, $2, $3)""",
+)
+
+DELETE = query(
+    "permgroups.delete",
+    """DELETE FROM permgroups
+    WHERE id=$1""",
+)
+
+DELETE_SHIFT = query(
+    "permgroups.delete_shift",
+    """UPDATE permgroups
+    SET index = index - 1
+    WHERE index > $1
+    AND guild_id=$2""",
+)
+
+MOVE_SHIFT = query(
+    "permgroups.move_shift",
+    """UPDATE permgroups
+    SET index=index+$1
+    WHERE guild_id=$2
+    AND index BETWEEN $3 AND $4""",
+)
+
+MOVE_SET_INDEX = query(
+    "permgroups.move_set_index",
+    """UPDATE permgroups
+    SET index=$1
+    WHERE id=$2""",
+)
+
+SET_STARBOARDS = query(
+    "permgroups.set_starboards",
+    """UPDATE permgroups
+    SET starboards=$1
+    WHERE id=$2""",
+)
+
+SET_CHANNELS = query(
+    "permgroups.set_channels",
+    """UPDATE permgroups
+    SET channels=$1
+    WHERE id=$2""",
+)
+
+GET_NAME = query(
+    "permgroups.get_name",
+    """SELECT * FROM permgroups
+    WHERE name=$1 AND guild_id=$2""",
+)
+
+GET_ID = query(
+    "permgroups.get_id",
+    """SELECT * FROM permgroups
+    WHERE id=$1""",
+)
+
+
 class PermGroups:
     def __init__(self, db: "Database"):
         self.db = db
@@ -29,29 +92,27 @@ class PermGroups:
         else:
             index = 1
 
-        return await self.db.fetchval(
-            """INSERT INTO permgroups (guild_id, name, index)
-            VALUES ($1, $2, $3)""",
+        permgroup_id = await self.db.fetchval(
+            CREATE,
             guild_id,
             name,
             index,
         )
+        await self.db.invalidate("guild_config", guild_id)
+        return permgroup_id
 
     async def delete(self, permgroup_id: int):
         group = await self.get_id(permgroup_id)
         await self.db.execute(
-            """DELETE FROM permgroups
-            WHERE id=$1""",
+            DELETE,
             permgroup_id,
         )
         await self.db.execute(
-            """UPDATE permgroups
-            SET index = index - 1
-            WHERE index > $1
-            AND guild_id=$2""",
+            DELETE_SHIFT,
             group["index"],
             group["guild_id"],
         )
+        await self.db.invalidate("guild_config", group["guild_id"])
 
     async def move(self, permgroup_id: int, new_index: int) -> int:
         group = await self.get_id(permgroup_id)
@@ -71,60 +132,51 @@ class PermGroups:
             return group["index"]
 
         await self.db.execute(
-            """UPDATE permgroups
-            SET index=index+$1
-            WHERE guild_id=$2
-            AND index BETWEEN $3 AND $4""",
+            MOVE_SHIFT,
             direction,
             group["guild_id"],
             min(group["index"], new_index),
             max(new_index, group["index"]),
         )
         await self.db.execute(
-            """UPDATE permgroups
-            SET index=$1
-            WHERE id=$2""",
+            MOVE_SET_INDEX,
             new_index,
             permgroup_id,
         )
+        await self.db.invalidate("guild_config", group["guild_id"])
         return new_index
 
     async def set_starboards(self, permgroup_id: int, starboards: List[int]):
+        group = await self.get_id(permgroup_id)
         await self.db.execute(
-            """UPDATE permgroups
-            SET starboards=$1
-            WHERE id=$2""",
+            SET_STARBOARDS,
             starboards,
             permgroup_id,
         )
+        await self.db.invalidate("guild_config", group["guild_id"])
 
     async def set_channels(self, permgroup_id: int, channels: List[int]):
+        group = await self.get_id(permgroup_id)
         await self.db.execute(
-            """UPDATE permgroups
-            SET channels=$1
-            WHERE id=$2""",
+            SET_CHANNELS,
             channels,
             permgroup_id,
         )
+        await self.db.invalidate("guild_config", group["guild_id"])
 
     async def get_many(self, guild_id: int) -> List[dict]:
-        return await self.db.fetch(
-            """SELECT * FROM permgroups
-            WHERE guild_id=$1 ORDER BY index""",
-            guild_id,
-        )
+        config = await self.db.guild_config.get(guild_id)
+        return config.permgroups
 
     async def get_name(self, guild_id: int, name: str) -> Optional[dict]:
         return await self.db.fetchrow(
-            """SELECT * FROM permgroups
-            WHERE name=$1 AND guild_id=$2""",
+            GET_NAME,
             name.casefold(),
             guild_id,
         )
 
     async def get_id(self, permgroup_id: int) -> Optional[dict]:
         return await self.db.fetchrow(
-            """SELECT * FROM permgroups
-            WHERE id=$1""",
+            GET_ID,
             permgroup_id,
         )
@@ -1,24 +1,99 @@
 import typing
 from typing import Any, Dict, List, Optional
 
-import buildpg
-
 from app import errors
 from app.cogs.premium.premium_funcs import can_increase, limit_for
+from app.database.queries import query
 
 if typing.TYPE_CHECKING:
     from app.database.database import Database
 
 
+CREATE = query(
+    "permroles.create",
+    """INSERT INTO permroles
+    (permgroup_id, role_id, index)
+    VALUES ($1, $2, $3)""",
+)
+
+DELETE = query(
+    "permroles.delete",
+    """DELETE FROM permroles WHERE role_id=$1 AND permgroup_id=$2""",
+)
+
+DELETE_SHIFT = query(
+    "permroles.delete_shift",
+    """UPDATE permroles
+    SET index = index - 1
+    WHERE permgroup_id=$1
+    AND index > $2""",
+)
+
+MOVE_SHIFT = query(
+    "permroles.move_shift",
+    """UPDATE permroles
+    SET index = index + $1
+    WHERE permgroup_id=$2
+    AND index BETWEEN $3 AND $4""",
+)
+
+MOVE_SET_INDEX = query(
+    "permroles.move_set_index",
+    """UPDATE permroles
+    SET index=$1
+    WHERE role_id=$2
+    AND permgroup_id=$3""",
+)
+
+GET_MANY = query(
+    "permroles.get_many",
+    """SELECT * FROM permroles
+    WHERE permgroup_id=$1 ORDER BY index""",
+)
+
+GET = query(
+    "permroles.get",
+    """SELECT * FROM permroles
+    WHERE role_id=$1
+    AND permgroup_id=$2""",
+)
+
+EDIT_SETTINGS = (
+    "allow_commands",
+    "on_starboard",
+    "give_stars",
+    "gain_xp",
+    "pos_roles",
+    "xp_roles",
+)
+
+EDIT = query(
+    "permroles.edit",
+    """UPDATE permroles
+    SET allow_commands=$1,
+    on_starboard=$2,
+    give_stars=$3,
+    gain_xp=$4,
+    pos_roles=$5,
+    xp_roles=$6
+    WHERE role_id=$7 AND permgroup_id=$8""",
+)
+
+
 class PermRoles:
     def __init__(self, db: "Database"):
         self.db = db
 
+    async def _permroles_edited(self, group_id: int) -> None:
+        permgroup = await self.db.permgroups.get_id(group_id)
+        if permgroup:
+            await self.db.invalidate("guild_config", permgroup["guild_id"])
+
     async def create(self, permgroup_id: int, role_id: int):
         permroles = await self.get_many(permgroup_id)
 
         permgroup = await self.db.permgroups.get_id(permgroup_id)
-        guild_id = int(permgroup["guild_id"])
+        guild_id = permgroup["guild_id"]
         limit = await limit_for("permroles", guild_id, self.db)
         if len(permroles) >= limit:
             raise errors.PermRoleLimitReached(
@@ -31,29 +106,26 @@ class PermRoles:
             next_index = 1
 
         await self.db.execute(
-            """INSERT INTO permroles
-            (permgroup_id, role_id, index)
-            VALUES ($1, $2, $3)""",
+            CREATE,
             permgroup_id,
             role_id,
             next_index,
         )
+        await self.db.invalidate("guild_config", guild_id)
 
     async def delete(self, role_id: int, group_id: int):
         permrole = await self.get(role_id, group_id)
         await self.db.execute(
-            """DELETE FROM permroles WHERE role_id=$1 AND permgroup_id=$2""",
+            DELETE,
             role_id,
             group_id,
         )
         await self.db.execute(
-            """UPDATE permroles
-            SET index = index - 1
-            WHERE permgroup_id=$1
-            AND index > $2""",
+            DELETE_SHIFT,
             group_id,
             permrole["index"],
         )
+        await self._permroles_edited(group_id)
 
     async def move(self, role_id: int, group_id: int, index: int) -> int:
         permroles = await self.get_many(group_id)
@@ -74,31 +146,25 @@ class PermRoles:
             return permrole["index"]
 
         await self.db.execute(
-            """UPDATE permroles
-            SET index = index + $1
-            WHERE permgroup_id=$2
-            AND index BETWEEN $3 AND $4""",
+            MOVE_SHIFT,
             direction,
             group_id,
             min(index, permrole["index"]),
             max(index, permrole["index"]),
         )
         await self.db.execute(
-            """UPDATE permroles
-            SET index=$1
-            WHERE role_id=$2
-            AND permgroup_id=$3""",
+            MOVE_SET_INDEX,
             index,
             role_id,
             group_id,
         )
+        await self._permroles_edited(group_id)
 
         return index
 
     async def get_many(self, group_id: int) -> List[Dict[Any, Any]]:
         return await self.db.fetch(
-            """SELECT * FROM permroles
-            WHERE permgroup_id=$1 ORDER BY index""",
+            GET_MANY,
             group_id,
         )
 
@@ -106,43 +172,24 @@ class PermRoles:
         self, role_id: int, group_id: int
     ) -> Optional[Dict[Any, Any]]:
         return await self.db.fetchrow(
-            """SELECT * FROM permroles
-            WHERE role_id=$1
-            AND permgroup_id=$2""",
+            GET,
             role_id,
             group_id,
         )
 
     async def edit(self, role_id: int, group_id: int, **attrs):
-        valid_settings = [
-            "allow_commands",
-            "on_starboard",
-            "give_stars",
-            "gain_xp",
-            "pos_roles",
-            "xp_roles",
-        ]
-
         permrole = await self.get(role_id, group_id)
         if not permrole:
             raise errors.PermRoleNotFound(role_id, group_id)
 
         settings = {}
-        for key in valid_settings:
+        for key in EDIT_SETTINGS:
             settings[key] = attrs.get(key, permrole[key])
 
-        query, args = buildpg.render(
-            """UPDATE permroles
-            SET allow_commands=:allow_commands,
-            on_starboard=:on_starboard,
-            give_stars=:give_stars,
-            gain_xp=:gain_xp,
-            pos_roles=:pos_roles,
-            xp_roles=:xp_roles
-            WHERE role_id=:role_id AND permgroup_id=:group_id""",
-            **settings,
-            role_id=role_id,
-            group_id=group_id,
+        await self.db.execute(
+            EDIT,
+            *(settings[key] for key in EDIT_SETTINGS),
+            role_id,
+            group_id,
         )
-
-        await self.db.execute(query, *args)
+        await self._permroles_edited(group_id)
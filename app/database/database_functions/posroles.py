@@ -4,12 +4,72 @@ import asyncpg
 
 from app import commands, errors
 from app.cogs.premium.premium_funcs import can_increase, limit_for
+from app.database.queries import query
 from app.i18n import t_
 
 if TYPE_CHECKING:
     from app.database.database import Database
 
 
+GIVE_POSROLE = query(
+    "posroles.give_posrole",
+    """INSERT INTO members_posroles (role_id, user_id, guild_id)
+    VALUES ($1, $2, $3)""",
+)
+
+REMOVE_POSROLE = query(
+    "posroles.remove_posrole",
+    """DELETE FROM members_posroles
+    WHERE role_id=$1 AND user_id=$2""",
+)
+
+GET_POSROLE_MEMBERS = query(
+    "posroles.get_posrole_members",
+    """SELECT user_id FROM members_posroles
+    WHERE role_id=$1""",
+)
+
+GET_MEMBER_POSROLES = query(
+    "posroles.get_member_posroles",
+    """SELECT role_id FROM members_posroles
+    WHERE user_id=$1 AND guild_id=$2""",
+)
+
+GET = query(
+    "posroles.get",
+    """SELECT * FROM posroles WHERE role_id=$1""",
+)
+
+GET_MANY = query(
+    "posroles.get_many",
+    """SELECT * FROM posroles WHERE guild_id=$1""",
+)
+
+CREATE_COUNT = query(
+    "posroles.create_count",
+    """SELECT COUNT(1) FROM posroles WHERE guild_id=$1""",
+)
+
+CREATE = query(
+    "posroles.create",
+    """INSERT INTO posroles
+    (role_id, guild_id, max_users)
+    VALUES($1, $2, $3)""",
+)
+
+DELETE = query(
+    "posroles.delete",
+    """DELETE FROM posroles WHERE role_id=$1""",
+)
+
+SET_MAX_USERS = query(
+    "posroles.set_max_users",
+    """UPDATE posroles
+    SET max_users=$1
+    WHERE role_id=$2""",
+)
+
+
 class PosRoles:
     def __init__(self, db: "Database"):
         self.db = db
@@ -17,8 +77,7 @@ class PosRoles:
     async def give_posrole(self, user_id: int, role_id: int, guild_id: int):
         try:
             await self.db.execute(
-                """INSERT INTO members_posroles (role_id, user_id, guild_id)
-                VALUES ($1, $2, $3)""",
+                GIVE_POSROLE,
                 role_id,
                 user_id,
                 guild_id,
@@ -28,8 +87,7 @@ class PosRoles:
 
     async def remove_posrole(self, user_id: int, role_id: int):
         await self.db.execute(
-            """DELETE FROM members_posroles
-            WHERE role_id=$1 AND user_id=$2""",
+            REMOVE_POSROLE,
             role_id,
             user_id,
         )
@@ -38,8 +96,7 @@ class PosRoles:
         return [
             d["user_id"]
             for d in await self.db.fetch(
-                """SELECT user_id FROM members_posroles
-                WHERE role_id=$1""",
+                GET_POSROLE_MEMBERS,
                 role_id,
             )
         ]
@@ -50,21 +107,18 @@ class PosRoles:
         return [
             d["role_id"]
             for d in await self.db.fetch(
-                """SELECT role_id FROM members_posroles
-                WHERE user_id=$1 AND guild_id=$2""",
+                GET_MEMBER_POSROLES,
                 user_id,
                 guild_id,
             )
         ]
 
     async def get(self, role_id: int) -> Optional[Dict[str, Any]]:
-        return await self.db.fetchrow(
-            """SELECT * FROM posroles WHERE role_id=$1""", role_id
-        )
+        return await self.db.fetchrow(GET, role_id)
 
     async def get_many(self, guild_id: int) -> List[Dict[str, Any]]:
         return await self.db.fetch(
-            """SELECT * FROM posroles WHERE guild_id=$1""",
+            GET_MANY,
             guild_id,
         )
 
@@ -81,7 +135,7 @@ class PosRoles:
             raise errors.PosRoleAndXpRole()
 
         count = await self.db.fetchval(
-            """SELECT COUNT(1) FROM posroles WHERE guild_id=$1""",
+            CREATE_COUNT,
             guild_id,
         )
         posroles_limit = await limit_for("posroles", guild_id, self.db)
@@ -91,9 +145,7 @@ class PosRoles:
             )
 
         await self.db.execute(
-            """INSERT INTO posroles
-            (role_id, guild_id, max_users)
-            VALUES($1, $2, $3)""",
+            CREATE,
             role_id,
             guild_id,
             max_users,
@@ -104,7 +156,7 @@ class PosRoles:
         role_id: int,
     ) -> None:
         await self.db.execute(
-            """DELETE FROM posroles WHERE role_id=$1""",
+            DELETE,
             role_id,
         )
 
@@ -117,9 +169,7 @@ class PosRoles:
             raise commands.BadArgument(t_("MaxUsers must be greater than 0."))
 
         await self.db.execute(
-            """UPDATE posroles
-            SET max_users=$1
-            WHERE role_id=$2""",
+            SET_MAX_USERS,
             max_users,
             role_id,
         )
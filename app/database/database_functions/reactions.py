@@ -3,6 +3,39 @@ from typing import Optional
 import asyncpg
 
 from app import errors
+from app.database.queries import query
+
+GET_REACTION = query(
+    "reactions.get_reaction",
+    """SELECT * FROM reactions
+    WHERE emoji=$1 AND message_id=$2""",
+)
+
+CREATE_REACTION = query(
+    "reactions.create_reaction",
+    """INSERT INTO reactions
+    (emoji, message_id)
+    VALUES ($1, $2)""",
+)
+
+GET_REACTION_USER = query(
+    "reactions.get_reaction_user",
+    """SELECT * FROM reaction_users
+    WHERE reaction_id=$1 AND user_id=$2""",
+)
+
+CREATE_REACTION_USER = query(
+    "reactions.create_reaction_user",
+    """INSERT INTO reaction_users
+    (reaction_id, user_id)
+    VALUES ($1, $2)""",
+)
+
+DELETE_REACTION_USER = query(
+    "reactions.delete_reaction_user",
+    """DELETE FROM reaction_users
+    WHERE reaction_id=$1 AND user_id=$2""",
+)
 
 
 class Reactions:
@@ -13,8 +46,7 @@ class Reactions:
         self, emoji: str, message_id: int
     ) -> Optional[dict]:
         return await self.db.fetchrow(
-            """SELECT * FROM reactions
-            WHERE emoji=$1 AND message_id=$2""",
+            GET_REACTION,
             emoji,
             message_id,
         )
@@ -29,9 +61,7 @@ class Reactions:
 
         try:
             await self.db.execute(
-                """INSERT INTO reactions
-                (emoji, message_id)
-                VALUES ($1, $2)""",
+                CREATE_REACTION,
                 emoji,
                 message_id,
             )
@@ -46,8 +76,7 @@ class Reactions:
         if reaction is None:
             return None
         return await self.db.fetchrow(
-            """SELECT * FROM reaction_users
-            WHERE reaction_id=$1 AND user_id=$2""",
+            GET_REACTION_USER,
             reaction["id"],
             user_id,
         )
@@ -75,9 +104,7 @@ class Reactions:
 
         try:
             await self.db.execute(
-                """INSERT INTO reaction_users
-                (reaction_id, user_id)
-                VALUES ($1, $2)""",
+                CREATE_REACTION_USER,
                 reaction["id"],
                 user_id,
             )
@@ -92,8 +119,7 @@ class Reactions:
         if reaction is None:
             return
         await self.db.execute(
-            """DELETE FROM reaction_users
-            WHERE reaction_id=$1 AND user_id=$2""",
+            DELETE_REACTION_USER,
             reaction["id"],
             user_id,
         )
@@ -3,6 +3,25 @@ from typing import Optional
 import asyncpg
 
 from app import errors
+from app.database.queries import query
+
+GET = query(
+    "sb_messages.get",
+    """SELECT * FROM starboard_messages
+    WHERE id=$1""",
+)
+
+CREATE = query(
+    "sb_messages.create",
+    """INSERT INTO starboard_messages
+    (id, orig_id, starboard_id)
+    VALUES ($1, $2, $3)""",
+)
+
+DELETE = query(
+    "sb_messages.delete",
+    """DELETE FROM starboard_messages WHERE id=$1""",
+)
 
 
 class SBMessages:
@@ -11,8 +30,7 @@ class SBMessages:
 
     async def get(self, message_id: int) -> Optional[dict]:
         return await self.db.fetchrow(
-            """SELECT * FROM starboard_messages
-            WHERE id=$1""",
+            GET,
             message_id,
         )
 
@@ -39,9 +57,7 @@ class SBMessages:
 
         try:
             await self.db.execute(
-                """INSERT INTO starboard_messages
-                (id, orig_id, starboard_id)
-                VALUES ($1, $2, $3)""",
+                CREATE,
                 message_id,
                 orig_id,
                 starboard_id,
@@ -51,6 +67,4 @@ class SBMessages:
         return False
 
     async def delete(self, message_id: int) -> None:
-        await self.db.execute(
-            """DELETE FROM starboard_messages WHERE id=$1""", message_id
-        )
+        await self.db.execute(DELETE, message_id)
@@ -1,77 +1,113 @@
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 
 import asyncpg
-import buildpg
 from aiocache import Cache, SimpleMemoryCache
 
+import config
 from app import commands, errors
 from app.cogs.premium.premium_funcs import can_increase, limit_for
+from app.database.queries import query
 from app.i18n import t_
 
 if TYPE_CHECKING:
     from app.database.database import Database
 
 
+GET = query(
+    "starboards.get",
+    """SELECT * FROM starboards
+    WHERE id=$1""",
+)
+
+CREATE_COUNT = query(
+    "starboards.create_count",
+    """SELECT COUNT(1) FROM starboards WHERE guild_id=$1""",
+)
+
+CREATE = query(
+    "starboards.create",
+    """INSERT INTO starboards (id, guild_id)
+    VALUES ($1, $2)""",
+)
+
+DELETE = query(
+    "starboards.delete",
+    """DELETE FROM starboards WHERE id=$1""",
+)
+
+SET_WEBHOOK = query(
+    "starboards.set_webhook",
+    """UPDATE starboards
+    SET webhook_url=$1
+    WHERE id=$2""",
+)
+
+EDIT_SETTINGS = (
+    "required",
+    "required_remove",
+    "autoreact",
+    "self_star",
+    "allow_bots",
+    "link_deletes",
+    "link_edits",
+    "images_only",
+    "no_xp",
+    "explore",
+    "star_emojis",
+    "display_emoji",
+    "regex",
+    "exclude_regex",
+    "color",
+    "ping",
+    "channel_bl",
+    "channel_wl",
+    "use_webhook",
+    "remove_invalid",
+    "webhook_avatar",
+    "webhook_name",
+    "nicknames",
+)
+
+EDIT = query(
+    "starboards.edit",
+    "UPDATE starboards SET "
+    + ", ".join(f"{key}=${i}" for i, key in enumerate(EDIT_SETTINGS, 1))
+    + f" WHERE id=${len(EDIT_SETTINGS) + 1}",
+)
+
+
 class Starboards:
     def __init__(self, db: "Database") -> None:
         self.db = db
-        self.cache: SimpleMemoryCache = Cache(namespace="starboards", ttl=10)
-        self.many_cache: SimpleMemoryCache = Cache(namespace="many_sb", ttl=10)
-        self.emoji_cache: SimpleMemoryCache = Cache(
-            namespace="sb_emojis", ttl=10
+        self.cache: SimpleMemoryCache = Cache(
+            namespace="starboards", ttl=config.DATABASE_CACHE_TTL
         )
 
     async def _starboard_edited(
         self, starboard_id: int, guild_id: Optional[int] = None
     ):
-        await self.cache.delete(starboard_id)
+        await self.db.invalidate("starboards", starboard_id)
         if guild_id:
-            await self.emoji_cache.delete(guild_id)
-            await self.many_cache.delete(guild_id)
+            await self.db.invalidate("guild_config", guild_id)
 
     async def star_emojis(self, guild_id: int) -> List[str]:
-        r = await self.emoji_cache.get(guild_id)
-        if r:
-            return r
-
-        _emojis = await self.db.execute(
-            """SELECT star_emojis FROM starboards
-            WHERE guild_id=$1""",
-            guild_id,
-        )
-        if _emojis:
-            emojis = [
-                emoji for record in _emojis for emoji in record["star_emojis"]
-            ]
-        else:
-            emojis = []
-
-        await self.emoji_cache.set(guild_id, emojis)
-        return emojis
+        config = await self.db.guild_config.get(guild_id)
+        return config.star_emojis
 
     async def get(self, starboard_id: int) -> Optional[dict]:
         r = await self.cache.get(starboard_id)
         if r:
             return r
         sql_starboard = await self.db.fetchrow(
-            """SELECT * FROM starboards
-            WHERE id=$1""",
+            GET,
             starboard_id,
         )
         await self.cache.set(starboard_id, sql_starboard)
         return sql_starboard
 
     async def get_many(self, guild_id: int) -> List[Dict[Any, Any]]:
-        r = await self.many_cache.get(guild_id)
-        if r:
-            return r
-        sql_starboards = await self.db.fetch(
-            """SELECT * FROM starboards
-            WHERE guild_id=$1""",
-            guild_id,
-        )
-        await self.many_cache.set(guild_id, sql_starboards)
-        return sql_starboards
+        config = await self.db.guild_config.get(guild_id)
+        return config.starboards
 
     async def create(
         self, channel_id: int, guild_id: int, check_first: bool = True
@@ -85,7 +121,7 @@ class Starboards:
         if is_asc:
             raise errors.CannotBeStarboardAndAutostar()
         count = await self.db.fetchval(
-            """SELECT COUNT(1) FROM starboards WHERE guild_id=$1""",
+            CREATE_COUNT,
             guild_id,
         )
         limit = await limit_for("starboards", guild_id, self.db)
@@ -97,8 +133,7 @@ class Starboards:
         await self.db.guilds.create(guild_id)
         try:
             await self.db.execute(
-                """INSERT INTO starboards (id, guild_id)
-                VALUES ($1, $2)""",
+                CREATE,
                 channel_id,
                 guild_id,
             )
@@ -114,24 +149,23 @@ class Starboards:
         if not s:
             return
 
-        await self.db.execute(
-            """DELETE FROM starboards WHERE id=$1""", starboard_id
-        )
+        await self.db.execute(DELETE, starboard_id)
 
-        await self._starboard_edited(starboard_id, int(s["guild_id"]))
+        await self._starboard_edited(starboard_id, s["guild_id"])
 
     async def set_webhook(self, starboard_id: int, url: Optional[str]):
         """This is not a user customizable setting.
 
         It does not belong under edit."""
+        s = await self.get(starboard_id)
         await self.db.execute(
-            """UPDATE starboards
-            SET webhook_url=$1
-            WHERE id=$2""",
+            SET_WEBHOOK,
             url,
             starboard_id,
         )
-        await self._starboard_edited(starboard_id)
+        await self._starboard_edited(
+            starboard_id, s["guild_id"] if s else None
+        )
 
     async def edit(
         self, starboard_id: int, **attrs: Union[int, bool, str, None]
@@ -140,34 +174,8 @@ class Starboards:
         if not s:
             raise errors.NotStarboard(starboard_id)
 
-        valid_settings = [
-            "required",
-            "required_remove",
-            "autoreact",
-            "self_star",
-            "allow_bots",
-            "link_deletes",
-            "link_edits",
-            "images_only",
-            "no_xp",
-            "explore",
-            "star_emojis",
-            "display_emoji",
-            "regex",
-            "exclude_regex",
-            "color",
-            "ping",
-            "channel_bl",
-            "channel_wl",
-            "use_webhook",
-            "remove_invalid",
-            "webhook_avatar",
-            "webhook_name",
-            "nicknames",
-        ]
-
         settings = {}
-        for key in valid_settings:
+        for key in EDIT_SETTINGS:
             settings[key] = attrs.get(key, s[key])
 
         if settings["required"] <= settings["required_remove"]:
@@ -194,49 +202,23 @@ class Starboards:
                 t_("requiredRemove cannot be greater than 495.")
             )
 
-        sbemojis_limit = await limit_for(
-            "sbemojis", int(s["guild_id"]), self.db
-        )
+        sbemojis_limit = await limit_for("sbemojis", s["guild_id"], self.db)
         if (
             len(settings["star_emojis"]) > sbemojis_limit
             # make sure they're actually adding an emoji:
             and len(settings["star_emojis"]) > len(s["star_emojis"])
         ):
             raise errors.SbEmojiLimitReached(
-                await can_increase("sbemojis", int(s["guild_id"]), self.db)
+                await can_increase("sbemojis", s["guild_id"], self.db)
             )
 
-        query, args = buildpg.render(
-            """UPDATE starboards
-            SET required = :required,
-            required_remove = :required_remove,
-            autoreact = :autoreact,
-            self_star = :self_star,
-            allow_bots = :allow_bots,
-            link_deletes = :link_deletes,
-            link_edits = :link_edits,
-            images_only = :images_only,
-            no_xp = :no_xp,
-            explore = :explore,
-            star_emojis = :star_emojis,
-            display_emoji = :display_emoji,
-            regex = :regex,
-            exclude_regex = :exclude_regex,
-            color = :color,
-            ping = :ping,
-            channel_bl = :channel_bl,
-            channel_wl = :channel_wl,
-            use_webhook = :use_webhook,
-            remove_invalid = :remove_invalid,
-            webhook_avatar = :webhook_avatar,
-            webhook_name = :webhook_name,
-            nicknames = :nicknames
-            WHERE id = :starboard_id""",
-            **settings,
-            starboard_id=starboard_id,
+        await self.db.execute(
+            EDIT, *(settings[key] for key in EDIT_SETTINGS), starboard_id
         )
-        await self.db.execute(query, *args)
-        await self._starboard_edited(starboard_id, int(s["guild_id"]))
+        await self._starboard_edited(starboard_id, s["guild_id"])
+        for key in ("regex", "exclude_regex"):
+            if s[key] and settings[key] != s[key]:
+                await self.db.invalidate("regex", s[key])
 
     async def add_star_emoji(self, starboard_id: int, emoji: str) -> None:
         if not isinstance(emoji, str):
@@ -266,7 +248,7 @@ class Starboards:
         if emoji not in starboard["star_emojis"]:
             raise errors.AlreadySBEmoji(emoji, starboard["id"])
 
-        new_emojis = starboard["star_emojis"]
+        new_emojis = starboard["star_emojis"].copy()
         new_emojis.remove(emoji)
 
         await self.edit(starboard_id, star_emojis=new_emojis)
@@ -2,10 +2,45 @@ from typing import TYPE_CHECKING, Optional
 
 import asyncpg
 
+from app.database.queries import query
+
 if TYPE_CHECKING:
     from app.database.database import Database
 
 
+SET_PATRON_STATUS = query(
+    "users.set_patron_status",
+    """UPDATE users SET patron_status=$1 WHERE id=$2""",
+)
+
+ADD_VOTE = query(
+    "users.add_vote",
+    """UPDATE users
+    SET votes = votes + 1
+    WHERE id=$1""",
+)
+
+EDIT = query(
+    "users.edit",
+    """UPDATE users
+    SET locale=$1,
+    public=$2
+    WHERE id=$3""",
+)
+
+GET = query(
+    "users.get",
+    """SELECT * FROM users
+    WHERE id=$1""",
+)
+
+CREATE = query(
+    "users.create",
+    """INSERT INTO users (id, is_bot)
+    VALUES ($1, $2)""",
+)
+
+
 class Users:
     def __init__(self, db: "Database") -> None:
         self.db = db
@@ -16,16 +51,14 @@ class Users:
         status: str,
     ):
         await self.db.execute(
-            """UPDATE users SET patron_status=$1 WHERE id=$2""",
+            SET_PATRON_STATUS,
             status,
             user_id,
         )
 
     async def add_vote(self, user_id: int):
         await self.db.execute(
-            """UPDATE users
-            SET votes = votes + 1
-            WHERE id=$1""",
+            ADD_VOTE,
             user_id,
         )
 
@@ -43,10 +76,7 @@ class Users:
         }
 
         await self.db.execute(
-            """UPDATE users
-            SET locale=$1,
-            public=$2
-            WHERE id=$3""",
+            EDIT,
             settings["locale"],
             settings["public"],
             user_id,
@@ -54,8 +84,7 @@ class Users:
 
     async def get(self, user_id: int) -> Optional[dict]:
         return await self.db.fetchrow(
-            """SELECT * FROM users
-            WHERE id=$1""",
+            GET,
             user_id,
         )
 
@@ -69,8 +98,7 @@ class Users:
 
         try:
             await self.db.execute(
-                """INSERT INTO users (id, is_bot)
-                VALUES ($1, $2)""",
+                CREATE,
                 user_id,
                 is_bot,
             )
@@ -2,25 +2,55 @@ from typing import TYPE_CHECKING, Any, Dict, List
 
 from app import commands, errors
 from app.cogs.premium.premium_funcs import can_increase, limit_for
+from app.database.queries import query
 from app.i18n import t_
 
 if TYPE_CHECKING:
     from app.database.database import Database
 
 
+GET = query(
+    "xproles.get",
+    """SELECT * FROM xproles WHERE role_id=$1""",
+)
+
+GET_MANY = query(
+    "xproles.get_many",
+    """SELECT * FROM xproles WHERE guild_id=$1""",
+)
+
+CREATE_COUNT = query(
+    "xproles.create_count",
+    "SELECT COUNT(1) FROM xproles WHERE guild_id=$1",
+)
+
+CREATE = query(
+    "xproles.create",
+    """INSERT INTO xproles (role_id, guild_id, required)
+    VALUES ($1, $2, $3)""",
+)
+
+DELETE = query(
+    "xproles.delete",
+    """DELETE FROM xproles WHERE role_id=$1""",
+)
+
+SET_REQUIRED = query(
+    "xproles.set_required",
+    """UPDATE xproles SET required=$1
+    WHERE role_id=$2""",
+)
+
+
 class XPRoles:
     def __init__(self, db: "Database"):
         self.db = db
 
     async def get(self, role_id: int) -> dict:
-        return await self.db.fetchrow(
-            """SELECT * FROM xproles WHERE role_id=$1""", role_id
-        )
+        return await self.db.fetchrow(GET, role_id)
 
     async def get_many(self, guild_id: int) -> List[Dict[Any, Any]]:
-        return await self.db.fetch(
-            """SELECT * FROM xproles WHERE guild_id=$1""", guild_id
-        )
+        return await self.db.fetch(GET_MANY, guild_id)
 
     async def create(
         self,
@@ -34,9 +64,7 @@ class XPRoles:
         if await self.db.posroles.get(role_id) is not None:
             raise errors.PosRoleAndXpRole()
 
-        count = await self.db.fetchval(
-            "SELECT COUNT(1) FROM xproles WHERE guild_id=$1", guild_id
-        )
+        count = await self.db.fetchval(CREATE_COUNT, guild_id)
         xproles_limit = await limit_for("xproles", guild_id, self.db)
         if count >= xproles_limit:
             raise errors.XpRoleLimitReached(
@@ -44,24 +72,20 @@ class XPRoles:
             )
 
         await self.db.execute(
-            """INSERT INTO xproles (role_id, guild_id, required)
-            VALUES ($1, $2, $3)""",
+            CREATE,
             role_id,
             guild_id,
             required,
         )
 
     async def delete(self, role_id: int):
-        await self.db.execute(
-            """DELETE FROM xproles WHERE role_id=$1""", role_id
-        )
+        await self.db.execute(DELETE, role_id)
 
     async def set_required(self, role_id: int, required: int):
         if required <= 0:
             raise commands.BadArgument(t_("Required must be greater than 0."))
         await self.db.execute(
-            """UPDATE xproles SET required=$1
-            WHERE role_id=$2""",
+            SET_REQUIRED,
             required,
             role_id,
         )
@@ -0,0 +1,101 @@
+import json
+from typing import TYPE_CHECKING, Dict, Iterator, List, NamedTuple
+
+import asyncpg
+
+from .queries import REGISTRY
+
+if TYPE_CHECKING:
+    from app.database.database import Database
+
+# Tables with fewer (estimated) rows than this are cheap to scan.
+MIN_ROWS = 10_000
+STATEMENT = "index_advisor"
+
+
+class SeqScan(NamedTuple):
+    key: str
+    sql: str
+    table: str
+    rows: int
+    total_time: float
+    executions: int
+
+
+def _seq_scans(plan: dict) -> Iterator[str]:
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from _seq_scans(child)
+
+
+async def _explain(con: asyncpg.Connection, sql: str) -> dict:
+    """Returns the generic plan for a statement, which is the plan that
+    gets used for it once it's prepared, without needing real values
+    for its parameters."""
+    try:
+        async with con.transaction():
+            await con.execute("SET LOCAL plan_cache_mode = force_generic_plan")
+            params = len((await con.prepare(sql)).get_parameters())
+            await con.execute(f"PREPARE {STATEMENT} AS {sql}")
+            args = f"({', '.join(['NULL'] * params)})" if params else ""
+            plan = await con.fetchval(
+                f"EXPLAIN (FORMAT JSON) EXECUTE {STATEMENT}{args}"
+            )
+    finally:
+        if await con.fetchval(
+            "SELECT EXISTS (SELECT 1 FROM pg_prepared_statements "
+            "WHERE name=$1)",
+            STATEMENT,
+        ):
+            await con.execute(f"DEALLOCATE {STATEMENT}")
+    return json.loads(plan)[0]["Plan"]
+
+
+async def find_seq_scans(
+    db: "Database", min_rows: int = MIN_ROWS
+) -> List[SeqScan]:
+    """Explains every statement in Database.sql_times and returns the
+    ones that sequentially scan a table with at least min_rows rows,
+    ordered by the total time spent running them."""
+    results: List[SeqScan] = []
+    async with db.session() as con:
+        rows: Dict[str, int] = {
+            r["relname"]: int(r["reltuples"])
+            for r in await con.fetch(
+                """SELECT relname, reltuples FROM pg_class
+                WHERE relkind='r'
+                AND relnamespace=current_schema()::regnamespace"""
+            )
+        }
+
+        for key, times in list(db.sql_times.items()):
+            sql = REGISTRY[key].sql if key in REGISTRY else key
+            if sql.split(None, 1)[0].upper() not in (
+                "SELECT",
+                "INSERT",
+                "UPDATE",
+                "DELETE",
+                "WITH",
+            ):
+                continue
+            try:
+                plan = await _explain(con, sql)
+            except asyncpg.PostgresError:
+                continue
+
+            for table in set(_seq_scans(plan)):
+                if rows.get(table, 0) >= min_rows:
+                    results.append(
+                        SeqScan(
+                            key,
+                            sql,
+                            table,
+                            rows[table],
+                            sum(times),
+                            len(times),
+                        )
+                    )
+
+    results.sort(key=lambda r: r.total_time, reverse=True)
+    return results
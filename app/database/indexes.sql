@@ -1,6 +1,3 @@
-CREATE INDEX IF NOT EXISTS
-    members__user_id__guild_id ON members (user_id, guild_id);
-
 CREATE INDEX IF NOT EXISTS
     starboards__guild_id ON starboards USING HASH (guild_id);
 
@@ -0,0 +1,118 @@
+import asyncio
+from types import ModuleType
+from typing import Callable, List, Optional
+
+import asyncpg
+
+from . import (
+    m0001_baseline,
+    m0002_bigint_snowflakes,
+    m0003_hot_path_indexes,
+    m0004_starboard_message_digests,
+)
+
+MIGRATIONS: List[ModuleType] = [
+    m0001_baseline,
+    m0002_bigint_snowflakes,
+    m0003_hot_path_indexes,
+    m0004_starboard_message_digests,
+]
+
+# Every cluster runs the migrations when it starts, so they take an
+# advisory lock to make sure only one of them actually does the work.
+LOCK_ID = 7_340_021
+
+Reporter = Callable[[str], None]
+
+
+class Migrator:
+    """Brings the database schema up (or down) to a version.
+
+    Each migration is a module with VERSION, NAME, TRANSACTIONAL and
+    async up(con, report)/down(con, report) functions. Transactional
+    migrations run inside a single transaction along with the update
+    to schema_migrations. Non-transactional ones have to be safe to
+    run again if they are interrupted."""
+
+    def __init__(
+        self, pool: asyncpg.pool.Pool, report: Optional[Reporter] = None
+    ) -> None:
+        self.pool = pool
+        self.report: Reporter = report or print
+
+    @property
+    def latest(self) -> int:
+        return MIGRATIONS[-1].VERSION
+
+    async def applied(self, con: asyncpg.Connection) -> List[int]:
+        await con.execute(
+            """CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )"""
+        )
+        rows = await con.fetch(
+            """SELECT version FROM schema_migrations ORDER BY version"""
+        )
+        return [r["version"] for r in rows]
+
+    async def migrate(self, target: Optional[int] = None) -> None:
+        if target is None:
+            target = self.latest
+
+        async with self.pool.acquire() as con:
+            # pg_try_advisory_lock instead of pg_advisory_lock so that
+            # waiting clusters don't hold a snapshot open, which would
+            # block CREATE INDEX CONCURRENTLY.
+            while not await con.fetchval(
+                "SELECT pg_try_advisory_lock($1)", LOCK_ID
+            ):
+                await asyncio.sleep(1)
+            try:
+                await self._migrate(con, target)
+            finally:
+                await con.execute("SELECT pg_advisory_unlock($1)", LOCK_ID)
+
+    async def _migrate(self, con: asyncpg.Connection, target: int) -> None:
+        applied = await self.applied(con)
+
+        for m in MIGRATIONS:
+            if m.VERSION <= target and m.VERSION not in applied:
+                self.report(f"Applying migration {m.VERSION} ({m.NAME})")
+                await self._run(con, m, True)
+
+        for m in reversed(MIGRATIONS):
+            if m.VERSION > target and m.VERSION in applied:
+                if m.down is None:
+                    raise ValueError(
+                        f"Migration {m.VERSION} ({m.NAME}) "
+                        "cannot be rolled back."
+                    )
+                self.report(f"Rolling back migration {m.VERSION} ({m.NAME})")
+                await self._run(con, m, False)
+
+    async def _run(
+        self, con: asyncpg.Connection, migration: ModuleType, up: bool
+    ) -> None:
+        async def run() -> None:
+            if up:
+                await migration.up(con, self.report)
+                await con.execute(
+                    """INSERT INTO schema_migrations (version, name)
+                    VALUES ($1, $2)""",
+                    migration.VERSION,
+                    migration.NAME,
+                )
+            else:
+                await migration.down(con, self.report)
+                await con.execute(
+                    """DELETE FROM schema_migrations WHERE version=$1""",
+                    migration.VERSION,
+                )
+
+        if migration.TRANSACTIONAL:
+            async with con.transaction():
+                await run()
+        else:
+            await run()
@@ -0,0 +1,20 @@
+import pathlib
+
+import asyncpg
+
+VERSION = 1
+NAME = "baseline"
+TRANSACTIONAL = True
+
+SQL_DIR = pathlib.Path("app/database/")
+
+
+async def up(con: asyncpg.Connection, report) -> None:
+    # Everything in these files uses IF NOT EXISTS, so this is also
+    # safe to run against databases created before migrations existed.
+    for name in ("types.sql", "tables.sql", "indexes.sql"):
+        with open(SQL_DIR / name, "r") as f:
+            await con.execute(f.read())
+
+
+down = None
@@ -0,0 +1,463 @@
+import asyncio
+import re
+import time
+from typing import Dict, List, NamedTuple, Set, Tuple
+
+import asyncpg
+
+VERSION = 2
+NAME = "bigint snowflakes"
+# Runs in many short transactions so that no table is locked for long.
+# Every step is safe to repeat if the migration is interrupted.
+TRANSACTIONAL = False
+
+SNOWFLAKES: Dict[str, Tuple[str, ...]] = {
+    "guilds": ("id", "log_channel", "level_channel"),
+    "users": ("id",),
+    "autoredeem": ("user_id", "guild_id"),
+    "members": ("user_id", "guild_id"),
+    "starboards": ("id", "guild_id", "channel_bl", "channel_wl"),
+    "aschannels": ("id", "guild_id"),
+    "permgroups": ("guild_id", "starboards", "channels"),
+    "permroles": ("role_id",),
+    "xproles": ("role_id", "guild_id"),
+    "posroles": ("role_id", "guild_id"),
+    "members_posroles": ("role_id", "user_id", "guild_id"),
+    "messages": ("id", "guild_id", "channel_id", "author_id", "forced"),
+    "starboard_messages": ("id", "orig_id", "starboard_id"),
+    "reactions": ("message_id",),
+    "reaction_users": ("user_id",),
+}
+TABLES = list(SNOWFLAKES)
+
+BATCH_PAGES = 500
+# Servers before PostgreSQL 14 can't scan a range of ctids, so each
+# batch lists every possible tuple in its pages instead
+LEGACY_BATCH_PAGES = 50
+BATCH_DELAY = 0.05
+REPORT_EVERY = 5  # seconds
+LOCK_TIMEOUT = "5s"
+SWAP_ATTEMPTS = 10
+
+
+class Column(NamedTuple):
+    table: str
+    name: str
+    is_array: bool
+    not_null: bool
+    default: str
+
+    @property
+    def new(self) -> str:
+        return f"{self.name}__new"
+
+    @property
+    def check(self) -> str:
+        return f"{self.table}__{self.name}__new__not_null"
+
+
+class Index(NamedTuple):
+    table: str
+    name: str
+    definition: str
+    constraint: str
+    constraint_type: str
+
+    @property
+    def new(self) -> str:
+        return f"{self.name}__new"
+
+    def uses(self, column: str) -> bool:
+        return re.search(rf"\b{column}\b", self.using) is not None
+
+    @property
+    def using(self) -> str:
+        """The part of the definition after USING: the method, columns
+        or expressions, ordering and predicate."""
+        return self.definition.partition(" USING ")[2]
+
+
+class ForeignKey(NamedTuple):
+    table: str
+    name: str
+    definition: str
+    columns: List[str]
+    ref_table: str
+    ref_columns: List[str]
+
+
+async def up(con: asyncpg.Connection, report) -> None:
+    await convert(con, "numeric", "bigint", report)
+
+
+async def down(con: asyncpg.Connection, report) -> None:
+    await convert(con, "bigint", "numeric", report)
+
+
+async def convert(con: asyncpg.Connection, old: str, new: str, report) -> None:
+    """Converts every snowflake column from one type to another without
+    rewriting the tables in place:
+
+    1. add a column of the new type next to each old one, kept in sync
+       by a trigger
+    2. copy existing rows across in batches of pages
+    3. build the new indexes concurrently and validate NOT NULL checks
+    4. swap the columns over in one short transaction
+    5. validate the recreated foreign keys"""
+
+    columns = await _pending_columns(con, old)
+    by_table: Dict[str, List[Column]] = {}
+    for c in columns:
+        by_table.setdefault(c.table, []).append(c)
+
+    if columns:
+        report(
+            f"Converting {len(columns)} columns in {len(by_table)} tables "
+            f"from {old} to {new}"
+        )
+
+        for table, cols in by_table.items():
+            await _add_columns(con, table, cols, new)
+        for table, cols in by_table.items():
+            await _backfill(con, table, cols, new, report)
+
+        pending = {(c.table, c.name) for c in columns}
+        indexes = [
+            i
+            for i in await _indexes(con)
+            if any(i.uses(col) for table, col in pending if table == i.table)
+        ]
+        foreign_keys = [
+            fk
+            for fk in await _foreign_keys(con)
+            if any((fk.table, col) in pending for col in fk.columns)
+            or any((fk.ref_table, col) in pending for col in fk.ref_columns)
+        ]
+
+        for i in indexes:
+            await _build_index(con, i, pending, report)
+        for c in columns:
+            if c.not_null:
+                await _add_not_null_check(con, c, report)
+
+        await _swap(con, by_table, indexes, foreign_keys, old, new, report)
+    else:
+        report(f"No {old} snowflake columns left to convert")
+
+    await _validate_foreign_keys(con, report)
+
+
+async def _locked(con: asyncpg.Connection, *statements: str) -> None:
+    """Runs DDL that needs a brief lock, giving up quickly if the table
+    is busy instead of queueing every other query behind it."""
+    async with con.transaction():
+        await con.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'")
+        for sql in statements:
+            await con.execute(sql)
+
+
+async def _pending_columns(con: asyncpg.Connection, old: str) -> List[Column]:
+    rows = await con.fetch(
+        """SELECT table_name, column_name, data_type, udt_name,
+        is_nullable, column_default
+        FROM information_schema.columns
+        WHERE table_schema=current_schema()
+        AND table_name=any($1::text[])""",
+        TABLES,
+    )
+    columns = []
+    for r in rows:
+        if r["column_name"] not in SNOWFLAKES[r["table_name"]]:
+            continue
+        is_array = r["data_type"] == "ARRAY"
+        if is_array and r["udt_name"] != f"_{old}":
+            continue
+        if not is_array and r["data_type"] != old:
+            continue
+        columns.append(
+            Column(
+                r["table_name"],
+                r["column_name"],
+                is_array,
+                r["is_nullable"] == "NO",
+                r["column_default"],
+            )
+        )
+    return columns
+
+
+async def _add_columns(
+    con: asyncpg.Connection, table: str, cols: List[Column], new: str
+) -> None:
+    def _type(c: Column) -> str:
+        return f"{new}[]" if c.is_array else new
+
+    assignments = "\n".join(
+        f"    NEW.{c.new} := NEW.{c.name}::{_type(c)};" for c in cols
+    )
+    await _locked(
+        con,
+        *[
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {c.new} {_type(c)}"
+            for c in cols
+        ],
+        f"""CREATE OR REPLACE FUNCTION {table}__sync_snowflakes()
+        RETURNS trigger AS $$
+        BEGIN
+        {assignments}
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql""",
+        f"DROP TRIGGER IF EXISTS {table}__sync_snowflakes ON {table}",
+        f"""CREATE TRIGGER {table}__sync_snowflakes
+        BEFORE INSERT OR UPDATE ON {table}
+        FOR EACH ROW EXECUTE PROCEDURE {table}__sync_snowflakes()""",
+    )
+
+
+async def _backfill(
+    con: asyncpg.Connection,
+    table: str,
+    cols: List[Column],
+    new: str,
+    report,
+) -> None:
+    # Rows written from here on are handled by the trigger, so only the
+    # pages that exist now need to be copied.
+    pages = await con.fetchval(
+        """SELECT pg_relation_size($1::regclass)
+        / current_setting('block_size')::int""",
+        table,
+    )
+    sets = ", ".join(
+        f"{c.new}={c.name}::{new}{'[]' if c.is_array else ''}" for c in cols
+    )
+
+    # Before 14, a ctid range is a sequential scan of the whole table,
+    # but a list of ctids is still a TID scan.
+    version = int(await con.fetchval("SHOW server_version_num"))
+    if version >= 140000:
+        batch_pages = BATCH_PAGES
+        sql = f"""UPDATE {table} SET {sets}
+        WHERE ctid >= $1::tid AND ctid < $2::tid"""
+
+        def _args(start: int, end: int) -> tuple:
+            return ((start, 0), (end, 0))
+
+    else:
+        batch_pages = LEGACY_BATCH_PAGES
+        sql = f"""UPDATE {table} SET {sets}
+        WHERE ctid=any($1::tid[])"""
+        block_size = int(await con.fetchval("SHOW block_size"))
+        # MaxHeapTuplesPerPage
+        per_page = (block_size - 24) // 28
+
+        def _args(start: int, end: int) -> tuple:
+            return (
+                [
+                    (page, offset)
+                    for page in range(start, end)
+                    for offset in range(1, per_page + 1)
+                ],
+            )
+
+    last_report = time.monotonic()
+    for start in range(0, pages, batch_pages):
+        await con.execute(sql, *_args(start, start + batch_pages))
+        if time.monotonic() - last_report >= REPORT_EVERY:
+            last_report = time.monotonic()
+            done = min(start + batch_pages, pages)
+            report(
+                f"Backfilling {table}: {done}/{pages} pages "
+                f"({round(done / pages * 100)}%)"
+            )
+        await asyncio.sleep(BATCH_DELAY)
+    report(f"Backfilled {table} ({pages} pages)")
+
+
+async def _indexes(con: asyncpg.Connection) -> List[Index]:
+    rows = await con.fetch(
+        """SELECT t.relname AS table, ic.relname AS name,
+        pg_get_indexdef(i.indexrelid) AS definition,
+        c.conname, c.contype
+        FROM pg_index i
+        JOIN pg_class t ON t.oid=i.indrelid
+        JOIN pg_class ic ON ic.oid=i.indexrelid
+        LEFT JOIN pg_constraint c
+        ON c.conindid=i.indexrelid AND c.conrelid=i.indrelid
+        AND c.contype IN ('p', 'u')
+        WHERE t.relnamespace=current_schema()::regnamespace
+        AND t.relname=any($1::text[])
+        AND ic.relname NOT LIKE '%\\_\\_new'""",
+        TABLES,
+    )
+    return [
+        Index(
+            r["table"],
+            r["name"],
+            r["definition"],
+            r["conname"],
+            r["contype"],
+        )
+        for r in rows
+    ]
+
+
+async def _foreign_keys(con: asyncpg.Connection) -> List[ForeignKey]:
+    rows = await con.fetch(
+        """SELECT t.relname AS table, c.conname AS name,
+        pg_get_constraintdef(c.oid) AS definition,
+        rt.relname AS ref_table,
+        array(
+            SELECT attname FROM pg_attribute
+            WHERE attrelid=c.conrelid AND attnum=any(c.conkey)
+        ) AS columns,
+        array(
+            SELECT attname FROM pg_attribute
+            WHERE attrelid=c.confrelid AND attnum=any(c.confkey)
+        ) AS ref_columns
+        FROM pg_constraint c
+        JOIN pg_class t ON t.oid=c.conrelid
+        JOIN pg_class rt ON rt.oid=c.confrelid
+        WHERE c.contype='f'
+        AND t.relnamespace=current_schema()::regnamespace
+        AND t.relname=any($1::text[])""",
+        TABLES,
+    )
+    return [
+        ForeignKey(
+            r["table"],
+            r["name"],
+            r["definition"],
+            list(r["columns"]),
+            r["ref_table"],
+            list(r["ref_columns"]),
+        )
+        for r in rows
+    ]
+
+
+async def _build_index(
+    con: asyncpg.Connection,
+    index: Index,
+    pending: Set[Tuple[str, str]],
+    report,
+) -> None:
+    # Recreate the index from its own definition, so that ordering,
+    # predicates and expressions are kept, with the pending columns
+    # swapped for their new ones.
+    using = index.using
+    for table, col in pending:
+        if table == index.table:
+            using = re.sub(rf"\b{col}\b", f"{col}__new", using)
+    unique = "UNIQUE " if index.definition.startswith("CREATE UNIQUE") else ""
+
+    report(f"Building {index.new}")
+    # A previous, interrupted run can leave an invalid index behind.
+    await con.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index.new}")
+    await con.execute(
+        f"""CREATE {unique}INDEX CONCURRENTLY
+        {index.new} ON {index.table} USING {using}"""
+    )
+
+
+async def _add_not_null_check(
+    con: asyncpg.Connection, column: Column, report
+) -> None:
+    # A validated CHECK lets SET NOT NULL skip scanning the table while
+    # it holds the swap lock.
+    await _locked(
+        con,
+        f"ALTER TABLE {column.table} "
+        f"DROP CONSTRAINT IF EXISTS {column.check}",
+        f"ALTER TABLE {column.table} ADD CONSTRAINT {column.check} "
+        f"CHECK ({column.new} IS NOT NULL) NOT VALID",
+    )
+    report(f"Validating {column.check}")
+    await con.execute(
+        f"ALTER TABLE {column.table} VALIDATE CONSTRAINT {column.check}"
+    )
+
+
+async def _swap(
+    con: asyncpg.Connection,
+    by_table: Dict[str, List[Column]],
+    indexes: List[Index],
+    foreign_keys: List[ForeignKey],
+    old: str,
+    new: str,
+    report,
+) -> None:
+    tables = sorted(
+        set(by_table) | {fk.table for fk in foreign_keys}, key=TABLES.index
+    )
+
+    statements = [f"LOCK TABLE {', '.join(tables)} IN ACCESS EXCLUSIVE MODE"]
+    for fk in foreign_keys:
+        statements.append(f"ALTER TABLE {fk.table} DROP CONSTRAINT {fk.name}")
+    for table, cols in by_table.items():
+        statements.append(f"DROP TRIGGER {table}__sync_snowflakes ON {table}")
+        statements.append(f"DROP FUNCTION {table}__sync_snowflakes()")
+        for c in cols:
+            if c.not_null:
+                statements.append(
+                    f"ALTER TABLE {table} ALTER COLUMN {c.new} SET NOT NULL"
+                )
+                statements.append(
+                    f"ALTER TABLE {table} DROP CONSTRAINT {c.check}"
+                )
+            statements.append(f"ALTER TABLE {table} DROP COLUMN {c.name}")
+            statements.append(
+                f"ALTER TABLE {table} RENAME COLUMN {c.new} TO {c.name}"
+            )
+            if c.default is not None:
+                default = c.default.replace(f"::{old}", f"::{new}")
+                statements.append(
+                    f"ALTER TABLE {table} ALTER COLUMN {c.name} "
+                    f"SET DEFAULT {default}"
+                )
+    for i in indexes:
+        if i.constraint:
+            kind = "PRIMARY KEY" if i.constraint_type == "p" else "UNIQUE"
+            statements.append(
+                f"ALTER TABLE {i.table} ADD CONSTRAINT {i.constraint} "
+                f"{kind} USING INDEX {i.new}"
+            )
+        else:
+            statements.append(f"ALTER INDEX {i.new} RENAME TO {i.name}")
+    for fk in foreign_keys:
+        statements.append(
+            f"ALTER TABLE {fk.table} ADD CONSTRAINT {fk.name} "
+            f"{fk.definition} NOT VALID"
+        )
+
+    for attempt in range(1, SWAP_ATTEMPTS + 1):
+        try:
+            await _locked(con, *statements)
+        except asyncpg.exceptions.LockNotAvailableError:
+            report(
+                f"Could not lock tables for the swap "
+                f"(attempt {attempt}/{SWAP_ATTEMPTS})"
+            )
+            await asyncio.sleep(attempt)
+        else:
+            report(f"Swapped {sum(map(len, by_table.values()))} columns")
+            return
+    raise RuntimeError("Gave up waiting for locks to swap columns.")
+
+
+async def _validate_foreign_keys(con: asyncpg.Connection, report) -> None:
+    rows = await con.fetch(
+        """SELECT t.relname AS table, c.conname AS name
+        FROM pg_constraint c
+        JOIN pg_class t ON t.oid=c.conrelid
+        WHERE c.contype='f' AND NOT c.convalidated
+        AND t.relnamespace=current_schema()::regnamespace
+        AND t.relname=any($1::text[])""",
+        TABLES,
+    )
+    for r in rows:
+        report(f"Validating {r['name']}")
+        await con.execute(
+            f"ALTER TABLE {r['table']} VALIDATE CONSTRAINT {r['name']}"
+        )
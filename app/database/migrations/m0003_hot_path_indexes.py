@@ -0,0 +1,125 @@
+import asyncpg
+
+VERSION = 3
+NAME = "hot path indexes"
+# CREATE INDEX CONCURRENTLY can't run inside a transaction.
+TRANSACTIONAL = False
+
+# (name, table, columns, unique)
+INDEXES = [
+    ("messages__guild_id__trashed", "messages", "guild_id, trashed", False),
+    (
+        "starboard_messages__orig_id__starboard_id",
+        "starboard_messages",
+        "orig_id, starboard_id",
+        False,
+    ),
+    ("reactions__message_id__emoji", "reactions", "message_id, emoji", True),
+    ("members__user_id__guild_id", "members", "user_id, guild_id", True),
+    ("members__guild_id__xp", "members", "guild_id, xp DESC", False),
+    ("permgroups__guild_id", "permgroups", "guild_id", False),
+    (
+        "permroles__permgroup_id__role_id",
+        "permroles",
+        "permgroup_id, role_id",
+        True,
+    ),
+    ("xproles__guild_id__required", "xproles", "guild_id, required", False),
+]
+
+# Both of these used to have a non-unique index with the same name,
+# created by indexes.sql.
+REPLACED = {"reactions__message_id__emoji", "members__user_id__guild_id"}
+
+
+async def _dedupe(con: asyncpg.Connection, report) -> None:
+    async with con.transaction():
+        # Move reaction users onto the oldest copy of each reaction
+        # before deleting the newer copies.
+        await con.execute(
+            """WITH dupes AS (
+                SELECT id, min(id) OVER (
+                    PARTITION BY message_id, emoji
+                ) AS keep_id
+                FROM reactions
+            )
+            INSERT INTO reaction_users (reaction_id, user_id)
+            SELECT dupes.keep_id, reaction_users.user_id
+            FROM reaction_users
+            JOIN dupes ON dupes.id=reaction_users.reaction_id
+            WHERE dupes.id!=dupes.keep_id
+            ON CONFLICT DO NOTHING"""
+        )
+        reactions = await con.execute(
+            """DELETE FROM reactions a USING reactions b
+            WHERE a.message_id=b.message_id AND a.emoji=b.emoji
+            AND a.id > b.id"""
+        )
+        # Keep the member with the most xp, and add the stars and xp of
+        # the others to it.
+        members = await con.fetchval(
+            """WITH ranked AS (
+                SELECT ctid, row_number() OVER (
+                    PARTITION BY user_id, guild_id
+                    ORDER BY xp DESC, ctid DESC
+                ) AS n
+                FROM members
+            ), removed AS (
+                DELETE FROM members USING ranked
+                WHERE members.ctid=ranked.ctid AND ranked.n > 1
+                RETURNING members.*
+            ), totals AS (
+                SELECT user_id, guild_id,
+                sum(stars_given) AS stars_given,
+                sum(stars_received) AS stars_received,
+                sum(xp) AS xp
+                FROM removed
+                GROUP BY user_id, guild_id
+            ), merged AS (
+                UPDATE members
+                SET stars_given=members.stars_given + totals.stars_given,
+                stars_received=(
+                    members.stars_received + totals.stars_received
+                ),
+                xp=members.xp + totals.xp
+                FROM totals, ranked
+                WHERE members.user_id=totals.user_id
+                AND members.guild_id=totals.guild_id
+                AND members.ctid=ranked.ctid AND ranked.n=1
+            )
+            SELECT count(*) FROM removed"""
+        )
+        permroles = await con.execute(
+            """DELETE FROM permroles a USING permroles b
+            WHERE a.permgroup_id=b.permgroup_id AND a.role_id=b.role_id
+            AND a.ctid < b.ctid"""
+        )
+    for table, count in (
+        ("reactions", reactions.split()[-1]),
+        ("members", members),
+        ("permroles", permroles.split()[-1]),
+    ):
+        report(f"Removed {count} duplicate {table}")
+
+
+async def up(con: asyncpg.Connection, report) -> None:
+    await _dedupe(con, report)
+
+    for name, table, columns, unique in INDEXES:
+        new = f"{name}__new" if name in REPLACED else name
+        report(f"Building {name}")
+        # A previous, interrupted run can leave an invalid index behind.
+        await con.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {new}")
+        await con.execute(
+            f"""CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY
+            {new} ON {table} ({columns})"""
+        )
+        if new != name:
+            await con.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            await con.execute(f"ALTER INDEX {new} RENAME TO {name}")
+
+
+async def down(con: asyncpg.Connection, report) -> None:
+    for name, _, _, _ in reversed(INDEXES):
+        report(f"Dropping {name}")
+        await con.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,20 @@
+import asyncpg
+
+VERSION = 4
+NAME = "starboard message digests"
+# Adding a nullable column without a default doesn't rewrite the table.
+TRANSACTIONAL = True
+
+
+async def up(con: asyncpg.Connection, report) -> None:
+    await con.execute(
+        """ALTER TABLE starboard_messages
+        ADD COLUMN IF NOT EXISTS last_digest TEXT DEFAULT NULL"""
+    )
+
+
+async def down(con: asyncpg.Connection, report) -> None:
+    await con.execute(
+        """ALTER TABLE starboard_messages
+        DROP COLUMN IF EXISTS last_digest"""
+    )
@@ -0,0 +1,118 @@
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+PERM_KEYS = (
+    "allow_commands",
+    "on_starboard",
+    "give_stars",
+    "gain_xp",
+    "pos_roles",
+    "xp_roles",
+)
+DEFAULT_MASK = (True,) * len(PERM_KEYS)
+
+# A permrole's overrides, in the same order as PERM_KEYS. None means
+# the permrole doesn't change that permission.
+Vector = Tuple[Optional[bool], ...]
+# role_id: [(position, vector), ...], where position is the order the
+# permrole is applied in across all permgroups.
+Table = Dict[int, List[Tuple[int, Vector]]]
+
+
+class PermissionIndex:
+    """A guild's permgroups and permroles compiled into an in-memory
+    lookup, so that resolving a member's permissions is a fold over
+    their role ids instead of a series of queries."""
+
+    MAX_MASKS = 1024  # per (channel_id, starboard_id)
+
+    def __init__(
+        self, permgroups: List[dict], permroles: Dict[int, List[dict]]
+    ) -> None:
+        self._groups: List[Tuple[FrozenSet[int], FrozenSet[int], Table]] = []
+        position = 0
+        for g in permgroups:
+            table: Table = {}
+            for pr in permroles.get(g["id"], []):
+                vector = tuple(pr[key] for key in PERM_KEYS)
+                table.setdefault(pr["role_id"], []).append((position, vector))
+                position += 1
+            self._groups.append(
+                (
+                    frozenset(g["channels"] or []),
+                    frozenset(g["starboards"] or []),
+                    table,
+                )
+            )
+
+        self._tables: Dict[Tuple[Optional[int], Optional[int]], Table] = {}
+        self._masks: Dict[
+            Tuple[Optional[int], Optional[int]],
+            Dict[FrozenSet[int], Tuple[bool, ...]],
+        ] = {}
+
+    def _table(
+        self, channel_id: Optional[int], starboard_id: Optional[int]
+    ) -> Table:
+        key = (channel_id, starboard_id)
+        table = self._tables.get(key)
+        if table is not None:
+            return table
+
+        table = {}
+        for channels, starboards, group_table in self._groups:
+            if channels and channel_id is not None:
+                if channel_id not in channels:
+                    continue
+            if starboards and starboard_id is not None:
+                if starboard_id not in starboards:
+                    continue
+            for role_id, entries in group_table.items():
+                table.setdefault(role_id, []).extend(entries)
+
+        self._tables[key] = table
+        return table
+
+    def resolve_mask(
+        self,
+        roles: Iterable[int],
+        channel_id: Optional[int],
+        starboard_id: Optional[int],
+    ) -> Tuple[bool, ...]:
+        if channel_id is not None:
+            channel_id = int(channel_id)
+        if starboard_id is not None:
+            starboard_id = int(starboard_id)
+
+        table = self._table(channel_id, starboard_id)
+        role_set = frozenset(r for r in roles if r in table)
+        if not role_set:
+            return DEFAULT_MASK
+
+        masks = self._masks.setdefault((channel_id, starboard_id), {})
+        mask = masks.get(role_set)
+        if mask is not None:
+            return mask
+
+        entries = [e for r in role_set for e in table[r]]
+        entries.sort(key=lambda e: e[0])
+        result = list(DEFAULT_MASK)
+        for _, vector in entries:
+            for i, value in enumerate(vector):
+                if value is not None:
+                    result[i] = value
+        mask = tuple(result)
+
+        if len(masks) >= self.MAX_MASKS:
+            masks.clear()
+        masks[role_set] = mask
+        return mask
+
+    def resolve(
+        self,
+        roles: Iterable[int],
+        channel_id: Optional[int],
+        starboard_id: Optional[int],
+    ) -> Dict[str, bool]:
+        return dict(
+            zip(PERM_KEYS, self.resolve_mask(roles, channel_id, starboard_id))
+        )
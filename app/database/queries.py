@@ -0,0 +1,253 @@
+from typing import Dict, Tuple, Union
+
+
+class Query:
+    """A named SQL statement.
+
+    asyncpg prepares a statement the first time its text is run on a
+    connection and reuses it afterwards, so giving every statement a
+    single, stable text means it is only planned once per connection.
+    The name is used as the key in Database.sql_times."""
+
+    __slots__ = ("name", "sql")
+
+    def __init__(self, name: str, sql: str) -> None:
+        self.name = name
+        self.sql = sql
+
+    def __repr__(self) -> str:
+        return f"<Query {self.name}>"
+
+
+REGISTRY: Dict[str, Query] = {}
+
+
+def query(name: str, sql: str) -> Query:
+    """Creates a Query and adds it to the registry."""
+    existing = REGISTRY.get(name)
+    if existing is not None and existing.sql != sql:
+        raise ValueError(f"A different query is already named {name}.")
+    q = Query(name, sql)
+    REGISTRY[name] = q
+    return q
+
+
+def resolve(sql: Union[str, Query]) -> Tuple[str, str]:
+    """Returns the key used for timing a statement, and its text."""
+    if isinstance(sql, Query):
+        return sql.name, sql.sql
+    return sql, sql
+
+
+# Statements that cogs run directly. Database modules, and helpers with
+# many statements of their own like starboard_funcs, define theirs next
+# to the code that runs them.
+
+MEMBER_STAR_TOTALS = query(
+    "fun.member_star_totals",
+    """SELECT SUM(stars_given), SUM(stars_received) FROM members
+    WHERE user_id=$1""",
+)
+
+EXPLORE_STARBOARDS = query(
+    "fun.explore_starboards",
+    """SELECT * FROM starboards
+    WHERE guild_id=$1
+    AND explore=True""",
+)
+
+MOST_STARRED = query(
+    "fun.most_starred",
+    """SELECT * FROM starboard_messages
+    WHERE starboard_id=any($1::bigint[])
+    AND ($2::bigint is NULL or starboard_id=$2::bigint)
+    AND EXISTS(
+        SELECT * FROM messages
+        WHERE id=orig_id
+        AND ($3::bigint is NULL or author_id=$3::bigint)
+        AND ($4::bigint is NULL or channel_id=$4::bigint)
+        AND trashed=False
+    )
+    AND ($5::smallint is NULL or points <= $5::smallint)
+    ORDER BY points DESC""",
+)
+
+RANDOM_CANDIDATES = query(
+    "fun.random_candidates",
+    """SELECT * FROM starboard_messages
+    WHERE starboard_id=any($1::bigint[])
+    AND ($2::bigint is NULL or starboard_id=$2::bigint)
+    AND ($3::smallint is NULL or points >= $3::smallint)
+    AND ($4::smallint is NULL or points <= $4::smallint)
+    AND EXISTS (
+        SELECT * FROM messages
+        WHERE id=orig_id
+        AND trashed=False
+        AND ($5::bigint is NULL or author_id=$5::bigint)
+        AND ($6::bigint is NULL or channel_id=$6::bigint)
+    )""",
+)
+
+LEADERBOARD = query(
+    "fun.leaderboard",
+    """SELECT * FROM members
+    WHERE guild_id=$1
+    AND xp > 0
+    ORDER BY xp DESC
+    LIMIT 200""",
+)
+
+ADD_STARS_GIVEN = query(
+    "leveling.add_stars_given",
+    """UPDATE members SET stars_given = stars_given + $1
+    WHERE user_id=$2 AND guild_id=$3""",
+)
+
+ADD_STARS_RECEIVED = query(
+    "leveling.add_stars_received",
+    """UPDATE members
+    SET stars_received = stars_received + $1
+    WHERE user_id=$2 AND guild_id=$3""",
+)
+
+ADD_XP = query(
+    "leveling.add_xp",
+    """UPDATE members
+    SET xp = xp + $1
+    WHERE user_id=$2 AND guild_id=$3""",
+)
+
+LOCK_MEMBER = query(
+    "leveling.lock_member",
+    """SELECT * FROM members WHERE user_id=$1
+    AND guild_id=$2 FOR UPDATE""",
+)
+
+SET_LEVEL = query(
+    "leveling.set_level",
+    """UPDATE members SET level=$1
+    WHERE user_id=$2 AND guild_id=$3""",
+)
+
+XPROLES_REACHED = query(
+    "xproles.reached",
+    """SELECT * FROM xproles
+    WHERE guild_id=$1
+    AND required <= $2
+    ORDER BY required DESC""",
+)
+
+XPROLES_NOT_REACHED = query(
+    "xproles.not_reached",
+    """SELECT * FROM xproles
+    WHERE guild_id=$1
+    AND required > $2""",
+)
+
+SPEND_CREDITS = query(
+    "premium.spend_credits",
+    """UPDATE users
+    SET credits=credits-$1
+    WHERE id=$2""",
+)
+
+EXPIRED_PREMIUM_GUILDS = query(
+    "premium.expired_guilds",
+    """SELECT * FROM guilds
+    WHERE premium_end < $1""",
+)
+
+ADD_DONATION = query(
+    "premium.add_donation",
+    """UPDATE users
+    SET credits = credits + $1,
+    donation_total = donation_total + $1
+    WHERE id = $2""",
+)
+
+ADD_PATREON_CREDITS = query(
+    "premium.add_patreon_credits",
+    """UPDATE users
+    SET last_patreon_total=$1,
+    credits = credits + $2
+    WHERE id=$3""",
+)
+
+SET_LAST_KNOWN_MONTHLY = query(
+    "premium.set_last_known_monthly",
+    """UPDATE users SET last_known_monthly=$1
+    WHERE id=$2""",
+)
+
+CANCELLED_PATRONS = query(
+    "premium.cancelled_patrons",
+    """SELECT * FROM users WHERE patron_status!='no'
+    AND NOT id=any($1)""",
+)
+
+REMOVE_PATRON = query(
+    "premium.remove_patron",
+    """UPDATE users
+    SET last_known_monthly=0,
+    patron_status='no'
+    WHERE id=$1""",
+)
+
+RESET_LEADERBOARD = query(
+    "utility.reset_leaderboard",
+    """UPDATE members
+    SET xp=0,
+    level=0
+    WHERE guild_id=$1""",
+)
+
+SET_MEMBER_XP = query(
+    "utility.set_member_xp",
+    """UPDATE members
+    SET xp=$1,
+    level=$2
+    WHERE user_id=$3
+    AND guild_id=$4""",
+)
+
+TRASHED_MESSAGES = query(
+    "utility.trashed_messages",
+    """SELECT * FROM messages
+    WHERE guild_id=$1 AND trashed=True""",
+)
+
+UNTRASH_ALL = query(
+    "utility.untrash_all",
+    """UPDATE messages
+    SET trashed=False
+    WHERE guild_id=$1 and trashed=True""",
+)
+
+SET_FROZEN = query(
+    "utility.set_frozen",
+    """UPDATE messages
+    SET frozen=$1
+    WHERE id=$2""",
+)
+
+SET_FORCED = query(
+    "utility.set_forced",
+    """UPDATE messages
+    SET forced=$1::bigint[]
+    WHERE id=$2""",
+)
+
+SET_TRASH_REASON = query(
+    "utility.set_trash_reason",
+    """UPDATE messages
+    SET trash_reason=$1
+    WHERE id=$2""",
+)
+
+SET_TRASHED = query(
+    "utility.set_trashed",
+    """UPDATE messages
+    SET trashed=$1,
+    trash_reason=$2
+    WHERE id=$3""",
+)
@@ -1,3 +1,6 @@
+-- Baseline schema, applied by migration 1. Later schema changes live in
+-- app/database/migrations/.
+
 CREATE TABLE IF NOT EXISTS guilds (
     id NUMERIC PRIMARY KEY,
 
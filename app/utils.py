@@ -1,10 +1,17 @@
-import errno
-import os
 import re
-import signal
 import typing
-from functools import wraps
-from typing import Any, Dict, Generator, Iterable, List, Optional, Tuple, Union
+from functools import lru_cache
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Pattern,
+    Tuple,
+    Union,
+)
 
 import discord
 from discord import RequestsWebhookAdapter, Webhook
@@ -17,25 +24,8 @@ from app.i18n import t_
 if typing.TYPE_CHECKING:
     from app.classes.bot import Bot
 
-
-# Decoraters
-def timeout(seconds=10, error_message=os.strerror(errno.ETIME)):
-    def decorator(func):
-        def _handle_timeout(signum, frame):
-            raise TimeoutError(error_message)
-
-        def wrapper(*args, **kwargs):
-            signal.signal(signal.SIGALRM, _handle_timeout)
-            signal.setitimer(signal.ITIMER_REAL, seconds)
-            try:
-                result = func(*args, **kwargs)
-            finally:
-                signal.alarm(0)
-            return result
-
-        return wraps(func)(wrapper)
-
-    return decorator
+# <:name:id> and <a:name:id>
+CUSTOM_EMOJI_PATTERN = re.compile(r"^<a?:.*:[0-9]+>$")
 
 
 # Functions
@@ -139,22 +129,9 @@ def ms(seconds: float) -> float:
     return round(seconds * 1000, 2)
 
 
-def safe_regex(
-    string: str, pattern: str, max_time: float = 0.01
-) -> Optional[re.Match]:
-    @timeout(seconds=max_time)
-    def run_regex(string: str, pattern: str) -> Optional[re.Match]:
-        return re.search(pattern, string)
-
-    return run_regex(string, pattern)
-
-
 def clean_emoji(
     emoji: Union[str, int, discord.Emoji, discord.Reaction]
 ) -> str:
-    animated_pattern = "^<:.*:[0-9]+>$"
-    custom_pattern = "^<a:.*:[0-9]+>$"
-
     if isinstance(emoji, discord.partial_emoji.PartialEmoji):
         if emoji.id is None:
             return emoji.name
@@ -166,9 +143,7 @@ def clean_emoji(
     else:
         str_emoji = str(emoji)
 
-    if re.match(animated_pattern, str_emoji) or re.match(
-        custom_pattern, str_emoji
-    ):
+    if CUSTOM_EMOJI_PATTERN.match(str_emoji):
         return str_emoji.split(":")[-1][:-1]
     return str_emoji
 
@@ -206,15 +181,20 @@ def pretty_channel_string(channels: List[int], guild: discord.Guild) -> str:
     return ", ".join([f"<#{c}>" for c in channels]) or t_("None")
 
 
+@lru_cache(maxsize=None)
+def mention_pattern(user_id: int) -> Pattern:
+    return re.compile(f"<@!?{user_id}>")
+
+
 def clean_prefix(ctx: "MyContext") -> str:
     user = ctx.guild.me if ctx.guild else ctx.bot.user
-    pattern = re.compile(r"<@!?%s>" % user.id)
+    pattern = mention_pattern(user.id)
     return pattern.sub(
         "@%s" % user.display_name.replace("\\", r"\\"), ctx.prefix
     )
 
 
 def clean_prefix_no_ctx(prefix: str, me: Union[discord.Member, discord.User]):
-    pattern = re.compile(f"<@!?{me.id}>")
+    pattern = mention_pattern(me.id)
     display_name = me.display_name.replace("\\", r"\\")
     return pattern.sub(f"@{display_name}", prefix)
@@ -0,0 +1 @@
+# Lets the tests import the app package from the repository root
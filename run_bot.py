@@ -3,7 +3,8 @@ import logging
 import os
 import sys
 import time
-from typing import List
+from math import ceil
+from typing import List, Tuple
 
 import requests
 from dotenv import load_dotenv
@@ -17,6 +18,11 @@ load_dotenv()
 WEBHOOK_URL = os.getenv("UPTIME_HOOK")
 TOKEN = os.getenv("TOKEN")
 SHARDS = config.SHARDS
+MAX_CONCURRENCY = config.MAX_CONCURRENCY
+SHARDS_PER_CLUSTER = config.SHARDS_PER_CLUSTER
+CLUSTER_COUNT = config.CLUSTER_COUNT
+SHARD_EVENT_RATE = config.SHARD_EVENT_RATE
+CLUSTER_EVENT_CAPACITY = config.CLUSTER_EVENT_CAPACITY
 
 log = logging.getLogger("Cluster#Launcher")
 log.setLevel(logging.DEBUG)
@@ -27,39 +33,50 @@ hdlr.setFormatter(
 log.handlers = [hdlr]
 
 
-CLUSTER_NAMES = (
-    "Alpha (0)",
-    "Beta (1)",
-    "Gamma (2)",
-    "Delta (3)",
-    "Epsilon (4)",
-    "Zeta (5)",
-    "Eta (6)",
-    "Theta (7)",
-    "Iota (8)",
-    "Kappa (9)",
-    "Lambda (10)",
-    "Mu (11)",
-    "Nu (12)",
-    "Xi (13)",
-    "Omicron (14)",
-    "Pi (15)",
-    "Rho (16)",
-    "Sigma (17)",
-    "Tau (18)",
-    "Upsilon (19)",
-    "Phi (20)",
-    "Chi (21)",
-    "Psi (22)",
-    "Omega (23)",
+GREEK_LETTERS = (
+    "Alpha",
+    "Beta",
+    "Gamma",
+    "Delta",
+    "Epsilon",
+    "Zeta",
+    "Eta",
+    "Theta",
+    "Iota",
+    "Kappa",
+    "Lambda",
+    "Mu",
+    "Nu",
+    "Xi",
+    "Omicron",
+    "Pi",
+    "Rho",
+    "Sigma",
+    "Tau",
+    "Upsilon",
+    "Phi",
+    "Chi",
+    "Psi",
+    "Omega",
 )
-NAMES = iter(CLUSTER_NAMES)
 
 
-def get_shard_count():
-    if SHARDS != 0:
-        log.info(f"Launching with {SHARDS} shards")
-        return SHARDS
+def cluster_name(index: int) -> str:
+    """Alpha (0) ... Omega (23), then Alpha 2 (24) and so on."""
+    letter = GREEK_LETTERS[index % len(GREEK_LETTERS)]
+    cycle = index // len(GREEK_LETTERS)
+    return f"{letter}{f' {cycle + 1}' if cycle else ''} ({index})"
+
+
+def get_shard_count() -> Tuple[int, int]:
+    """Returns the number of shards to run, and how many shards can
+    identify at once (Discord's max_concurrency)."""
+    if SHARDS != 0 and MAX_CONCURRENCY != 0:
+        log.info(
+            f"Launching with {SHARDS} shards, "
+            f"max concurrency {MAX_CONCURRENCY}"
+        )
+        return SHARDS, MAX_CONCURRENCY
     data = requests.get(
         "https://discordapp.com/api/v9/gateway/bot",
         headers={
@@ -72,11 +89,63 @@ def get_shard_count():
     )
     data.raise_for_status()
     content = data.json()
+    shards = SHARDS or content["shards"]
+    max_concurrency = (
+        MAX_CONCURRENCY or content["session_start_limit"]["max_concurrency"]
+    )
     log.info(
-        f"Successfully got shard count of {content['shards']}"
-        f" ({data.status_code, data.reason})"
+        f"Successfully got shard count of {content['shards']}, max "
+        f"concurrency {max_concurrency} ({data.status_code, data.reason})"
     )
-    return content["shards"]
+    return shards, max_concurrency
+
+
+def plan_clusters(shard_count: int) -> List[List[int]]:
+    """Splits the shards between clusters.
+
+    Uses SHARDS_PER_CLUSTER or CLUSTER_COUNT if either is set. Otherwise
+    runs one cluster per CPU, or more if the expected event rate
+    (SHARD_EVENT_RATE per shard) is more than CLUSTER_EVENT_CAPACITY
+    per cluster would handle. The layout is worked out every time the
+    bot starts, so changing these and restarting rebalances the
+    shards."""
+    if SHARDS_PER_CLUSTER:
+        per_cluster = SHARDS_PER_CLUSTER
+    else:
+        if CLUSTER_COUNT:
+            clusters = CLUSTER_COUNT
+        else:
+            clusters = os.cpu_count() or 1
+            if SHARD_EVENT_RATE and CLUSTER_EVENT_CAPACITY:
+                clusters = max(
+                    clusters,
+                    ceil(
+                        shard_count * SHARD_EVENT_RATE / CLUSTER_EVENT_CAPACITY
+                    ),
+                )
+        per_cluster = ceil(shard_count / min(clusters, shard_count))
+
+    shards = list(range(shard_count))
+    return [
+        shards[x : x + per_cluster] for x in range(0, shard_count, per_cluster)
+    ]
+
+
+def get_concurrency(max_concurrency: int, shards_per_cluster: int) -> int:
+    """Returns how many clusters can log in at once.
+
+    Shards identify in max_concurrency buckets (shard_id %
+    max_concurrency), and each bucket allows one identify every 5
+    seconds. Clusters are started in that many lanes, cluster i in lane
+    i % concurrency, so clusters running at the same time never share a
+    bucket as long as shards_per_cluster * concurrency divides
+    max_concurrency."""
+    concurrency = max_concurrency // shards_per_cluster
+    while concurrency > 1 and max_concurrency % (
+        concurrency * shards_per_cluster
+    ):
+        concurrency -= 1
+    return max(concurrency, 1)
 
 
 class Launcher:
@@ -117,15 +186,20 @@ class Launcher:
             self.cleanup()
 
     async def startup(self):
-        shards = list(range(get_shard_count()))
-        size = [shards[x : x + 4] for x in range(0, len(shards), 4)]
-        log.info(f"Preparing {len(size)} clusters")
-        for shard_ids in size:
+        shard_count, max_concurrency = get_shard_count()
+        size = plan_clusters(shard_count)
+        log.info(
+            f"Preparing {len(size)} clusters with up to "
+            f"{len(size[0])} shards each"
+        )
+        for index, shard_ids in enumerate(size):
             self.cluster_queue.append(
-                Cluster(self, next(NAMES), shard_ids, len(shards))
+                Cluster(self, cluster_name(index), shard_ids, shard_count)
             )
 
-        await self.start_cluster()
+        await self.start_clusters(
+            get_concurrency(max_concurrency, len(size[0]))
+        )
         self.keep_alive = self.loop.create_task(self.rebooter())
         self.keep_alive.add_done_callback(self.task_complete)
         log.info(f"Startup completed in {time.perf_counter()-self.init}s")
@@ -168,16 +242,25 @@ class Launcher:
                 self.clusters.remove(rem)
             await asyncio.sleep(5)
 
-    async def start_cluster(self):
-        if self.cluster_queue:
-            cluster = self.cluster_queue.pop(0)
+    async def start_clusters(self, concurrency: int = 1):
+        """Starts the queued clusters, up to `concurrency` at once. With
+        a concurrency of 1 they start one after another."""
+        log.info(f"Starting clusters {concurrency} at a time")
+        queue, self.cluster_queue = self.cluster_queue, []
+        lanes = [queue[i::concurrency] for i in range(concurrency)]
+        await asyncio.gather(*[self.start_lane(lane) for lane in lanes])
+        log.info("All clusters launched")
+
+    async def start_lane(self, clusters: List["Cluster"]):
+        for cluster in clusters:
             log.info(f"Starting Cluster#{cluster.name}")
+            start = time.perf_counter()
             await cluster.start()
-            log.info("Done!")
+            cluster.ready_time = time.perf_counter() - start
+            log.info(
+                f"Cluster#{cluster.name} ready in {cluster.ready_time:.1f}s"
+            )
             self.clusters.append(cluster)
-            await self.start_cluster()
-        else:
-            log.info("All clusters launched")
 
 
 if __name__ == "__main__":
@@ -1,38 +1,185 @@
 import asyncio
+import json
 import pathlib
 import signal
 import ssl
-from typing import Dict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 import websockets
 
+from app.classes.ipc_connection import HUB
+from app.classes.ipc_serializers import Codec, negotiate
+
 CLIENTS: Dict[str, websockets.WebSocketServerProtocol] = {}
+# cluster name: the shards it runs
+CLIENT_SHARDS: Dict[str, List[int]] = {}
+# cluster name: the codec negotiated with it
+CODECS: Dict[str, Codec] = {}
+# cluster name: the guilds it's in, and the reverse
+CLIENT_GUILDS: Dict[str, Set[int]] = {}
+GUILD_CLUSTERS: Dict[int, str] = {}
+SHARD_COUNT: Optional[int] = None
 
 SSL_CONTEXT = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
 SSL_CONTEXT.load_cert_chain(pathlib.Path("localhost.pem"))
 
 
-async def dispatch(data):
-    for _, client in CLIENTS.items():
-        await client.send(data)
+def cluster_for_shard(shard_id: int) -> Optional[str]:
+    for name, shard_ids in CLIENT_SHARDS.items():
+        if shard_id in shard_ids:
+            return name
+    return None
+
+
+def route(target: Optional[Dict[str, Any]]) -> List[str]:
+    """Returns the names of the clients a command should be sent to.
+
+    The target can be {"cluster": name}, {"guild": guild_id},
+    {"shard": shard_id}, or None to send it to every client."""
+    if not target:
+        return list(CLIENTS)
+
+    if "cluster" in target:
+        name = target["cluster"]
+    elif "guild" in target:
+        name = GUILD_CLUSTERS.get(target["guild"])
+        if name is None and SHARD_COUNT:
+            name = cluster_for_shard((target["guild"] >> 22) % SHARD_COUNT)
+    else:
+        name = cluster_for_shard(target["shard"])
+
+    return [name] if name in CLIENTS else []
+
+
+async def send(
+    name: str,
+    msg: Dict[str, Any],
+    frames: Dict[Tuple[str, Optional[int]], bytes],
+) -> None:
+    """Sends a message to a client, encoding it with that client's codec.
+    `frames` holds the message already encoded by other codecs, so that
+    each encoding only happens once."""
+    client = CLIENTS.get(name)
+    if client is None:
+        return
+    codec = CODECS[name]
+    if codec.key not in frames:
+        frames[codec.key] = codec.encode(msg)
+    try:
+        await client.send(frames[codec.key])
+    except websockets.ConnectionClosed:
+        pass
+
+
+def set_guilds(cluster_name: str, guild_ids: Iterable[int]) -> None:
+    for guild_id in CLIENT_GUILDS.pop(cluster_name, ()):
+        if GUILD_CLUSTERS.get(guild_id) == cluster_name:
+            GUILD_CLUSTERS.pop(guild_id)
+    CLIENT_GUILDS[cluster_name] = set(guild_ids)
+    for guild_id in CLIENT_GUILDS[cluster_name]:
+        GUILD_CLUSTERS[guild_id] = cluster_name
+
+
+def handle_hub_command(sender: str, msg: Dict[str, Any]) -> Any:
+    """Handles commands sent to the IPC server itself (cluster=HUB)."""
+    cmd = msg["name"]
+    data = msg["data"]
+
+    if cmd == "set_guilds":
+        set_guilds(sender, data["guild_ids"])
+    elif cmd == "guild_join":
+        CLIENT_GUILDS.setdefault(sender, set()).add(data["guild_id"])
+        GUILD_CLUSTERS[data["guild_id"]] = sender
+    elif cmd == "guild_remove":
+        CLIENT_GUILDS.get(sender, set()).discard(data["guild_id"])
+        if GUILD_CLUSTERS.get(data["guild_id"]) == sender:
+            GUILD_CLUSTERS.pop(data["guild_id"])
+    elif cmd == "mutual_guilds":
+        return [gid for gid in data["guild_ids"] if gid in GUILD_CLUSTERS]
+    elif cmd == "guild_cluster":
+        return GUILD_CLUSTERS.get(data["guild_id"])
+    return None
+
+
+async def handle_message(sender: str, data: bytes):
+    codec = CODECS[sender]
+    msg = codec.decode(data)
+    frames = {codec.key: data}
+
+    if msg["type"] == "response":
+        # Only the client that sent the command wants the response
+        await send(msg["to"], msg, frames)
+        return
+
+    if msg.get("target") == {"cluster": HUB}:
+        resp = handle_hub_command(sender, msg)
+        if msg["respond"]:
+            await send(
+                sender,
+                {"type": "ack", "callback": msg["callback"], "recipients": 1},
+                {},
+            )
+            await send(
+                sender,
+                {
+                    "type": "response",
+                    "to": sender,
+                    "callback": msg["callback"],
+                    "data": resp,
+                    "author": HUB,
+                },
+                {},
+            )
+        return
+
+    recipients = route(msg.get("target"))
+    if msg["respond"]:
+        # Tell the sender how many responses to wait for
+        ack = {
+            "type": "ack",
+            "callback": msg["callback"],
+            "recipients": len(recipients),
+        }
+        await send(sender, ack, {})
+    for name in recipients:
+        await send(name, msg, frames)
 
 
 async def serve(ws: websockets.WebSocketServerProtocol, path: str):
-    cluster_name = await ws.recv()
-    if isinstance(cluster_name, bytes):
-        cluster_name = cluster_name.decode()
-    if cluster_name in CLIENTS:
+    global SHARD_COUNT
+
+    hello = json.loads(await ws.recv())
+    cluster_name = hello["name"]
+    if cluster_name in CLIENTS or cluster_name == HUB:
         print(f"IPC: {cluster_name} attempted reconnection")
         await ws.close(4029, "already connected")
         return
     CLIENTS[cluster_name] = ws
+    CLIENT_SHARDS[cluster_name] = hello.get("shard_ids") or []
+    CODECS[cluster_name] = Codec(
+        negotiate(hello.get("serializers") or []),
+        hello.get("compress_threshold"),
+    )
+    if hello.get("shard_count"):
+        SHARD_COUNT = hello["shard_count"]
     try:
-        await ws.send(b'{"status":"ok"}')
+        await ws.send(
+            json.dumps(
+                {
+                    "status": "ok",
+                    "serializer": CODECS[cluster_name].serializer.name,
+                }
+            ).encode("utf-8")
+        )
         print(f"IPC: {cluster_name} connected successfully")
         async for msg in ws:
-            await dispatch(msg)
+            await handle_message(cluster_name, msg)
     finally:
         CLIENTS.pop(cluster_name)
+        CLIENT_SHARDS.pop(cluster_name)
+        CODECS.pop(cluster_name)
+        set_guilds(cluster_name, ())
+        CLIENT_GUILDS.pop(cluster_name)
         print(f"IPC: {cluster_name} disconnected")
 
 
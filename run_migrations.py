@@ -0,0 +1,39 @@
+import argparse
+import asyncio
+import os
+
+import asyncpg
+from dotenv import load_dotenv
+
+from app.database.migrations import MIGRATIONS, Migrator
+
+load_dotenv()
+
+
+async def main(target: int) -> None:
+    pool = await asyncpg.create_pool(
+        database=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host="127.0.0.1",
+        min_size=1,
+        max_size=1,
+    )
+    try:
+        await Migrator(pool).migrate(target)
+    finally:
+        await pool.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Migrate the database up or down to a version."
+    )
+    parser.add_argument(
+        "target",
+        type=int,
+        nargs="?",
+        default=MIGRATIONS[-1].VERSION,
+        help="The version to migrate to. Defaults to the latest.",
+    )
+    asyncio.run(main(parser.parse_args().target))
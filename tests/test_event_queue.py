@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+discord = pytest.importorskip("discord")
+try:
+    from app.classes.bot import Bot
+except ImportError as e:
+    pytest.skip(f"Bot can't be imported: {e}", allow_module_level=True)
+
+from discord.ext import commands
+
+from app.classes.event_queue import EventQueue
+
+
+class Listener(commands.Cog):
+    def __init__(self) -> None:
+        self.payloads = []
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload) -> None:
+        self.payloads.append(payload)
+
+
+class StarboardEvents(Listener):
+    pass
+
+
+class StatsEvents(Listener):
+    pass
+
+
+@pytest.fixture
+def bot():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    # Bot.__init__ connects to the database and the IPC server
+    bot = Bot.__new__(Bot)
+    commands.AutoShardedBot.__init__(bot, command_prefix="!", loop=loop)
+    bot.events = EventQueue(loop, workers=2)
+    yield bot
+    bot.events.stop()
+    loop.run_until_complete(asyncio.sleep(0))
+    loop.close()
+    asyncio.set_event_loop(None)
+
+
+def reaction_add(guild_id: int, message_id: int):
+    return discord.RawReactionActionEvent(
+        {
+            "message_id": str(message_id),
+            "channel_id": "2",
+            "user_id": "3",
+            "guild_id": str(guild_id),
+        },
+        discord.PartialEmoji(name="⭐"),
+        "REACTION_ADD",
+    )
+
+
+def test_raw_reaction_add_is_queued(bot):
+    queued, direct = StarboardEvents(), StatsEvents()
+    bot.add_cog(queued)
+    bot.add_cog(direct)
+
+    payload = reaction_add(1, 10)
+    bot.dispatch("raw_reaction_add", payload)
+    bot.loop.run_until_complete(asyncio.sleep(0.1))
+
+    assert queued.payloads == [payload]
+    assert direct.payloads == [payload]
+    # Only the starboard listener went through the queue
+    assert bot.events.queued == 1
+    assert bot.events.processed == 1
+    assert bot.events.depth == 0
+
+
+def test_queued_listeners_are_shed_per_guild(bot):
+    bot.events.guild_size = 1
+    bot.add_cog(StarboardEvents())
+
+    # The workers don't run until the loop does, so the second event for
+    # the guild finds its queue full
+    bot.dispatch("raw_reaction_add", reaction_add(1, 10))
+    bot.dispatch("raw_reaction_add", reaction_add(1, 11))
+    bot.dispatch("raw_reaction_add", reaction_add(2, 12))
+    bot.loop.run_until_complete(asyncio.sleep(0.1))
+
+    assert bot.events.queued == 2
+    assert bot.events.shed_by_guild == {1: 1}
+
+
+def test_star_update_is_queued_by_guild(bot):
+    class LevelingEvents(commands.Cog):
+        def __init__(self) -> None:
+            self.updates = []
+
+        @commands.Cog.listener()
+        async def on_star_update(self, *args) -> None:
+            self.updates.append(args)
+
+    leveling = LevelingEvents()
+    bot.add_cog(leveling)
+
+    # giver_id, receiver_id, guild_id, channel_id, points
+    bot.dispatch("star_update", 3, 4, 1, 2, 1)
+    bot.loop.run_until_complete(asyncio.sleep(0.1))
+
+    assert leveling.updates == [(3, 4, 1, 2, 1)]
+    assert bot.events.queued == 1